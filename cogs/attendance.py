@@ -1,32 +1,20 @@
 import discord
-import os
-import aiosqlite
 from discord import app_commands
 from discord.ext import commands
+from utils.timeutils import now_ts
+from utils.write_buffer import WriteBehindBuffer
 
-DATABASE_PATH = "database.db"
-GUILD_ID = discord.Object(id=os.getenv("GUILD_ID"))
 
 class AttendanceCog(commands.Cog):
     """Displays attendance information for a meeting by listing opted in users and who has joined the voice channel at any time."""
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.bot.loop.create_task(self.ensure_attendance_table())
+        # Join events are buffered and written in batches so a meeting-start rush costs a few commits, not one per join.
+        self.attendance_buffer = WriteBehindBuffer(self.bot.db.log_attendance_batch, flush_interval=0.5, max_batch=200)
 
-    async def ensure_attendance_table(self):
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            await db.execute(
-                """
-                CREATE TABLE IF NOT EXISTS attendance_log (
-                    meeting_id INTEGER,
-                    user_id INTEGER,
-                    joined_at TEXT DEFAULT (strftime('%s','now')),
-                    UNIQUE(meeting_id, user_id)
-                )
-                """
-            )
-            await db.commit()
+    async def cog_unload(self):
+        await self.attendance_buffer.close()
     
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
@@ -34,16 +22,10 @@ class AttendanceCog(commands.Cog):
         if before.channel is None and after.channel is not None:
             voice_channel = after.channel
             # Check if this voice channel is linked to a meeting
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                async with db.execute(
-                    "SELECT id FROM meetings WHERE voice_channel_id = ?", (voice_channel.id,),) as cursor:
-                    meeting_row = await cursor.fetchone()
-            if meeting_row:
-                meeting_id = meeting_row[0]
+            meeting_id = self.bot.meeting_index.meeting_for_voice_channel(voice_channel.id)
+            if meeting_id:
                 # Record the attendance event, ignoring duplicates
-                async with aiosqlite.connect(DATABASE_PATH) as db:
-                    await db.execute("INSERT OR IGNORE INTO attendance_log (meeting_id, user_id) VALUES (?, ?)",(meeting_id, member.id),)
-                    await db.commit()
+                self.attendance_buffer.add((meeting_id, member.id, now_ts()))
 
     @app_commands.command(
         name="attendance",
@@ -51,38 +33,31 @@ class AttendanceCog(commands.Cog):
     )
 
     @app_commands.describe(meeting_id="The id of the meeting to show attendance for")
-    @app_commands.guilds(GUILD_ID)
+    @app_commands.guild_only()
     async def attendance(self, interaction: discord.Interaction, meeting_id: int):
         guild = interaction.guild
         if guild is None:
             return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
         
         # Get meeting details from the database to get meeting name and voice channel id
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            async with db.execute("SELECT name, voice_channel_id FROM meetings WHERE id = ?", (meeting_id,)) as cursor:
-                meeting = await cursor.fetchone()
+        meeting = await self.bot.db.get_meeting(meeting_id, guild.id)
         
         if meeting is None:
             return await interaction.response.send_message(f"No meeting found with id {meeting_id}.", ephemeral=True)
         
-        meeting_name, voice_channel_id = meeting
+        meeting_name = meeting["name"]
         
         # Get opted-in user IDs from participants table
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            async with db.execute("SELECT user_id FROM participants WHERE meeting_id = ?", (meeting_id,)) as cursor:
-                rows = await cursor.fetchall()
-        opted_in_ids = [row[0] for row in rows]
+        opted_in_ids = await self.bot.db.participant_ids(meeting_id)
         
         if opted_in_ids:
             opted_in_list = "\n".join(f"<@{user_id}>" for user_id in opted_in_ids)
         else:
             opted_in_list = "No participants have opted in."
         
-        # Get users who have joined the voice channel
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            async with db.execute("SELECT user_id FROM attendance_log WHERE meeting_id = ?", (meeting_id,),) as cursor:
-                attendance_rows = await cursor.fetchall()
-        attendance_ids = [row[0] for row in attendance_rows]
+        # Get users who have joined the voice channel, including joins still waiting in the buffer
+        await self.attendance_buffer.flush()
+        attendance_ids = await self.bot.db.attendance_ids(meeting_id)
         attendance_list = "\n".join(f"<@{user_id}>" for user_id in attendance_ids) if attendance_ids else "No users have joined the voice channel."
         
 
@@ -1,54 +1,105 @@
-import discord
-import aiosqlite
+import discord, asyncio
 from discord.ext import commands
+from typing import Optional, Tuple
+from utils.rate_limiter import RateLimiter
+from utils.scheduler import DeadlineScheduler
+from utils.timeutils import now_ts
+
+EARLY_JOIN_SECONDS = 10 * 60  # Members joining the lobby up to this long before their meeting starts are moved right away
+MOVE_RATE = 10  # Member moves per second when a meeting starts and its whole lobby is moved
 
-AUTO_DRAG_VC_ID = 1346536904560082944
 
 class AutoDrag(commands.Cog):
-    def __init__(self, bot):
+    """
+    Moves members from the lobby voice channel (the guild's lobby_channel, see bot.guild_configs) into the voice channel of their meeting.
+
+    A member's meeting is found from memory in one step: their roles are intersected with the meeting roles in
+    bot.meeting_index, and of those meetings the live one (by bot.interval_index times) is picked; when several
+    are live, the one that started last wins. Someone joining the lobby is moved as soon as their meeting is
+    live. On top of that a DeadlineScheduler fires at every meeting's start time and moves everyone already
+    waiting in the lobby concurrently, paced by a RateLimiter. Members are only moved by the process holding
+    the lease of their guild's shard.
+    """
+
+    def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.scheduler = DeadlineScheduler(self.move_waiting_members)
+        self.limiter = RateLimiter(MOVE_RATE, 1)
+
+    async def cog_load(self):
+        now = now_ts()
+        for meeting_id, (start, _, _) in self.bot.interval_index.meetings.items():
+            if start > now:
+                self.scheduler.schedule(meeting_id, start)
+        self.scheduler.start()
+
+    def cog_unload(self):
+        self.scheduler.stop()
+
+    def live_meeting(self, member: discord.Member, now: int) -> Optional[Tuple[int, int]]:
+        """(meeting_id, voice_channel_id) of the member's live meeting, or None if none of their meetings is live."""
+        live = None
+        roles = self.bot.meeting_index.roles
+        for role_id in roles.keys() & {role.id for role in member.roles}:
+            meeting_id, voice_channel_id = roles[role_id]
+            times = self.bot.interval_index.meetings.get(meeting_id)
+            if voice_channel_id is None or times is None or not times[0] - EARLY_JOIN_SECONDS <= now < times[1]:
+                continue
+            if live is None or times[0] > live[0]:
+                live = (times[0], meeting_id, voice_channel_id)
+        return live[1:] if live else None
+
+    async def move(self, member: discord.Member, voice_channel_id: int):
+        meeting_vc = member.guild.get_channel(voice_channel_id)
+        if not isinstance(meeting_vc, discord.VoiceChannel):
+            return
+        await self.limiter.acquire()
+        try:
+            await member.move_to(meeting_vc)
+        except discord.Forbidden:
+            print(f"Bot lacks permission to move {member} to {meeting_vc.name}.")
+        except Exception as e:
+            print(f"Error moving {member}: {e}")
+
+    async def move_waiting_members(self, meeting_ids):
+        """Moves everyone waiting in the lobby whose live meeting is one of the meetings starting now."""
+        starting = set(meeting_ids)
+        lobbies = set()
+        for meeting_id in starting:
+            voice_channel_id = self.bot.meeting_index.meetings.get(meeting_id, (None, None))[0]
+            meeting_vc = self.bot.get_channel(voice_channel_id) if voice_channel_id else None
+            if meeting_vc is not None and self.bot.leases.owns_guild(meeting_vc.guild.id):
+                lobby_name = self.bot.guild_configs.get(meeting_vc.guild.id).lobby_channel
+                lobbies.add(discord.utils.get(meeting_vc.guild.voice_channels, name=lobby_name))
+
+        now = now_ts()
+        moves = []
+        for lobby in lobbies - {None}:
+            for member in lobby.members:
+                meeting = self.live_meeting(member, now)
+                if meeting is not None and meeting[0] in starting:
+                    moves.append(self.move(member, meeting[1]))
+        await asyncio.gather(*moves)
+
+    @commands.Cog.listener()
+    async def on_meeting_update(self, meeting_id: int):
+        times = self.bot.interval_index.meetings.get(meeting_id)
+        if times is not None and times[0] > now_ts():
+            self.scheduler.schedule(meeting_id, times[0])
+        else:
+            self.scheduler.cancel(meeting_id)
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
-        # Check if the user joined the auto-dragging VC
-        if after.channel and after.channel.id == AUTO_DRAG_VC_ID:
-            meeting_role = None
-            
-            # Identify which meeting role the user has (async loop to await DB check)
-            for role in member.roles:
-                if await self.is_meeting_role(role.id):
-                    meeting_role = role
-                    break  # Stop searching once we find a valid meeting role
-
-            if meeting_role is None:
-                return  # No valid meeting role found, do nothing
-
-            # Fetch the corresponding meeting voice channel from the database
-            async with aiosqlite.connect("database.db") as db:
-                async with db.execute(
-                    "SELECT voice_channel_id FROM meetings WHERE role_id = ?", (meeting_role.id,)
-                ) as cursor:
-                    row = await cursor.fetchone()
-                    if row is None:
-                        return  # Meeting not found in DB
-
-                    meeting_vc_id = row[0]
-
-            # Fetch the meeting voice channel and move the user
-            meeting_vc = member.guild.get_channel(meeting_vc_id)
-            if meeting_vc and isinstance(meeting_vc, discord.VoiceChannel):
-                try:
-                    await member.move_to(meeting_vc)
-                except discord.Forbidden:
-                    print(f"Bot lacks permission to move {member} to {meeting_vc.name}.")
-                except Exception as e:
-                    print(f"Error moving {member}: {e}")
-
-    async def is_meeting_role(self, role_id: int) -> bool:
-        """Check if the role ID exists in the meetings table."""
-        async with aiosqlite.connect("database.db") as db:
-            async with db.execute("SELECT 1 FROM meetings WHERE role_id = ?", (role_id,)) as cursor:
-                return await cursor.fetchone() is not None
+        # Only react to members joining the lobby
+        if after.channel is None or before.channel == after.channel or not self.bot.leases.owns_guild(member.guild.id):
+            return
+        if after.channel.name != self.bot.guild_configs.get(member.guild.id).lobby_channel:
+            return
+        meeting = self.live_meeting(member, now_ts())
+        if meeting is not None:
+            await self.move(member, meeting[1])
+
 
 async def setup(bot):
     await bot.add_cog(AutoDrag(bot))
@@ -1,9 +1,8 @@
-import discord, os, aiosqlite
+import discord
 from discord import app_commands
 from discord.ext import commands
-
-GUILD_ID = discord.Object(id=os.getenv("GUILD_ID"))
-DATABASE_PATH = "database.db"
+from typing import Optional
+from utils.timeutils import day_bounds, discord_timestamp
 
 
 class CancelMeetingCog(commands.Cog):
@@ -14,88 +13,91 @@ class CancelMeetingCog(commands.Cog):
         name="cancel_meeting",
         description="Cancels a meeting: updates status, cleans up channels/role, and message in the forum post.",
     )
-    @app_commands.describe(meeting_id="The id of the meeting to cancel")
-    @app_commands.guilds(GUILD_ID)
-    async def cancel_meeting(self, interaction: discord.Interaction, meeting_id: int):
+    @app_commands.describe(
+        meeting_id="The id of the meeting to cancel",
+        occurrence="Recurring meetings only: date of the one occurrence to cancel (e.g., M/D/YY), or leave out to cancel the whole series",
+    )
+    @app_commands.guild_only()
+    async def cancel_meeting(self, interaction: discord.Interaction, meeting_id: int, occurrence: Optional[str] = None):
         guild = interaction.guild
         if guild is None:
             return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
 
         # retrieve meeting details using the meeting id.
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            async with db.execute("SELECT id, name, voice_channel_id, thread_id, role_id, status FROM meetings WHERE id = ?", (meeting_id,)) as cursor:
-                row = await cursor.fetchone()
+        row = await self.bot.db.get_meeting(meeting_id, guild.id)
 
         if row is None:
             return await interaction.response.send_message(f"Meeting with id: '{meeting_id}' not found.", ephemeral=True)
 
-        meeting_id_db, name, voice_channel_id, thread_id, role_id, status = row
+        name, status = row["name"], row["status"]
+        text_channel_id, voice_channel_id, thread_id, role_id = row["text_channel_id"], row["voice_channel_id"], row["thread_id"], row["role_id"]
         if status == "cancelled":
             return await interaction.response.send_message(f"The meeting '{name}' is already cancelled.", ephemeral=True)
 
-        # Update the meeting status to 'cancelled' in the database.
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            await db.execute("UPDATE meetings SET status = 'cancelled', updated_at = strftime('%s','now') WHERE id = ?", (meeting_id,))
-            await db.commit()
-
-        # delete text channel
-        text_channel_name = f"{name.lower().replace(' ', '-')}-text"
-        text_channel = discord.utils.get(guild.text_channels, name=text_channel_name)
-        if text_channel:
-            try:
-                await text_channel.delete(reason="Meeting cancelled")
-            except Exception as e:
-                print(f"Error deleting text channel '{text_channel.name}': {e}")
-
-        # delete voice channel
-        voice_channel = guild.get_channel(voice_channel_id)
-        if voice_channel:
-            try:
-                await voice_channel.delete(reason="Meeting cancelled")
-            except Exception as e:
-                print(f"Error deleting voice channel: {e}")
+        if occurrence is not None:
+            return await self.cancel_occurrence(interaction, row, occurrence)
 
-        # delete role
-        meeting_role = guild.get_role(role_id)
-        if meeting_role:
-            try:
-                await meeting_role.delete(reason="Meeting cancelled")
-            except Exception as e:
-                print(f"Error deleting meeting role: {e}")
-
-        # Get the forum post channel
-        thread_channel = guild.get_channel(thread_id)
-        if thread_channel is None:
-            try:
-                thread_channel = await self.bot.fetch_channel(thread_id)
-            except Exception as e:
-                print(f"Error fetching thread channel: {e}")
-
-        # send message to forum thread
-        if thread_channel and isinstance(thread_channel, discord.Thread):
+        # Update the meeting status to 'cancelled' in the database.
+        await self.bot.db.set_meeting_status(meeting_id, "cancelled")
+        self.bot.meeting_index.remove(meeting_id)
+        self.bot.interval_index.remove_meeting(meeting_id)
+        self.bot.dispatch("meeting_update", meeting_id)
+
+        # The channels, role and forum post are handled by background jobs (see cogs/teardown.py), which retry until done.
+        teardown = {"guild_id": guild.id, "meeting_id": meeting_id, "reason": "Meeting cancelled"}
+        jobs = []
+        for channel_id in (text_channel_id, voice_channel_id):
+            if channel_id:
+                jobs.append((f"delete_channel:{channel_id}", "delete_channel", {**teardown, "channel_id": channel_id}, meeting_id))
+        if role_id:
+            jobs.append((f"delete_role:{role_id}", "delete_role", {**teardown, "role_id": role_id}, meeting_id))
+        if thread_id:
+            notice = "**Cancellation Notice:** This meeting has been cancelled."
+            jobs.append((f"thread_notice:{thread_id}:cancelled", "thread_notice", {**teardown, "thread_id": thread_id, "message": notice}, meeting_id))
+        await self.bot.jobs.enqueue(jobs)
+
+        # The role that reached participants is going away, so tell them directly.
+        participants = await self.bot.db.participant_ids(meeting_id)
+        self.bot.notifier.notify_many(participants, f"meeting:{meeting_id}", f"The meeting **{name}** you opted into has been cancelled.")
+
+        await interaction.response.send_message(
+            f"Meeting {name} (id: {meeting_id}) has been cancelled. Its channels and role are being removed and a notice will be posted in the forum.",
+            ephemeral=True,
+        )
+
+    async def cancel_occurrence(self, interaction: discord.Interaction, row, occurrence: str):
+        """Cancels one occurrence of a recurring meeting, keeping the series and its channels and role."""
+        meeting_id, name = row["id"], row["name"]
+        if not row["recurrence"] or row["status"] != "scheduled":
+            return await interaction.response.send_message(f"The meeting '{name}' is not a scheduled recurring meeting.", ephemeral=True)
+
+        try:
+            cancelled = await self.bot.db.find_occurrence(meeting_id, *day_bounds(occurrence))
+        except ValueError as e:
+            return await interaction.response.send_message(str(e), ephemeral=True)
+        if cancelled is None or cancelled["status"] == "cancelled":
+            return await interaction.response.send_message(f"The meeting '{name}' has no occurrence planned on {occurrence}.", ephemeral=True)
+
+        # The recurring meetings cog moves the meeting on to its next occurrence if this was the current one.
+        await self.bot.db.cancel_occurrence(meeting_id, cancelled["original_start"])
+        self.bot.dispatch("meeting_update", meeting_id)
+
+        notice = f"**Cancellation Notice:** The occurrence of this meeting on {discord_timestamp(cancelled['start_time'])} has been cancelled."
+        thread_channel = interaction.guild.get_channel_or_thread(row["thread_id"])
+        if thread_channel:
             try:
-                if thread_channel.archived and guild.me.guild_permissions.manage_threads:
-                    try:
-                        await thread_channel.edit(archived=False)
-                    except:
-                        pass
-                if thread_channel.archived:
-                    await thread_channel.edit(archived=False)
-                cancellation_message = f"**Cancellation Notice:** This meeting has been cancelled."
-                await thread_channel.send(cancellation_message)
+                await thread_channel.send(notice)
             except Exception as e:
                 print(f"Error sending cancellation message in thread: {e}")
 
-            # Archive the thread so it moves to older posts
-            if guild.me.guild_permissions.manage_threads:
-                try:
-                    await thread_channel.edit(archived=True)
-                except Exception as e:
-                    print(f"Failed to archive thread: {e}")
-        else:
-            print("Thread channel not found or not a thread.")
+        participants = await self.bot.db.participant_ids(meeting_id)
+        self.bot.notifier.notify_many(
+            participants, f"meeting:{meeting_id}", f"The {discord_timestamp(cancelled['start_time'])} occurrence of **{name}** has been cancelled."
+        )
 
-        await interaction.response.send_message(f"Meeting {name} (id: {meeting_id}) has been cancelled and a notice has been posted in the forum.", ephemeral=True)
+        await interaction.response.send_message(
+            f"The {discord_timestamp(cancelled['original_start'], 'D')} occurrence of {name} (id: {meeting_id}) has been cancelled.", ephemeral=True
+        )
 
 
 async def setup(bot: commands.Bot):
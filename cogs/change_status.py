@@ -1,12 +1,7 @@
 import discord
-import os
-import aiosqlite
 from discord import app_commands
 from discord.ext import commands
 
-GUILD_ID = discord.Object(id=os.getenv("GUILD_ID"))
-DATABASE_PATH = "database.db"
-
 
 class ChangeStatusCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -24,7 +19,7 @@ class ChangeStatusCog(commands.Cog):
         ]
 
     )
-    @app_commands.guilds(GUILD_ID)
+    @app_commands.guild_only()
     async def availability(self, interaction: discord.Interaction, current_status: str):
         guild = interaction.guild
         if guild is None:
@@ -34,15 +29,7 @@ class ChangeStatusCog(commands.Cog):
         
         
         try:
-            async with aiosqlite.connect(DATABASE_PATH) as db:
-                await db.execute(
-                    """
-                    INSERT INTO participants (user_id, current_status)
-                    VALUES (?,?)
-                    """,
-                    (user_id, current_status),
-                )
-                await db.commit()
+            await self.bot.db.set_participant_status(guild.id, user_id, current_status)
             
             await interaction.response.send_message(
             f"{interaction.user.mention} is now {current_status}!",
@@ -0,0 +1,68 @@
+import asyncio, discord
+from discord.ext import commands
+
+POOL_REFILL_INTERVAL_SECONDS = 20  # Rate budget: at most one pooled set (3 creations) per interval, leaving room for live /create calls
+POOL_CHECK_INTERVAL_SECONDS = 60 * 60  # Re-check the pool this often even if nothing was taken from it
+
+
+class ChannelPoolCog(commands.Cog):
+    """
+    Keeps the warm pool of meeting roles and channels (bot.channel_pool) topped up in the background.
+
+    /create dispatches a `channel_pool_take` event whenever it uses the pool, which wakes the refill loop.
+    Sets are provisioned one at a time, spaced out by POOL_REFILL_INTERVAL_SECONDS so a refill never competes
+    with a burst of meeting creation for Discord's rate limits. Only guilds on shards this process holds the
+    lease of are refilled.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.refill_wanted = asyncio.Event()
+        self.refill_task = None
+
+    async def cog_load(self):
+        if self.bot.channel_pool.size > 0:
+            self.refill_task = asyncio.create_task(self.refill_loop())
+
+    def cog_unload(self):
+        if self.refill_task is not None:
+            self.refill_task.cancel()
+
+    @commands.Cog.listener()
+    async def on_channel_pool_take(self, guild_id: int):
+        self.refill_wanted.set()
+
+    @commands.Cog.listener()
+    async def on_lease_acquired(self, name: str):
+        self.refill_wanted.set()
+
+    async def refill_loop(self):
+        await self.bot.wait_until_ready()
+        while True:
+            self.refill_wanted.clear()
+            for guild in self.bot.guilds:
+                if not self.bot.leases.owns_guild(guild.id):
+                    continue
+                try:
+                    await self.refill(guild)
+                except Exception as e:
+                    print(f"Error refilling the meeting channel pool for guild {guild.id}: {e}")
+            try:
+                await asyncio.wait_for(self.refill_wanted.wait(), POOL_CHECK_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def refill(self, guild: discord.Guild):
+        config = self.bot.guild_configs.get(guild.id)
+        meetings_category = config.get_meetings_category(guild)
+        bot_role = config.get_bot_role(guild)
+        if meetings_category is None or bot_role is None:
+            return
+
+        for _ in range(await self.bot.channel_pool.missing(guild)):
+            await self.bot.channel_pool.add(guild, meetings_category, bot_role)
+            await asyncio.sleep(POOL_REFILL_INTERVAL_SECONDS)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(ChannelPoolCog(bot))
@@ -1,9 +1,7 @@
-import discord, os, aiosqlite, asyncio
+import discord
 from discord import app_commands
 from discord.ext import commands
 
-GUILD_ID = discord.Object(id=(int(os.getenv("GUILD_ID"))))  # Ensure GUILD_ID is an integer
-DATABASE_PATH = "database.db"
 
 class CleanupCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -14,76 +12,42 @@ class CleanupCog(commands.Cog):
         description="Cleans up a meeting by deleting its resources.",
     )
     @app_commands.describe(meeting_id="The ID of the meeting to clean up")
-    @app_commands.guilds(GUILD_ID)
+    @app_commands.guild_only()
     async def cleanup_meeting(self, interaction: discord.Interaction, meeting_id: int):
         guild = interaction.guild
         if guild is None:
             return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
 
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            cursor = await db.execute("SELECT name, voice_channel_id, role_id, thread_id FROM meetings WHERE id = ?", (meeting_id,))
-            meeting_data = await cursor.fetchone()
-
-            if not meeting_data:
-                return await interaction.response.send_message("Meeting not found.", ephemeral=True)
-
-            name, voice_channel_id, role_id, thread_id = meeting_data
-            expected_name = f"{name.lower().replace(' ', '-')}-text"
-
-            # Delete voice channel
-            if voice_channel_id:
-                voice_channel = guild.get_channel(voice_channel_id)
-                if voice_channel:
-                    await voice_channel.delete()
-
-            # Delete role
-            if role_id:
-                role = guild.get_role(role_id)
-                if role:
-                    await role.delete()
-
-            # Move text channel to "Meeting Archive"
-            meetings_archive_category = discord.utils.get(guild.categories, name="Meeting Archive")
-            if not meetings_archive_category:
-                return await interaction.response.send_message("The 'Meeting Archive' category does not exist.", ephemeral=True)
-            
-            meeting_text_channel = discord.utils.get(guild.text_channels, name=expected_name)
-            if meeting_text_channel:
-                try:
-                    # Send archive message
-                    await meeting_text_channel.send("This meeting has been archived and moved to the Meeting Archive.")
-                    await meeting_text_channel.edit(category=meetings_archive_category)
-                except Exception as e:
-                    print(f"Error moving text channel: {e}")
-
-            # Get the forum post channel
-            thread_channel = guild.get_channel(thread_id)
-            if thread_channel is None:
-                try:
-                    thread_channel = await self.bot.fetch_channel(thread_id)
-                except Exception as e:
-                    print(f"Error fetching thread channel: {e}")
-
-            # Send message to forum thread
-            if thread_channel and isinstance(thread_channel, discord.Thread):
-                try:
-                    archive_message = "**This meeting is now archived. No further discussion is expected.**"
-                    await thread_channel.send(archive_message)
-        
-                    # Re-archive and lock the thread after sending the message
-                    await thread_channel.edit(archived=True, locked=True)
-
-                except Exception as e:
-                    print(f"Error sending archive message in thread: {e}")
-            else:
-                print("Thread channel not found or not a thread.")
-
-
-            # Delete meeting entry from database
-            await db.execute("UPDATE meetings SET status = 'completed', updated_at = strftime('%s','now') WHERE id = ?", (meeting_id,))
-            await db.commit()
-
-        await interaction.response.send_message(f"Meeting {meeting_id} cleaned up successfully.", ephemeral=True)
+        meeting_data = await self.bot.db.get_meeting(meeting_id, guild.id)
+
+        if not meeting_data:
+            return await interaction.response.send_message("Meeting not found.", ephemeral=True)
+
+        text_channel_id, voice_channel_id = meeting_data["text_channel_id"], meeting_data["voice_channel_id"]
+        role_id, thread_id = meeting_data["role_id"], meeting_data["thread_id"]
+
+        # Delete meeting entry from database
+        await self.bot.db.set_meeting_status(meeting_id, "completed")
+        self.bot.meeting_index.remove(meeting_id)
+        self.bot.interval_index.remove_meeting(meeting_id)
+        self.bot.dispatch("meeting_update", meeting_id)
+
+        # Each step is its own background job (see cogs/teardown.py), retried with increasing delays. A step that keeps
+        # failing (e.g. no archive category, see /server_config) is given up on after a while; running /cleanup again retries it.
+        teardown = {"guild_id": guild.id, "meeting_id": meeting_id, "reason": "Meeting cleaned up"}
+        jobs = []
+        if voice_channel_id:
+            jobs.append((f"delete_channel:{voice_channel_id}", "delete_channel", {**teardown, "channel_id": voice_channel_id}, meeting_id))
+        if role_id:
+            jobs.append((f"delete_role:{role_id}", "delete_role", {**teardown, "role_id": role_id}, meeting_id))
+        if text_channel_id:
+            jobs.append((f"archive_text_channel:{text_channel_id}", "archive_text_channel", {**teardown, "channel_id": text_channel_id}, meeting_id))
+        if thread_id:
+            notice = "**This meeting is now archived. No further discussion is expected.**"
+            jobs.append((f"thread_notice:{thread_id}:archived", "thread_notice", {**teardown, "thread_id": thread_id, "message": notice, "lock": True}, meeting_id))
+        await self.bot.jobs.enqueue(jobs)
+
+        await interaction.response.send_message(f"Meeting {meeting_id} is being cleaned up. Use /job_status to follow along.", ephemeral=True)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(CleanupCog(bot))
@@ -1,95 +1,133 @@
-import discord, os, aiosqlite
+import asyncio
 from discord.ext import commands, tasks
-from datetime import datetime, timedelta
 from collections import defaultdict
+from datetime import datetime, timedelta
+from utils.intervals import Interval, find_conflict_groups
+from utils.timeutils import from_timestamp, to_timestamp
+
+CHANGE_DEBOUNCE_SECONDS = 2  # Coalesce bursts of opt-ins/changes into one check
+RECONCILE_INTERVAL_HOURS = 1  # Full scan of every user as a safety net for missed events
+CONFLICT_TOPIC = "conflicts"  # Notifier topic; users get a new DM only when their conflicts change
+CONFLICT_LEASE = "conflicts"  # Only the process holding this lease runs the full scan
+
+def format_conflict_group(group, meeting_names: dict) -> str:
+    """Formats one group of overlapping meetings for the DM, converting their timestamps to local time."""
+    lines = []
+    for interval in group:
+        start = from_timestamp(interval.start)
+        end = from_timestamp(interval.end)
+        lines.append(f"• Meeting **{meeting_names[interval.key]}** starts at {start.strftime('%m-%d-%Y %I:%M %p')} and ends at {end.strftime('%I:%M %p')}\n")
+    return "".join(lines)
 
-GUILD_ID = discord.Object(id=os.getenv("GUILD_ID"))
-DEFAULT_DURATION_MINUTES = 60  # default meeting duration since none is provided **NEED TO CHANGE WHEN DURATION IS ADDED TO MEETING CREATION**
 
 class ConflictCheckerCog(commands.Cog):
+    """
+    Notifies users via DM when meetings they are opted into overlap.
+
+    Conflicts are checked incrementally: opting in or out (the `participants_update` event) and meeting
+    changes (the `meeting_update` event) mark only the affected users, who are re-checked together a moment
+    later with one query. A full scan of every user still runs every hour in case an event was missed, in the
+    one process holding the "conflicts" lease. DMs go through bot.notifier, which only sends a user's latest
+    conflicts and skips unchanged ones. Daily digest subscribers only get DMs about conflicts on later days,
+    since the digest lists the day's overlaps.
+    """
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.notified_conflicts = {}  # {user_id: (timestamp, conflict_set)}
+        self.pending_users = set()  # Users whose meetings changed and still need to be re-checked
+        self.pending_task = None
+        self.bot.leases.want(CONFLICT_LEASE)
         self.check_conflicts_loop.start()
-    
+
     def cog_unload(self):
         self.check_conflicts_loop.cancel()
-    
-    @tasks.loop(minutes=1)
+        if self.pending_task is not None:
+            self.pending_task.cancel()
+
+    def mark_users(self, user_ids):
+        """Queues users for a conflict re-check."""
+        self.pending_users.update(user_ids)
+        if self.pending_users and (self.pending_task is None or self.pending_task.done()):
+            self.pending_task = asyncio.create_task(self.check_pending_users())
+
+    async def check_pending_users(self):
+        await asyncio.sleep(CHANGE_DEBOUNCE_SECONDS)
+        await self.bot.wait_until_ready()
+        while self.pending_users:
+            user_ids = list(self.pending_users)
+            self.pending_users.clear()
+            try:
+                rows = await self.bot.db.scheduled_participations(user_ids)
+                await self.check_users(user_ids, rows)
+            except Exception as e:
+                print(f"Error checking conflicts for {len(user_ids)} user(s): {e}")
+
+    @commands.Cog.listener()
+    async def on_participants_update(self, meeting_id: int, user_id: int):
+        self.mark_users([user_id])
+
+    @commands.Cog.listener()
+    async def on_meeting_update(self, meeting_id: int):
+        self.mark_users(await self.bot.db.participant_ids(meeting_id))
+
+    @commands.Cog.listener()
+    async def on_lease_acquired(self, name: str):
+        if name == CONFLICT_LEASE:
+            self.check_conflicts_loop.restart()  # Scan right away instead of up to an hour after a takeover
+
+    @tasks.loop(hours=RECONCILE_INTERVAL_HOURS)
     async def check_conflicts_loop(self):
         """
         checks for scheduling conflicts for all users in the background.
-        if conflicts are found or change, the user is notified via DM.
+        also re-checks users with an outstanding notification so resolved conflicts are cleared.
+        """
+        if not self.bot.leases.holds(CONFLICT_LEASE):
+            return
+        # other processes may have sent conflict DMs since, so start from the stored fingerprints
+        await self.bot.notifier.load()
+        rows = await self.bot.db.scheduled_participations()
+        user_ids = {row[0] for row in rows} | self.bot.notifier.notified_users(CONFLICT_TOPIC)
+        await self.check_users(user_ids, rows)
+
+    async def check_users(self, user_ids, rows):
+        """
+        checks the given users for scheduling conflicts using their scheduled meetings in `rows`.
+        if conflicts are found or change, a DM is queued for the user.
         """
-        async with aiosqlite.connect("database.db") as db:
-            cursor = await db.execute(
-                "SELECT DISTINCT p.user_id, m.id, m.name, m.date_time, m.duration FROM meetings m "
-                "INNER JOIN participants p ON m.id = p.meeting_id WHERE m.status = 'scheduled'"
-            )
-            rows = await cursor.fetchall()
-        
-        # group meetings by user_id
-        user_meetings = defaultdict(dict)
+        # group meeting intervals by user_id
+        user_intervals = defaultdict(list)
+        meeting_names = {}
         for row in rows:
-            user_id, meeting_id, name, date_time_str, duration = row
-            try:
-                start_time = datetime.strptime(date_time_str, "%Y-%m-%d %H:%M:%S")
-            except Exception:
-                continue
-            if not duration or duration == 0:
-                duration = DEFAULT_DURATION_MINUTES
-            end_time = start_time + timedelta(minutes=duration)
-            user_meetings[user_id][meeting_id] = {"meeting_id": meeting_id, "name": name, "start_time": start_time, "end_time": end_time}
-        
+            user_id, meeting_id, name, start_time, end_time = row
+            user_intervals[user_id].append(Interval(start_time, end_time, meeting_id))
+            meeting_names[meeting_id] = name
+
+        # daily digest subscribers see today's conflicts in the digest instead
+        digest_subscribers = set(await self.bot.db.digest_subscribers(user_ids))
+        day_end = to_timestamp(datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time()))
+
         # check for overlapping meetings for each user
-        for user_id, meetings_dict in user_meetings.items():
-            meetings = list(meetings_dict.values())
-            if len(meetings) < 2:
+        for user_id in user_ids:
+            intervals = user_intervals.get(user_id, [])
+            if len(intervals) < 2:
                 # clear any stored conflict if no conflict is possible now.
-                self.notified_conflicts.pop(user_id, None)
+                await self.bot.notifier.clear(user_id, CONFLICT_TOPIC)
                 continue
-            
-            # find meetings that conflict
-            meetings.sort(key=lambda m: m["start_time"])
-            conflict_entries = []
-            for i in range(len(meetings)):
-                for j in range(i + 1, len(meetings)):
-                    a = meetings[i]
-                    b = meetings[j]
-                    # Check if meeting a conflicts with meeting b
-                    if a["end_time"] > b["start_time"]:
-                        entry = (
-                            f"• Meeting **{a['name']}** starts at {a['start_time'].strftime('%m-%d-%Y %I:%M %p')} and ends at {a['end_time'].strftime('%I:%M %p')}\n"
-                            f"• Meeting **{b['name']}** starts at {b['start_time'].strftime('%m-%d-%Y %I:%M %p')} and ends at {b['end_time'].strftime('%I:%M %p')}\n"
-                        )
-                        conflict_entries.append(entry)
-            
+
+            # find groups of meetings that overlap each other in one sweep
+            groups = find_conflict_groups(intervals)
+            if user_id in digest_subscribers:
+                groups = [group for group in groups if group[0].start >= day_end]
+            conflict_entries = [format_conflict_group(group, meeting_names) for group in groups]
+
             if conflict_entries:
                 new_conflict_message = "⚠️ **Scheduling Conflict Detected!** ⚠️\nYou have overlapping meetings:\n" + "\n".join(conflict_entries)
-                now_ts = datetime.now().timestamp()
-
-                # notify if haven't, message has changed, or its been over 15 min
-                if (
-                    user_id not in self.notified_conflicts or
-                    self.notified_conflicts[user_id][1] != new_conflict_message or
-                    now_ts - self.notified_conflicts[user_id][0] > 15 * 60
-                ):
-                    user = self.bot.get_user(user_id)
-                    if not user:
-                        try:
-                            user = await self.bot.fetch_user(user_id)
-                        except Exception as e:
-                            print(f"Could not fetch user {user_id}: {e}")
-                            continue
-                    try:
-                        await user.send(new_conflict_message)
-                        self.notified_conflicts[user_id] = (now_ts, new_conflict_message)
-                    except Exception as e:
-                        print(f"Failed to send conflict notification to user {user_id}: {e}")
+                # only sent if it differs from the last conflict DM the user got
+                self.bot.notifier.notify(user_id, CONFLICT_TOPIC, new_conflict_message, dedupe=True)
             else:
                 # no conflicts
-                self.notified_conflicts.pop(user_id, None)
-    
+                await self.bot.notifier.clear(user_id, CONFLICT_TOPIC)
+
     @check_conflicts_loop.before_loop
     async def before_check_conflicts(self):
         await self.bot.wait_until_ready()
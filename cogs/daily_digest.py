@@ -0,0 +1,102 @@
+import discord, itertools
+from discord import app_commands
+from discord.ext import commands, tasks
+from datetime import datetime, timedelta
+from typing import Optional
+from utils.intervals import Interval, find_conflict_groups
+from utils.timeutils import now_ts, to_timestamp, discord_timestamp
+
+DIGEST_TOPIC = "digest"
+DIGEST_CHECK_MINUTES = 5  # How often due digests are looked for; a digest goes out within this long after its hour
+DIGEST_BATCH_SIZE = 50  # Digests queued (and marked as sent) per batch
+MAX_DIGEST_ITEMS = 15  # Meetings/changes listed per section
+DIGEST_LEASE = "digests"  # Only the process holding this lease sends digests
+
+
+def format_digest(rows, now: int, day_end: int) -> Optional[str]:
+    """Builds one user's digest from their due_digests() rows, or returns None if there is nothing to report."""
+    today = [row for row in rows if row["id"] is not None and row["status"] == "scheduled" and row["start_time"] < day_end and row["end_time"] > now]
+    changes = [row for row in rows if row["id"] is not None and row["changed"]]
+    if not today and not changes:
+        return None
+
+    lines = ["📅 **Your daily meeting digest**"]
+    if today:
+        lines.append("\n**Today:**")
+        lines.extend(
+            f"• **{row['name']}** {discord_timestamp(row['start_time'], 't')} - {discord_timestamp(row['end_time'], 't')}"
+            for row in today[:MAX_DIGEST_ITEMS]
+        )
+        names = {row["id"]: row["name"] for row in today}
+        conflicts = find_conflict_groups(Interval(row["start_time"], row["end_time"], row["id"]) for row in today)
+        if conflicts:
+            lines.append("\n⚠️ **Overlapping:**")
+            lines.extend("• " + ", ".join(f"**{names[interval.key]}**" for interval in group) for group in conflicts)
+    if changes:
+        lines.append("\n**Changed since yesterday:**")
+        lines.extend(
+            f"• **{row['name']}** was cancelled" if row["status"] == "cancelled"
+            else f"• **{row['name']}** is now at {discord_timestamp(row['start_time'], 'f')}"
+            for row in changes[:MAX_DIGEST_ITEMS]
+        )
+    return "\n".join(lines)
+
+
+class DailyDigestCog(commands.Cog):
+    """
+    Sends subscribed users one DM a day, at the hour they chose, with the rest of the day's meetings, their
+    overlaps and the meetings that changed since the day before.
+
+    Every few minutes, the digests of all users whose hour has come are built from a single query, grouped by
+    user, and queued on bot.notifier in batches; each batch is marked as sent for the day, so a restart never
+    sends a digest twice. Only the process holding the "digests" lease sends them. Subscribers get the day's
+    conflict warnings in the digest instead of as separate DMs; conflicts on later days are still sent as DMs.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.bot.leases.want(DIGEST_LEASE)
+        self.send_digests.start()
+
+    def cog_unload(self):
+        self.send_digests.cancel()
+
+    @tasks.loop(minutes=DIGEST_CHECK_MINUTES)
+    async def send_digests(self):
+        if not self.bot.leases.holds(DIGEST_LEASE):
+            return
+        now = now_ts()
+        local_now = datetime.now()
+        day_end = to_timestamp(datetime.combine(local_now.date() + timedelta(days=1), datetime.min.time()))
+        rows = await self.bot.db.due_digests(local_now.hour, local_now.date().isoformat(), now, day_end, now - 86400)
+
+        users = [(user_id, list(user_rows)) for user_id, user_rows in itertools.groupby(rows, key=lambda row: row["user_id"])]
+        for i in range(0, len(users), DIGEST_BATCH_SIZE):
+            batch = users[i:i + DIGEST_BATCH_SIZE]
+            for user_id, user_rows in batch:
+                message = format_digest(user_rows, now, day_end)
+                if message is not None:
+                    self.bot.notifier.notify(user_id, DIGEST_TOPIC, message)
+            await self.bot.db.mark_digests_sent([user_id for user_id, _ in batch], local_now.date().isoformat())
+
+    @send_digests.before_loop
+    async def before_send_digests(self):
+        await self.bot.wait_until_ready()
+
+    @app_commands.command(
+        name="daily_digest",
+        description="Get one DM a day summarizing your meetings, overlaps and changes. Leave the hour out to stop.",
+    )
+    @app_commands.describe(hour="Hour of the day to send the digest at (0-23, server time)")
+    async def daily_digest(self, interaction: discord.Interaction, hour: Optional[app_commands.Range[int, 0, 23]] = None):
+        await self.bot.db.set_digest_hour(interaction.user.id, hour)
+        if hour is None:
+            return await interaction.response.send_message("You will no longer receive a daily digest.", ephemeral=True)
+        await interaction.response.send_message(
+            f"You will receive a daily digest at {hour:02}:00 (server time). Today's scheduling conflicts will be included in it instead of sent separately.",
+            ephemeral=True,
+        )
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(DailyDigestCog(bot))
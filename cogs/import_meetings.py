@@ -0,0 +1,185 @@
+import discord, io, asyncio
+from collections import defaultdict
+from discord import app_commands
+from discord.ext import commands
+from cogs.create_meeting import meeting_embed
+from utils.channel_pool import create_meeting_resources, delete_resources
+from utils.importer import read_meetings
+from utils.leases import lease_shard
+from utils.meeting_buttons import meeting_buttons
+from utils.rate_limiter import RateLimiter
+
+PROVISION_WORKERS = 4  # Meetings provisioned concurrently
+PROVISION_RATE = 1  # Meetings started per second (each costs a role, two channels and a forum post)
+PROGRESS_INTERVAL_SECONDS = 3  # How often the import message is edited with progress
+MAX_REPORTED_ERRORS = 10
+
+
+class ImportProgress:
+    """Counts the provisioned meetings of one import so the command can report on them."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.provisioned = 0
+        self.failed = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.provisioned + self.failed >= self.total
+
+
+class ImportMeetingsCog(commands.Cog):
+    """
+    Bulk-imports meetings from a CSV or iCalendar file.
+
+    Every meeting in the file is validated first and then inserted in one transaction, so an import either
+    fully succeeds or stores nothing. Roles, channels and forum posts are created afterwards by a small pool
+    of workers fed from a queue and paced by a RateLimiter, while the command's message shows progress.
+    Meetings imported offline (python -m utils.importer) are picked up by the same queue on startup, by the
+    process holding the lease of their guild's shard.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.queue = asyncio.Queue()
+        self.queued = set()  # Meeting ids waiting in or being handled by the queue
+        self.limiter = RateLimiter(PROVISION_RATE, 1)
+        self.tasks = []
+
+    async def cog_load(self):
+        self.tasks = [asyncio.create_task(self.provision_worker()) for _ in range(PROVISION_WORKERS)]
+        self.tasks.append(asyncio.create_task(self.resume_unprovisioned()))
+
+    def cog_unload(self):
+        for task in self.tasks:
+            task.cancel()
+
+    def enqueue(self, guild: discord.Guild, meetings, progress: ImportProgress):
+        for meeting in meetings:
+            if meeting["id"] not in self.queued:
+                self.queued.add(meeting["id"])
+                self.queue.put_nowait((guild, meeting, progress))
+
+    async def resume_unprovisioned(self):
+        """Provisions meetings that were imported offline or whose import was interrupted."""
+        await self.bot.wait_until_ready()
+        by_guild = defaultdict(list)
+        for meeting in await self.bot.db.unprovisioned_meetings():
+            by_guild[meeting["guild_id"]].append(meeting)
+        for guild_id, meetings in by_guild.items():
+            guild = self.bot.get_guild(guild_id) if guild_id else None
+            if guild is not None and self.bot.leases.owns_guild(guild_id):
+                print(f"Provisioning {len(meetings)} imported meeting(s) in {guild.name}.")
+                self.enqueue(guild, meetings, ImportProgress(len(meetings)))
+
+    @commands.Cog.listener()
+    async def on_lease_acquired(self, name: str):
+        if lease_shard(name) is not None:
+            await self.resume_unprovisioned()
+
+    async def provision_worker(self):
+        await self.bot.wait_until_ready()
+        while True:
+            guild, meeting, progress = await self.queue.get()
+            try:
+                await self.limiter.acquire()
+                await self.provision(guild, meeting)
+                progress.provisioned += 1
+            except Exception as e:
+                print(f"Error provisioning imported meeting {meeting['id']}: {e}")
+                progress.failed += 1
+            finally:
+                self.queued.discard(meeting["id"])
+                self.queue.task_done()
+
+    async def provision(self, guild: discord.Guild, meeting):
+        """Creates the role, channels and forum post of an imported meeting, like /create does."""
+        config = self.bot.guild_configs.get(guild.id)
+        meetings_category = config.get_meetings_category(guild)
+        meeting_list_forum = config.get_meeting_forum(guild)
+        bot_role = config.get_bot_role(guild)
+        if meeting_list_forum is None or bot_role is None:
+            raise RuntimeError(f"The '{config.meetings_category}' category, '{config.meeting_forum}' forum or '{config.bot_role}' role is missing.")
+
+        meeting_id, title = meeting["id"], meeting["name"]
+        resources = await create_meeting_resources(guild, meetings_category, bot_role, f"Meeting: {title}", title.lower().replace(" ", "-"))
+        meeting_role, meeting_text_channel, meeting_voice_channel = resources
+
+        reminder_offsets = await self.bot.db.meeting_reminder_offsets(meeting_id)
+        embed = meeting_embed(
+            meeting_id, title, meeting["description"], meeting["start_time"], meeting["duration"], meeting["recurrence"],
+            reminder_offsets, meeting_text_channel, meeting_voice_channel,
+        )
+        try:
+            post_message = await meeting_list_forum.create_thread(name=title, embed=embed, view=meeting_buttons(meeting_id))
+        except Exception:
+            await delete_resources(resources, "Meeting creation failed")
+            raise
+
+        await self.bot.db.set_meeting_resources(meeting_id, meeting_text_channel.id, meeting_voice_channel.id, meeting_role.id, post_message.thread.id)
+        self.bot.meeting_index.add(meeting_id, meeting_voice_channel.id, meeting_role.id)
+        self.bot.interval_index.set_meeting(meeting_id, meeting["start_time"], meeting["end_time"], title)
+        self.bot.dispatch("meeting_update", meeting_id)
+
+    @app_commands.command(
+        name="import_meetings",
+        description="Creates meetings in bulk from a CSV or iCalendar (.ics) file.",
+    )
+    @app_commands.describe(file="A .csv file (title, date, time, duration, ...) or an .ics calendar export")
+    @app_commands.guild_only()
+    async def import_meetings(self, interaction: discord.Interaction, file: discord.Attachment):
+        guild = interaction.guild
+        if guild is None:
+            return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+
+        config = self.bot.guild_configs.get(guild.id)
+        if config.get_meeting_forum(guild) is None:
+            return await interaction.response.send_message(
+                f"The '{config.meetings_category}' category or its '{config.meeting_forum}' forum channel does not exist.", ephemeral=True
+            )
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        try:
+            data = await file.read()
+        except discord.HTTPException as e:
+            return await interaction.followup.send(f"Could not read the file: {e}", ephemeral=True)
+
+        # The attachment is downloaded in one piece, but it is decoded and parsed line by line from there.
+        try:
+            meetings, errors = read_meetings(file.filename, io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", newline=""))
+        except Exception as e:
+            return await interaction.followup.send(f"Could not read the file: {e}", ephemeral=True)
+        if errors:
+            shown = "\n".join(errors[:MAX_REPORTED_ERRORS])
+            more = f"\n…and {len(errors) - MAX_REPORTED_ERRORS} more." if len(errors) > MAX_REPORTED_ERRORS else ""
+            return await interaction.followup.send(f"Nothing was imported, please fix these problems first:\n{shown}{more}", ephemeral=True)
+        if not meetings:
+            return await interaction.followup.send("The file does not contain any meetings.", ephemeral=True)
+
+        default_offsets = await self.bot.db.guild_reminder_offsets(guild.id)
+        meeting_ids = await self.bot.db.import_meetings(guild.id, interaction.user.id, meetings, default_offsets)
+
+        progress = ImportProgress(len(meeting_ids))
+        imported = set(meeting_ids)
+        self.enqueue(guild, [meeting for meeting in await self.bot.db.unprovisioned_meetings() if meeting["id"] in imported], progress)
+        message = await interaction.followup.send(f"Imported {len(meeting_ids)} meeting(s), creating their channels…", ephemeral=True, wait=True)
+
+        # Report progress until every meeting of this import has been provisioned or has failed.
+        while not progress.finished:
+            await asyncio.sleep(PROGRESS_INTERVAL_SECONDS)  # Keep message edits well below their rate limit
+            try:
+                await message.edit(content=f"Imported {len(meeting_ids)} meeting(s), created channels for {progress.provisioned}/{progress.total}"
+                    + (f" ({progress.failed} failed)" if progress.failed else "") + "…")
+            except discord.HTTPException:
+                pass  # The followup can no longer be edited after 15 minutes; provisioning carries on regardless.
+
+        failed = f" {progress.failed} could not be set up and will be retried when the bot restarts." if progress.failed else ""
+        try:
+            await message.edit(content=f"Imported {len(meeting_ids)} meeting(s); {progress.provisioned} are ready.{failed}")
+        except discord.HTTPException:
+            pass
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(ImportMeetingsCog(bot))
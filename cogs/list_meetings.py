@@ -1,13 +1,10 @@
 import discord
-import os
-import aiosqlite
 from discord import app_commands
 from discord.ext import commands
-from datetime import datetime
+from utils.timeutils import discord_timestamp
 
-# Load GUILD_ID from .env file
-GUILD_ID = discord.Object(id=(os.getenv("GUILD_ID")))
-DATABASE_PATH = "database.db"
+# Sort key for meetings without a start time so they are listed last.
+NO_START_TIME = float("inf")
 
 
 class SortMeetingsView(discord.ui.View):
@@ -46,10 +43,7 @@ class SortMeetingsView(discord.ui.View):
 
         # For each meeting, add a separate embed field.
         for meeting in self.meetings:
-            if meeting["dt"]:
-                timestamp = f"<t:{int(meeting['dt'].timestamp())}:F>"
-            else:
-                timestamp = meeting["date_time_str"]
+            timestamp = discord_timestamp(meeting["start_time"])
 
             field_name = f"{meeting['name']} (ID: {meeting['id']})"
             field_value = f"{timestamp}\n**Description:** {meeting['description']}"
@@ -63,7 +57,7 @@ class SortMeetingsView(discord.ui.View):
         ascending = self.sort_orders["date"]
 
         # If ascending is True, sort ascending; if False, sort descending.
-        self.meetings.sort(key=lambda m: m["dt"] if m["dt"] is not None else datetime.max, reverse=not ascending)
+        self.meetings.sort(key=lambda m: m["start_time"] if m["start_time"] is not None else NO_START_TIME, reverse=not ascending)
 
         # Toggle sort order for next click.
         self.sort_orders["date"] = not ascending
@@ -110,7 +104,7 @@ class ListMeetingsCog(commands.Cog):
         name="list_meetings",
         description="Lists all meetings you are opted into on Discord.",
     )
-    @app_commands.guilds(GUILD_ID)
+    @app_commands.guild_only()
     async def list_meetings(self, interaction: discord.Interaction):
         user_id = interaction.user.id
         guild_name = interaction.guild.name  # Name of the current server.
@@ -121,18 +115,9 @@ class ListMeetingsCog(commands.Cog):
         else:
             embed_title = f"Meetings in {guild_name}"
 
-        # SQL query to join participants and meetings to get meeting details.
-        query = """
-            SELECT m.id, m.name, m.date_time, m.description
-            FROM participants p
-            JOIN meetings m ON p.meeting_id = m.id
-            WHERE p.user_id = ? AND m.status = 'scheduled'
-        """
-
+        # Join participants and meetings to get meeting details.
         try:
-            async with aiosqlite.connect(DATABASE_PATH, timeout=10) as db:
-                async with db.execute(query, (user_id,)) as cursor:
-                    rows = await cursor.fetchall()
+            rows = await self.bot.db.user_meetings(interaction.guild.id, user_id)
         except Exception as e:
             return await interaction.response.send_message(f"Error accessing the database: {e}", ephemeral=True)
 
@@ -140,30 +125,19 @@ class ListMeetingsCog(commands.Cog):
         if not rows:
             return await interaction.response.send_message("You are not opted into any meetings.", ephemeral=True)
 
-        # Process the returned rows.
+        # Process the returned rows. The query already returns them sorted by date/time (the default sort).
         meetings = []
         for row in rows:
-            meeting_id, name, date_time_str, description = row
-
-            # Convert the date_time string to a datetime object.
-            try:
-                dt = datetime.strptime(date_time_str, "%Y-%m-%d %H:%M:%S")
-            except Exception:
-                dt = None  # Fallback if parsing fails.
-
+            meeting_id, name, start_time, description = row
             meetings.append(
                 {
                     "id": meeting_id,
                     "name": name,
-                    "date_time_str": date_time_str,
-                    "dt": dt,
+                    "start_time": start_time,
                     "description": description or "N/A",
                 }
             )
 
-        # Default sort: by date/time.
-        meetings.sort(key=lambda m: m["dt"] if m["dt"] is not None else datetime.max)
-
         # Create a view with sorting buttons.
         view = SortMeetingsView(meetings, embed_title)
         embed = view.build_embed()
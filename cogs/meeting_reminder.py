@@ -1,68 +1,164 @@
-import discord, aiosqlite, asyncio
-from discord.ext import commands, tasks
-from datetime import datetime, timedelta
+import discord
+from collections import defaultdict
+from discord import app_commands
+from discord.ext import commands
+from typing import Optional
+from utils.scheduler import DeadlineScheduler
+from utils.timeutils import now_ts, discord_timestamp, parse_offsets, format_duration
 
-DATABASE_PATH = "database.db"
+NEXT_REMINDER = "next"  # The scheduler only ever tracks the single earliest unsent reminder
+RETRY_SECONDS = 30  # How long to wait before retrying reminders that could not be sent
 
 
 class UpcomingMeetingReminder(commands.Cog):
+    """
+    Sends reminders in each meeting's forum thread at the offsets configured for the meeting (e.g. 1 day, 1 hour and 5 minutes before).
+
+    Reminders live in the reminders table, indexed by due time. The cog keeps a DeadlineScheduler armed for
+    the earliest unsent reminder only; when it fires, every reminder due by then is fetched in one query,
+    sent, and marked as sent, then the scheduler is re-armed for the next one. A reminder that could not be
+    sent stays unsent and is retried every RETRY_SECONDS until it goes out or its meeting starts. Meeting changes (the
+    `meeting_update` event) re-arm it as well, so nothing is recomputed per meeting while idle. Only reminders
+    of guilds on shards this process holds the lease of are sent, so each one goes out exactly once.
+    """
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.reminded_meetings = set()  # Store IDs of meetings that got a reminder
-        self.check_meetings.start()  # Start the loop when the cog is loaded
+        self.scheduler = DeadlineScheduler(self.send_reminders)
+
+    async def cog_load(self):
+        await self.arm()
+        self.scheduler.start()
 
     def cog_unload(self):
-        self.check_meetings.cancel()  # Cancel the loop when the cog is unloaded
-
-    @tasks.loop(seconds=15)
-    async def check_meetings(self):
-        now = datetime.now()
-        reminder_time = now + timedelta(minutes=15)
-
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            cursor = await db.execute(
-                """
-                SELECT id, name, date_time, role_id, thread_id
-                FROM meetings
-                WHERE status = 'scheduled' AND date_time BETWEEN ? AND ?
-                """,
-                (now.strftime("%Y-%m-%d %H:%M:%S"), reminder_time.strftime("%Y-%m-%d %H:%M:%S")),
-            )
-            meetings = await cursor.fetchall()
-
-        for meeting in meetings:
-            meeting_id, name, date_time_str, role_id, thread_id = meeting
-            meeting_time = datetime.strptime(date_time_str, "%Y-%m-%d %H:%M:%S")
-
-            # Skip if reminder already sent
-            if meeting_id in self.reminded_meetings:
-                continue
-
-            # calculate the actual remaining time in minutes
-            time_remaining = meeting_time - now
-            minutes_remaining = int(time_remaining.total_seconds() // 60)
-            if minutes_remaining <= 0:
-                continue  # skip if the meeting has already started
-
-            guild = self.bot.get_guild(int(self.bot.guilds[0].id))
-            if guild is None:
-                print(f"Guild not found for meeting {name}.")
-                continue
-
-            role = guild.get_role(role_id)
-            thread = guild.get_thread(thread_id)
-
-            if role and thread:
-                try:
-                    await thread.send(f"{role.mention} Reminder: The meeting **{name}** is starting in "
-                    f"{minutes_remaining} minute{'s' if minutes_remaining != 1 else ''} at <t:{int(meeting_time.timestamp())}:F>.")
-                    self.reminded_meetings.add(meeting_id)
-                except Exception as e:
-                    print(f"Failed to send reminder for meeting {name}: {e}")
-
-    @check_meetings.before_loop
-    async def before_check_meetings(self):
-        await self.bot.wait_until_ready()  # Wait until the bot is ready
+        self.scheduler.stop()  # Stop waiting for reminders when the cog is unloaded
+
+    async def arm(self, retry_at: Optional[int] = None):
+        """Points the scheduler at the earliest unsent reminder, but not before `retry_at` while failed reminders wait for another try."""
+        next_due = await self.bot.db.next_reminder_due(self.bot.leases.owned_shards())
+        if next_due is not None and retry_at is not None:
+            next_due = max(next_due, retry_at)
+        if next_due is None:
+            self.scheduler.cancel(NEXT_REMINDER)
+        else:
+            self.scheduler.schedule(NEXT_REMINDER, next_due)
+
+    @commands.Cog.listener()
+    async def on_meeting_update(self, meeting_id: int):
+        # The database already holds the meeting's updated reminders; only the next wake-up may have changed.
+        await self.arm()
+
+    @commands.Cog.listener()
+    async def on_lease_acquired(self, name: str):
+        await self.arm()  # Reminders of a shard taken over from another process are due here now
+
+    async def send_reminders(self, _keys):
+        await self.bot.wait_until_ready()  # The guild cache is needed to find roles and threads
+
+        failed = False
+        try:
+            now = now_ts()
+            due = defaultdict(list)  # meeting_id -> its due reminder rows, earliest first
+            for row in await self.bot.db.due_reminders(now, self.bot.leases.owned_shards()):
+                due[row["meeting_id"]].append(row)
+
+            # Several offsets can be due at once (e.g. after downtime); a meeting only gets one message per pass.
+            handled = []
+            for meeting_id, rows in due.items():
+                if await self.remind(rows[0], now):
+                    handled.extend((meeting_id, row["offset_seconds"]) for row in rows)
+                else:
+                    failed = True
+
+            if handled:
+                await self.bot.db.mark_reminders_sent(handled, now)
+        finally:
+            await self.arm(now_ts() + RETRY_SECONDS if failed else None)
+
+    async def remind(self, reminder, now: int) -> bool:
+        """
+        Sends one meeting's reminder. Returns True once it is done with, i.e. sent or not needed anymore (meeting
+        cancelled or started, role or thread deleted), and False if it should be retried.
+        """
+        name, start_time = reminder["name"], reminder["start_time"]
+        seconds_remaining = start_time - now
+        if reminder["status"] != "scheduled" or seconds_remaining < 60:
+            return True  # skip if the meeting is no longer scheduled or has already started
+
+        guild = self.bot.get_guild(reminder["guild_id"])
+        if guild is None:
+            print(f"Guild not found for meeting {name}.")
+            return False
+
+        role = guild.get_role(reminder["role_id"])
+        thread = guild.get_thread(reminder["thread_id"])
+        try:
+            if thread is None:
+                thread = await self.bot.fetch_channel(reminder["thread_id"])  # Archived threads are not cached
+        except discord.NotFound:
+            thread = None
+        except Exception as e:
+            print(f"Failed to fetch the thread of meeting {name}: {e}")
+            return False
+        if role is None or not isinstance(thread, discord.Thread):
+            print(f"Role or thread of meeting {name} no longer exists; skipping its reminder.")
+            return True
+
+        try:
+            await thread.send(f"{role.mention} Reminder: The meeting **{name}** is starting in "
+            f"{format_duration(seconds_remaining)} at {discord_timestamp(start_time)}.")
+        except Exception as e:
+            print(f"Failed to send reminder for meeting {name}: {e}")
+            return False
+        return True
+
+    @app_commands.command(
+        name="set_reminders",
+        description="Sets when reminders are sent before a meeting.",
+    )
+    @app_commands.describe(
+        meeting_id="The id of the meeting",
+        offsets="How long before the meeting to send reminders (e.g., 1d, 1h, 5m)",
+    )
+    @app_commands.guild_only()
+    async def set_reminders(self, interaction: discord.Interaction, meeting_id: int, offsets: str):
+        meeting = await self.bot.db.get_meeting(meeting_id, interaction.guild_id)
+        if meeting is None:
+            return await interaction.response.send_message(f"Meeting with id: '{meeting_id}' not found.", ephemeral=True)
+        if meeting["status"] != "scheduled":
+            return await interaction.response.send_message(f"The meeting '{meeting['name']}' is no longer scheduled.", ephemeral=True)
+
+        try:
+            offset_seconds = parse_offsets(offsets)
+        except ValueError as e:
+            return await interaction.response.send_message(str(e), ephemeral=True)
+
+        await self.bot.db.set_meeting_reminders(meeting_id, offset_seconds)
+        await self.arm()
+
+        summary = ", ".join(format_duration(offset) for offset in offset_seconds) or "none"
+        await interaction.response.send_message(f"Reminders for '{meeting['name']}' will be sent {summary} before it starts.", ephemeral=True)
+
+    @app_commands.command(
+        name="default_reminders",
+        description="Sets the reminders used for new meetings in this server.",
+    )
+    @app_commands.describe(offsets="How long before each meeting to send reminders (e.g., 1d, 1h, 5m)")
+    @app_commands.guild_only()
+    async def default_reminders(self, interaction: discord.Interaction, offsets: str):
+        guild = interaction.guild
+        if guild is None:
+            return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+
+        try:
+            offset_seconds = parse_offsets(offsets)
+        except ValueError as e:
+            return await interaction.response.send_message(str(e), ephemeral=True)
+
+        await self.bot.db.set_guild_reminder_offsets(guild.id, offset_seconds)
+
+        summary = ", ".join(format_duration(offset) for offset in offset_seconds) or "none"
+        await interaction.response.send_message(f"New meetings will send reminders {summary} before they start.", ephemeral=True)
 
 
 async def setup(bot: commands.Bot):
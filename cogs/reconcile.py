@@ -0,0 +1,154 @@
+import discord, asyncio, time
+from discord import app_commands
+from discord.ext import commands
+from datetime import timedelta
+from typing import Optional
+from utils.leases import lease_shard
+from utils.reconcile import GuildSnapshot, find_drift, match_text_channels, MEETING_ROLE_PREFIX, MEETING_CHANNEL_SUFFIXES
+
+MAX_LISTED_MEETINGS = 10
+REPAIR_GRACE_SECONDS = 300  # Resources younger than this may still be getting stored by /create or the pool, so repair leaves them alone
+
+
+def created_recently(resource_id: int, grace_seconds: int = REPAIR_GRACE_SECONDS) -> bool:
+    """Whether the channel or role was created within the grace window, going by the creation time in its snowflake."""
+    return discord.utils.utcnow() - discord.utils.snowflake_time(resource_id) < timedelta(seconds=grace_seconds)
+
+
+def snapshot_guild(guild: discord.Guild, meetings_category: Optional[discord.CategoryChannel]) -> GuildSnapshot:
+    """Reads the guild's channels and roles from the cache, without any API calls."""
+    return GuildSnapshot(
+        channel_ids={channel.id for channel in guild.channels} | {thread.id for thread in guild.threads},
+        role_ids={role.id for role in guild.roles},
+        meeting_channels={
+            channel.id: channel.name for channel in (meetings_category.channels if meetings_category else [])
+            if channel.name.endswith(MEETING_CHANNEL_SUFFIXES)
+        },
+        meeting_roles={role.id: role.name for role in guild.roles if role.name.startswith(MEETING_ROLE_PREFIX)},
+    )
+
+
+class ReconcileCog(commands.Cog):
+    """
+    Finds drift between the meetings table and the guild: meetings whose role, channels or forum post are
+    gone, and meeting roles/channels that outlived their meeting or belong to none.
+
+    All meetings are loaded in one query and compared with the cached guild state using set lookups, so a pass
+    costs no API calls. It runs at startup and whenever this process takes over a shard (report only), and on
+    demand with /reconcile, which can also repair the drift by queueing the deletions as background jobs.
+    Repairs leave out resources created in the last REPAIR_GRACE_SECONDS, which a /create in progress may not
+    have stored yet. Every pass first fills in the text channel id of meetings created before it was stored,
+    so their channels are not mistaken for orphans.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.startup_task = None
+
+    async def cog_load(self):
+        self.startup_task = asyncio.create_task(self.reconcile_on_startup())
+
+    def cog_unload(self):
+        if self.startup_task is not None:
+            self.startup_task.cancel()
+
+    async def reconcile_on_startup(self):
+        await self.bot.wait_until_ready()
+        await self.reconcile_guilds(self.bot.guilds)
+
+    @commands.Cog.listener()
+    async def on_lease_acquired(self, name: str):
+        # Leases held by the time the bot is ready are covered by the startup pass; this picks up shards taken over later.
+        shard_id = lease_shard(name)
+        if shard_id is not None and self.bot.is_ready():
+            await self.reconcile_guilds([guild for guild in self.bot.guilds if guild.shard_id == shard_id])
+
+    async def reconcile_guilds(self, guilds):
+        """Backfills text channel ids and reports drift (without repairing) for the given guilds this process owns."""
+        for guild in guilds:
+            if not self.bot.leases.owns_guild(guild.id):
+                continue  # Reported by the process that owns the guild's shard
+            try:
+                await self.backfill_text_channels(guild)
+                print(f"{guild.name}: {await self.reconcile(guild, repair=False)}")
+            except Exception as e:
+                print(f"Error reconciling guild {guild.id}: {e}")
+
+    async def backfill_text_channels(self, guild: discord.Guild):
+        """Stores the text channel id of meetings that only knew their text channel by name."""
+        meetings = await self.bot.db.meetings_without_text_channel(guild.id)
+        if not meetings:
+            return
+        claimed = {row["text_channel_id"] for row in await self.bot.db.meeting_resources(guild.id) if row["text_channel_id"]}
+        matches = match_text_channels(meetings, ((channel.id, channel.name) for channel in guild.text_channels), claimed)
+        await self.bot.db.set_text_channel_ids(matches)
+        print(f"Found the text channel of {len(matches)}/{len(meetings)} older meeting(s).")
+
+    async def reconcile(self, guild: discord.Guild, repair: bool) -> str:
+        """Runs one reconciliation pass over the guild and returns a summary of what was found (and queued for repair)."""
+        started = time.perf_counter()
+        meetings = await self.bot.db.meeting_resources(guild.id)
+        snapshot = snapshot_guild(guild, self.bot.guild_configs.get(guild.id).get_meetings_category(guild))
+        drift = find_drift(meetings, snapshot, set(await self.bot.db.pooled_resource_ids(guild.id)))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        summary = f"Reconciled {len(meetings)} meeting(s) in {elapsed_ms:.0f} ms."
+        if not drift:
+            return summary + " Everything matches."
+
+        lines = [summary]
+        if drift.incomplete:
+            lines.append(f"**{len(drift.incomplete)} scheduled meeting(s) are missing resources** (cancel and recreate them):")
+            lines.extend(
+                f"• {name} (ID: {meeting_id}): no {', '.join(missing)}" for meeting_id, name, missing in drift.incomplete[:MAX_LISTED_MEETINGS]
+            )
+            if len(drift.incomplete) > MAX_LISTED_MEETINGS:
+                lines.append(f"• …and {len(drift.incomplete) - MAX_LISTED_MEETINGS} more")
+        if drift.leftovers:
+            lines.append(f"**{len(drift.leftovers)} channel(s)/role(s)** still exist for meetings that are over.")
+        if drift.orphan_channels or drift.orphan_roles:
+            lines.append(f"**{len(drift.orphan_channels)} channel(s) and {len(drift.orphan_roles)} role(s)** do not belong to any meeting.")
+
+        removable = len(drift.leftovers) + len(drift.orphan_channels) + len(drift.orphan_roles)
+        if repair and removable:
+            teardown = {"guild_id": guild.id, "reason": "Not used by any scheduled meeting"}
+            deletions = [(kind, resource_id, meeting_id) for meeting_id, kind, resource_id in drift.leftovers]
+            deletions.extend(("channel", channel_id, None) for channel_id in drift.orphan_channels)
+            deletions.extend(("role", role_id, None) for role_id in drift.orphan_roles)
+            jobs = [
+                self.delete_job(teardown, kind, resource_id, meeting_id)
+                for kind, resource_id, meeting_id in deletions if not created_recently(resource_id)
+            ]
+            if jobs:
+                await self.bot.jobs.enqueue(jobs)
+            lines.append(f"Queued {len(jobs)} deletion(s); see /job_status.")
+            if len(jobs) < len(deletions):
+                lines.append(
+                    f"Skipped {len(deletions) - len(jobs)} created in the last {REPAIR_GRACE_SECONDS // 60} minutes; "
+                    "run it again later if they are still unused."
+                )
+        elif removable:
+            lines.append("Run `/reconcile repair:True` to delete them.")
+        return "\n".join(lines)
+
+    @staticmethod
+    def delete_job(teardown: dict, kind: str, resource_id: int, meeting_id):
+        return (f"delete_{kind}:{resource_id}", f"delete_{kind}", {**teardown, "meeting_id": meeting_id, f"{kind}_id": resource_id}, meeting_id)
+
+    @app_commands.command(
+        name="reconcile",
+        description="Checks meetings against the server's channels and roles, optionally removing leftovers.",
+    )
+    @app_commands.describe(repair="Delete channels and roles that no scheduled meeting uses")
+    @app_commands.default_permissions(manage_channels=True)
+    @app_commands.guild_only()
+    async def reconcile_command(self, interaction: discord.Interaction, repair: bool = False):
+        guild = interaction.guild
+        if guild is None:
+            return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+        await self.backfill_text_channels(guild)  # Otherwise older meetings' text channels would be repaired away as orphans
+        await interaction.response.send_message(await self.reconcile(guild, repair), ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(ReconcileCog(bot))
@@ -0,0 +1,104 @@
+from discord.ext import commands, tasks
+from typing import Optional
+from utils.leases import lease_shard
+from utils.recurrence import HORIZON_DAYS, occurrence_starts
+from utils.scheduler import DeadlineScheduler
+from utils.timeutils import now_ts
+from utils.database import DEFAULT_DURATION_MINUTES
+
+
+class RecurringMeetingsCog(commands.Cog):
+    """
+    Moves recurring meetings from one occurrence to the next.
+
+    Occurrences are materialized in the occurrences table up to HORIZON_DAYS ahead. A daily pass rolls the
+    horizon forward, generating only the occurrences each series does not have yet. A recurring meeting's row
+    points at its current occurrence, so reminders, listings and voice routing treat it like a one-off meeting.
+    A DeadlineScheduler fires when that occurrence ends and the meeting advances to its next scheduled
+    occurrence, skipping cancelled ones and following moved ones. Meetings are only advanced by the process
+    holding the lease of their guild's shard, which re-checks all of them when it acquires one.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.scheduler = DeadlineScheduler(self.advance)
+
+    async def cog_load(self):
+        await self.expand()
+        await self.advance([row["id"] for row in await self.bot.db.recurring_meetings()])
+        self.scheduler.start()
+        self.extend_horizon.start()
+
+    def cog_unload(self):
+        self.extend_horizon.cancel()
+        self.scheduler.stop()
+
+    async def expand(self, meeting_id: Optional[int] = None):
+        """Generates the missing occurrences of every recurring series (or just one) up to the horizon, in one transaction."""
+        horizon = now_ts() + HORIZON_DAYS * 86400
+        occurrences = []
+        materialized = []
+        for meeting_id, series_start, duration, recurrence, materialized_until in await self.bot.db.series_to_expand(horizon, meeting_id):
+            length = (duration or DEFAULT_DURATION_MINUTES) * 60
+            after = series_start - 1 if materialized_until is None else materialized_until
+            occurrences.extend((meeting_id, start, start + length) for start in occurrence_starts(series_start, recurrence, after, horizon))
+            materialized.append((horizon, meeting_id))
+        if materialized:
+            await self.bot.db.add_occurrences(occurrences, materialized)
+
+    async def advance(self, meeting_ids):
+        """
+        Points each recurring meeting at its next unfinished occurrence and schedules the move after that one.
+        Its upcoming occurrences are refreshed in bot.interval_index on the way.
+        """
+        now = now_ts()
+        for meeting_id in meeting_ids:
+            meeting = await self.bot.db.get_meeting(meeting_id)
+            if meeting is None or meeting["status"] != "scheduled" or not meeting["recurrence"]:
+                self.scheduler.cancel(meeting_id)
+                continue
+            # Every process answers opt-ins, so each keeps the occurrences in its own interval index current.
+            occurrences = await self.bot.db.scheduled_occurrences(meeting_id)
+            self.bot.interval_index.set_occurrences(meeting_id, [(row["start_time"], row["end_time"]) for row in occurrences])
+            if not self.bot.leases.owns_guild(meeting["guild_id"]):
+                self.scheduler.cancel(meeting_id)  # Another process advances it
+                continue
+
+            occurrence = await self.bot.db.next_occurrence(meeting_id, now)
+            if occurrence is None:
+                # Every occurrence up to the horizon is cancelled; the daily pass picks the series up again.
+                self.scheduler.cancel(meeting_id)
+                continue
+
+            start_time, end_time = occurrence["start_time"], occurrence["end_time"]
+            if (start_time, end_time) != (meeting["start_time"], meeting["end_time"]):
+                await self.bot.db.set_current_occurrence(meeting_id, start_time, end_time)
+                self.bot.interval_index.set_meeting(meeting_id, start_time, end_time, meeting["name"])
+                self.bot.dispatch("meeting_update", meeting_id)
+            self.scheduler.schedule(meeting_id, end_time)
+
+    @commands.Cog.listener()
+    async def on_meeting_update(self, meeting_id: int):
+        # New or rescheduled series have nothing materialized yet; single-occurrence changes may move the current one.
+        # Only this series is expanded; the daily pass rolls the horizon forward for all of them.
+        await self.expand(meeting_id)
+        await self.advance([meeting_id])
+
+    @commands.Cog.listener()
+    async def on_lease_acquired(self, name: str):
+        if lease_shard(name) is not None:
+            await self.advance([row["id"] for row in await self.bot.db.recurring_meetings()])
+
+    @tasks.loop(hours=24)
+    async def extend_horizon(self):
+        await self.expand()
+        await self.advance([row["id"] for row in await self.bot.db.recurring_meetings()])
+
+    @extend_horizon.before_loop
+    async def before_extend_horizon(self):
+        # cog_load has just expanded everything, so the first pass is a day away.
+        await self.bot.wait_until_ready()
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(RecurringMeetingsCog(bot))
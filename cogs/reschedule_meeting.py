@@ -1,80 +1,11 @@
-import discord, os, aiosqlite
+import discord
 from discord import app_commands
 from discord.ext import commands
 from datetime import datetime
-import re
-
-# Load GUILD_ID from .env file
-GUILD_ID = discord.Object(id=(os.getenv("GUILD_ID")))
-DATABASE_PATH = "database.db"
-
-TIME_FORMATS = [
-    r"^(1[0-2]|0?[1-9]):([0-5][0-9]) ?([APap][Mm])$",  # 12-hour format with AM/PM (e.g., "1:00 PM", "01:00pm")
-    r"^(1[0-9]|2[0-3]|0?[0-9]):([0-5][0-9])$",  # 24-hour format (e.g., "13:00")
-]
-
-DATE_FORMATS = [
-    r"^(0?[1-9]|1[0-2])/(0?[1-9]|[12][0-9]|3[01])/(\d{4})$",  # MM/DD/YYYY or M/D/YYYY
-    r"^(0?[1-9]|1[0-2])/(0?[1-9]|[12][0-9]|3[01])/(\d{2})$",  # MM/DD/YY or M/D/YY
-]
-
-
-def parse_time(input_time: str) -> str:
-    """Parses various time formats and returns a 24-hour format string (HH:MM)."""
-    for pattern in TIME_FORMATS:
-        match = re.match(pattern, input_time)
-        if match:
-            if len(match.groups()) == 3:  # 12-hour format
-                hours, minutes, period = match.groups()
-                hours = int(hours)
-                if period.lower() == "pm" and hours != 12:
-                    hours += 12
-                elif period.lower() == "am" and hours == 12:
-                    hours = 0
-            else:  # 24-hour format
-                hours, minutes = map(int, match.groups())
-
-            return f"{hours:02}:{minutes:02}"  # Return HH:MM format
-
-    raise ValueError(f"Invalid time format: {input_time}")
-
-
-def parse_date(input_date: str) -> str:
-    """Parses various date formats and returns MM/DD/YYYY format."""
-    for pattern in DATE_FORMATS:
-        match = re.match(pattern, input_date)
-        if match:
-            month, day, year = match.groups()
-            year = int(year)
-            if year < 100:  # Convert YY to YYYY (assuming 2000s)
-                year += 2000
-            return f"{year}-{int(month):02}-{int(day):02}"  # Return YYYY/MM/DD format
-
-    raise ValueError(f"Invalid date format: {input_date}")
-
-
-class MeetingButtons(discord.ui.View):
-    """A View that contains two buttons: Opt-In and Opt-Out."""
-
-    def __init__(self, meeting_role: discord.Role):
-        super().__init__(timeout=None)
-        self.meeting_role = meeting_role
-
-    @discord.ui.button(label="Opt-In", style=discord.ButtonStyle.green, custom_id="meeting_optin")
-    async def opt_in(self, interaction: discord.Interaction, button: discord.ui.Button):
-        try:
-            await interaction.user.add_roles(self.meeting_role)
-            await interaction.response.send_message("You have been opted in for the meeting!", ephemeral=True)
-        except Exception as e:
-            await interaction.response.send_message(f"Error signing up: {e}", ephemeral=True)
-
-    @discord.ui.button(label="Opt-Out", style=discord.ButtonStyle.red, custom_id="meeting_optout")
-    async def opt_out(self, interaction: discord.Interaction, button: discord.ui.Button):
-        try:
-            await interaction.user.remove_roles(self.meeting_role)
-            await interaction.response.send_message("You have been opted out of the meeting.", ephemeral=True)
-        except Exception as e:
-            await interaction.response.send_message(f"Error opting out: {e}", ephemeral=True)
+from typing import Optional
+from utils.database import DEFAULT_DURATION_MINUTES
+from utils.meeting_buttons import meeting_buttons
+from utils.timeutils import parse_time, parse_date, day_bounds, to_timestamp, from_timestamp, discord_timestamp
 
 
 class RescheduleMeetingCog(commands.Cog):
@@ -86,6 +17,7 @@ class RescheduleMeetingCog(commands.Cog):
      - new_time: new meeting time (or 'none' to keep current)
      - new_date: new meeting date (or 'none' to keep current)
      - new_duration: new meeting duration in minutes (or 'none' to keep current)
+     - occurrence: for a recurring meeting, the date of the single occurrence to move (leave out to move the whole series)
 
     The command updates the meeting record, sends a notification in the meeting's text channel,
     and posts a new message in the forum thread with a new embed and interactive buttons.
@@ -103,28 +35,40 @@ class RescheduleMeetingCog(commands.Cog):
         new_time="New meeting time (e.g., 1:00 PM, 13:00) or 'none' to keep current",
         new_date="New meeting date (e.g., M/D/YY, MM/DD/YYYY) or 'none' to keep current",
         new_duration="New meeting duration (minutes) or 'none' to keep current",
+        occurrence="Recurring meetings only: date of the one occurrence to move (e.g., M/D/YY), or leave out for the whole series",
     )
-    @app_commands.guilds(GUILD_ID)
-    async def reschedule_meeting(self, interaction: discord.Interaction, meeting_id: int, new_time: str, new_date: str, new_duration: str = "none"):
+    @app_commands.guild_only()
+    async def reschedule_meeting(self, interaction: discord.Interaction, meeting_id: int, new_time: str, new_date: str, new_duration: str = "none", occurrence: Optional[str] = None):
         guild = interaction.guild
         if guild is None:
             return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
 
         # Fetch the meeting record by ID.
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            async with db.execute(
-                "SELECT id, name, description, date_time, duration, voice_channel_id, thread_id, role_id FROM meetings WHERE id = ?",
-                (meeting_id,),
-            ) as cursor:
-                row = await cursor.fetchone()
+        row = await self.bot.db.get_meeting(meeting_id, guild.id)
 
         if row is None:
             return await interaction.response.send_message(f"Meeting with id: '{meeting_id}' not found.", ephemeral=True)
 
-        mid, name, description, current_datetime_str, current_duration, voice_channel_id, thread_id, role_id = row
+        mid, name, description = row["id"], row["name"], row["description"]
+        current_start_time, current_duration = row["start_time"], row["duration"]
+        text_channel_id, voice_channel_id, thread_id, role_id = row["text_channel_id"], row["voice_channel_id"], row["thread_id"], row["role_id"]
+
+        # A single occurrence of a recurring meeting is moved on its own; the series and its other occurrences stay put.
+        moved_occurrence = None
+        if occurrence is not None:
+            if not row["recurrence"] or row["status"] != "scheduled":
+                return await interaction.response.send_message(f"The meeting '{name}' is not a scheduled recurring meeting.", ephemeral=True)
+            try:
+                moved_occurrence = await self.bot.db.find_occurrence(mid, *day_bounds(occurrence))
+            except ValueError as e:
+                return await interaction.response.send_message(str(e), ephemeral=True)
+            if moved_occurrence is None:
+                return await interaction.response.send_message(f"The meeting '{name}' has no occurrence planned on {occurrence}.", ephemeral=True)
+            current_start_time = moved_occurrence["start_time"]
+            current_duration = (moved_occurrence["end_time"] - moved_occurrence["start_time"]) // 60
 
-        # Parse the current meeting datetime.
-        current_dt = datetime.strptime(current_datetime_str, "%Y-%m-%d %H:%M:%S")
+        # Convert the current meeting timestamp to local time for any fields left unchanged.
+        current_dt = from_timestamp(current_start_time)
 
         # Determine new time and date values and check if they are 'none'.
         new_time_val = current_dt.strftime("%H:%M") if new_time.lower() == "none" else parse_time(new_time)
@@ -141,40 +85,48 @@ class RescheduleMeetingCog(commands.Cog):
             except ValueError:
                 return await interaction.response.send_message("Invalid duration value provided.", ephemeral=True)
 
-        # Construct the new meeting datetime string.
-        new_meeting_dt = f"{new_date_val} {new_time_val}:00"
-        new_dt = datetime.strptime(new_meeting_dt, "%Y-%m-%d %H:%M:%S")
+        # Construct the new meeting start timestamp.
+        new_dt = datetime.strptime(f"{new_date_val} {new_time_val}:00", "%Y-%m-%d %H:%M:%S")
+        new_start_time = to_timestamp(new_dt)
 
         # Update the meeting record in the database.
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            await db.execute( "UPDATE meetings SET date_time = ?, duration = ?, updated_at = strftime('%s','now') WHERE id = ?", (new_meeting_dt, new_duration_val, mid))
-            await db.commit()
+        if moved_occurrence is not None:
+            # The recurring meetings cog moves the meeting itself if this is its current occurrence.
+            await self.bot.db.reschedule_occurrence(mid, moved_occurrence["original_start"], new_start_time, new_start_time + new_duration_val * 60)
+        else:
+            await self.bot.db.reschedule_meeting(mid, new_start_time, new_duration_val)
+            if row["status"] == "scheduled":
+                self.bot.interval_index.set_meeting(mid, new_start_time, new_start_time + (new_duration_val or DEFAULT_DURATION_MINUTES) * 60, name)
+        self.bot.dispatch("meeting_update", mid)
+        rescheduled = f"The {discord_timestamp(moved_occurrence['original_start'], 'D')} occurrence of '{name}' has" if moved_occurrence else f"The meeting '{name}' has"
 
         # Notify participants in the meeting's text channel.
-        text_channel = discord.utils.get(guild.text_channels, name=f"{name.lower().replace(' ', '-')}-text")
+        text_channel = guild.get_channel(text_channel_id) if text_channel_id else None
         meeting_role = guild.get_role(role_id)
 
         if text_channel and meeting_role:
             try:
                 notification = (f"{meeting_role.mention} **Reschedule Notice:** "
-                                f"The meeting '{name}' has been rescheduled to <t:{int(new_dt.timestamp())}:F> with a duration of {new_duration_val} minutes.")
+                                f"{rescheduled} been rescheduled to {discord_timestamp(new_start_time)} with a duration of {new_duration_val} minutes.")
                 await text_channel.send(notification)
             except Exception as e:
                 print(f"Error sending reschedule notification for meeting {name}: {e}")
 
         # Create a new embed using the same format as the create_meeting embed.
-        discord_timestamp = f"<t:{int(new_dt.timestamp())}:F>"
+        meeting_timestamp = discord_timestamp(new_start_time)
 
         new_embed = discord.Embed(title=f"Meeting {name} Rescheduled!", description=f"\nMeeting ID: {mid}\n{description}", color=discord.Color.blue())
-        new_embed.add_field(name="Date & Time", value=discord_timestamp, inline=True)
+        new_embed.add_field(name="Date & Time", value=meeting_timestamp, inline=True)
         new_embed.add_field(name="Duration", value=f"{new_duration_val} minutes", inline=True)
-        new_embed.add_field(name="Text Channel", value=text_channel.mention, inline=False)
+        if text_channel:
+            new_embed.add_field(name="Text Channel", value=text_channel.mention, inline=False)
 
-        voice_channel = guild.get_channel(voice_channel_id)
-        new_embed.add_field(name="Voice Channel", value=voice_channel.mention, inline=False)
+        voice_channel = guild.get_channel(voice_channel_id) if voice_channel_id else None
+        if voice_channel:
+            new_embed.add_field(name="Voice Channel", value=voice_channel.mention, inline=False)
 
-        # Create a view with the same MeetingButtons.
-        view = MeetingButtons(meeting_role)
+        # The same Opt-In/Opt-Out buttons as the original post.
+        view = meeting_buttons(mid)
 
         # Post a new message in the forum thread.
         try:
@@ -191,7 +143,7 @@ class RescheduleMeetingCog(commands.Cog):
 
         # Send a confirmation message to the user.
         return await interaction.response.send_message(
-            f"Meeting '{name}' has been rescheduled to {discord_timestamp} with a duration of {new_duration_val} minutes. A new update has been posted in the forum.",
+            f"{rescheduled} been rescheduled to {meeting_timestamp} with a duration of {new_duration_val} minutes. A new update has been posted in the forum.",
             ephemeral=True,
         )
 
@@ -1,12 +1,93 @@
 import discord
-import os
-import aiosqlite
 from discord import app_commands
 from discord.ext import commands
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
+from utils.database import build_search_query
+from utils.timeutils import parse_date, to_timestamp, discord_timestamp
+
+PAGE_SIZE = 10
+DESCRIPTION_PREVIEW_LENGTH = 150
+KEYWORD_DISPLAY_LENGTH = 200  # Keeps the results embed title under Discord's 256-character limit
+
+
+def shorten_keyword(keyword: str) -> str:
+    return keyword if len(keyword) <= KEYWORD_DISPLAY_LENGTH else keyword[:KEYWORD_DISPLAY_LENGTH] + "…"
+
+
+class SearchResultsView(discord.ui.View):
+    """
+    A View with Previous/Next buttons that pages through search results.
+
+    Only the current page is held in memory. Each button press fetches the neighbouring page from the
+    database using the first/last row of the current page as a keyset cursor.
+    """
+
+    def __init__(self, db, keyword: str, search_args: dict, rows, has_next: bool):
+        super().__init__(timeout=15 * 60)  # Ephemeral messages can only be edited for 15 minutes
+        self.db = db
+        self.keyword = keyword
+        self.search_args = search_args
+        self.rows = rows
+        self.page = 1
+        self.has_next = has_next
+        self.update_buttons()
+
+    def update_buttons(self):
+        self.previous_page.disabled = self.page == 1
+        self.next_page.disabled = not self.has_next
+
+    def build_embed(self) -> discord.Embed:
+        sort_label = "Relevance" if self.search_args["sort"] == "relevance" else "Date/Time"
+        embed = discord.Embed(title=f"Meetings containing '{shorten_keyword(self.keyword)}'", color=discord.Color.blue())
+        for meeting in self.rows:
+            description = meeting["description"] or "N/A"
+            if len(description) > DESCRIPTION_PREVIEW_LENGTH:
+                description = description[:DESCRIPTION_PREVIEW_LENGTH] + "…"
+            embed.add_field(
+                name=f"{meeting['name'][:200]} (ID: {meeting['id']})",
+                value=(
+                    f"**When:** {discord_timestamp(meeting['start_time'])}\n"
+                    f"**Host:** <@{meeting['host_id']}>\n"
+                    f"**Status:** {meeting['status'].capitalize()}\n"
+                    f"**Description:** {description}"
+                ),
+                inline=False,
+            )
+        embed.set_footer(text=f"Page {self.page} • Sorted by {sort_label}")
+        return embed
+
+    async def show_page(self, interaction: discord.Interaction, backwards: bool):
+        anchor = self.rows[0] if backwards else self.rows[-1]
+        rows, has_more = await self.db.search_meetings(
+            **self.search_args, cursor=(anchor["sort_key"], anchor["id"]), backwards=backwards, limit=PAGE_SIZE
+        )
+        if not rows:
+            # Nothing left in that direction (meetings may have changed since this page was loaded), so stay here.
+            if backwards:
+                self.page = 1
+            else:
+                self.has_next = False
+        elif backwards:
+            self.rows = rows
+            # Page numbers are relative, so keep them consistent with whether anything is still before this page.
+            self.page = max(self.page - 1, 2) if has_more else 1
+            self.has_next = True
+        else:
+            self.rows = rows
+            self.page += 1
+            self.has_next = has_more
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.build_embed(), view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.primary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show_page(interaction, backwards=True)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show_page(interaction, backwards=False)
 
-GUILD_ID = discord.Object(id=os.getenv("GUILD_ID"))
-DATABASE_PATH = "database.db"
 
 class SearchMeetingCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -18,50 +99,71 @@ class SearchMeetingCog(commands.Cog):
     )
 
     @app_commands.describe(
-        keyword = "What to search for in meeting titles/descriptions"
+        keyword = "Words to search for in meeting titles/descriptions (use \"quotes\" for an exact phrase)",
+        status = "Only show meetings with this status",
+        host = "Only show meetings hosted by this member",
+        after = "Only show meetings on or after this date (e.g., M/D/YY, MM/DD/YYYY)",
+        before = "Only show meetings on or before this date (e.g., M/D/YY, MM/DD/YYYY)",
+        sort = "Order results by date/time (default) or by relevance",
     )
+    @app_commands.choices(
+        status=[
+            app_commands.Choice(name="Scheduled", value="scheduled"),
+            app_commands.Choice(name="Cancelled", value="cancelled"),
+            app_commands.Choice(name="Completed", value="completed"),
+        ],
+        sort=[
+            app_commands.Choice(name="Date/Time", value="date"),
+            app_commands.Choice(name="Relevance", value="relevance"),
+        ],
+    )
+
+    @app_commands.guild_only()
+    # Full-text meeting search with optional filters
+    async def search_meetings(
+        self,
+        interaction: discord.Interaction,
+        keyword: str,
+        status: Optional[str] = None,
+        host: Optional[discord.Member] = None,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        sort: str = "date",
+    ):
+        """Full-text meeting search by keyword, one page at a time"""
 
-    @app_commands.guilds(GUILD_ID)
-    # Simple meeting search by
-    async def search_meetings(self, interaction: discord.Interaction, keyword: str):
-        """Simple meeting search by keyword"""
+        match = build_search_query(keyword)
+        if match is None:
+            return await interaction.response.send_message("Please enter at least one word to search for.", ephemeral=True)
 
-        #Connects to database.db
-        async with aiosqlite.connect(DATABASE_PATH) as db:
-            cursor = await db.cursor()
+        # Convert the date filters to a [start_after, start_before) timestamp range covering whole days
+        try:
+            start_after = to_timestamp(datetime.strptime(parse_date(after), "%Y-%m-%d")) if after else None
+            start_before = to_timestamp(datetime.strptime(parse_date(before), "%Y-%m-%d") + timedelta(days=1)) if before else None
+        except ValueError as e:
+            return await interaction.response.send_message(str(e), ephemeral=True)
 
-            await cursor.execute(
-                """SELECT * FROM meetings
-                WHERE name LIKE ? OR description LIKE ?
-                ORDER BY date_time ASC""",
-                (f"%{keyword}%", f"%{keyword}%")
+        search_args = {
+            "guild_id": interaction.guild_id,
+            "match": match,
+            "status": status,
+            "host_id": host.id if host else None,
+            "start_after": start_after,
+            "start_before": start_before,
+            "sort": sort,
+        }
+        meetings, has_next = await self.bot.db.search_meetings(**search_args, limit=PAGE_SIZE)
+
+        #If no meetings found, send message and return
+        if not meetings:
+            return await interaction.response.send_message(
+                f"No meetings found containing '{shorten_keyword(keyword)}'",
+                ephemeral=True
             )
 
-            # Fetch all matching meetings
-            meetings = await cursor.fetchall()
-
-            #If no meetings found, send message and return
-            if not meetings:
-                return await interaction.response.send_message(
-                    f"No meetings found containing ' {keyword}'",
-                    ephemeral=True
-                )
-            
-            # Response message with meeting details
-            response = [f"** Meetings containing '{keyword}':**"]
-            for meeting in meetings:
-                response.append(
-                    f"\n**{meeting[1]}** (ID: {meeting[0]})"
-                    f"\n- When: {meeting[4]}"
-                    f"\n- Host: <@{meeting[3]}>"
-                    f"\n----------------------------------"
-                )
-
-            await interaction.response.send_message(
-                    "\n".join(response),
-                    ephemeral=True
-                )
+        # Show the first page with buttons to move between pages
+        view = SearchResultsView(self.bot.db, keyword, search_args, meetings, has_next)
+        await interaction.response.send_message(embed=view.build_embed(), view=view, ephemeral=True)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(SearchMeetingCog(bot))
-
@@ -0,0 +1,68 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from typing import Optional
+
+
+class ServerConfigCog(commands.Cog):
+    """Lets each server rename the channels and roles the bot looks for (stored per guild in bot.guild_configs)."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @app_commands.command(
+        name="server_config",
+        description="Shows or changes the names of the channels and roles the bot uses in this server.",
+    )
+    @app_commands.describe(
+        meetings_category="Category that holds the meeting channels and the forum",
+        meeting_forum="Forum channel (inside the meetings category) that gets a post per meeting",
+        archive_category="Category /cleanup moves meeting text channels to",
+        lobby_channel="Voice channel members are moved out of into their meeting",
+        bot_role="Role that is given access to every meeting channel",
+    )
+    @app_commands.default_permissions(manage_guild=True)
+    @app_commands.guild_only()
+    async def server_config(
+        self,
+        interaction: discord.Interaction,
+        meetings_category: Optional[str] = None,
+        meeting_forum: Optional[str] = None,
+        archive_category: Optional[str] = None,
+        lobby_channel: Optional[str] = None,
+        bot_role: Optional[str] = None,
+    ):
+        guild = interaction.guild
+        if guild is None:
+            return await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+
+        names = {
+            "meetings_category": meetings_category,
+            "meeting_forum": meeting_forum,
+            "archive_category": archive_category,
+            "lobby_channel": lobby_channel,
+            "bot_role": bot_role,
+        }
+        names = {key: name.strip() for key, name in names.items() if name is not None and name.strip()}
+        if names:
+            config = await self.bot.guild_configs.update(guild.id, **names)
+        else:
+            config = self.bot.guild_configs.get(guild.id)
+
+        found = {
+            "meetings_category": config.get_meetings_category(guild),
+            "meeting_forum": config.get_meeting_forum(guild),
+            "archive_category": config.get_archive_category(guild),
+            "lobby_channel": discord.utils.get(guild.voice_channels, name=config.lobby_channel),
+            "bot_role": config.get_bot_role(guild),
+        }
+        lines = ["Updated the server configuration:" if names else "Server configuration:"]
+        lines.extend(
+            f"• {key.replace('_', ' ').capitalize()}: **{name}**{'' if found[key] is not None else ' (not found)'}"
+            for key, name in config._asdict().items()
+        )
+        await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(ServerConfigCog(bot))
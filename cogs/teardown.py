@@ -0,0 +1,132 @@
+import discord, asyncio
+from discord import app_commands
+from discord.ext import commands
+from typing import Optional
+from utils.leases import lease_shard
+from utils.timeutils import discord_timestamp
+
+
+class TeardownCog(commands.Cog):
+    """
+    Runs the Discord side of cancelling and cleaning up meetings through the persistent job queue (bot.jobs).
+
+    /cancel_meeting and /cleanup only update the database and queue one job per resource, so they answer
+    immediately. Every handler checks whether its work is already done first (channel gone, already archived,
+    ...), which makes retries and re-runs after a restart safe. Only jobs of guilds on the shards this process
+    holds the lease of are run; jobs left running on a shard are re-queued when its lease is acquired.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.start_task = None
+
+    async def cog_load(self):
+        self.bot.jobs.register("delete_channel", self.delete_channel)
+        self.bot.jobs.register("delete_role", self.delete_role)
+        self.bot.jobs.register("archive_text_channel", self.archive_text_channel)
+        self.bot.jobs.register("thread_notice", self.thread_notice)
+        self.bot.jobs.register("archive_thread", self.archive_thread)
+        self.start_task = asyncio.create_task(self.start_jobs())
+
+    async def cog_unload(self):
+        if self.start_task is not None:
+            self.start_task.cancel()
+        await self.bot.jobs.stop()
+
+    async def start_jobs(self):
+        await self.bot.wait_until_ready()  # Handlers need the guild cache
+        self.bot.jobs.start()
+
+    @commands.Cog.listener()
+    async def on_lease_acquired(self, name: str):
+        shard_id = lease_shard(name)
+        if shard_id is not None:
+            await self.bot.jobs.recover((self.bot.leases.shard_count, [shard_id]))
+
+    def get_guild(self, payload: dict) -> discord.Guild:
+        guild = self.bot.get_guild(payload["guild_id"])
+        if guild is None:
+            raise RuntimeError(f"Guild {payload['guild_id']} is not available")
+        return guild
+
+    async def get_thread(self, guild: discord.Guild, thread_id: int) -> Optional[discord.Thread]:
+        thread = guild.get_channel_or_thread(thread_id)
+        if thread is None:
+            try:
+                thread = await self.bot.fetch_channel(thread_id)  # Archived threads are not cached
+            except discord.NotFound:
+                return None
+        return thread if isinstance(thread, discord.Thread) else None
+
+    async def delete_channel(self, payload: dict):
+        channel = self.get_guild(payload).get_channel(payload["channel_id"])
+        if channel is None:
+            return
+        try:
+            await channel.delete(reason=payload.get("reason"))
+        except discord.NotFound:
+            pass
+
+    async def delete_role(self, payload: dict):
+        role = self.get_guild(payload).get_role(payload["role_id"])
+        if role is None:
+            return
+        try:
+            await role.delete(reason=payload.get("reason"))
+        except discord.NotFound:
+            pass
+
+    async def archive_text_channel(self, payload: dict):
+        """Moves a meeting's text channel to the archive category, telling its members once it has moved."""
+        guild = self.get_guild(payload)
+        config = self.bot.guild_configs.get(guild.id)
+        archive_category = config.get_archive_category(guild)
+        if archive_category is None:
+            raise RuntimeError(f"The '{config.archive_category}' category does not exist")
+        channel = guild.get_channel(payload["channel_id"])
+        if channel is None or channel.category_id == archive_category.id:
+            return
+        await channel.edit(category=archive_category, reason="Meeting archived")
+        await channel.send(f"This meeting has been archived and moved to {archive_category.name}.")
+
+    async def thread_notice(self, payload: dict):
+        """Posts a notice in a meeting's forum thread, then queues archiving it (optionally locked)."""
+        thread = await self.get_thread(self.get_guild(payload), payload["thread_id"])
+        if thread is None:
+            return
+        if thread.archived:
+            await thread.edit(archived=False)
+        await thread.send(payload["message"])
+        # A separate job, so a failure to archive never posts the notice twice.
+        lock_state = "locked" if payload.get("lock") else "open"
+        await self.bot.jobs.enqueue([(f"archive_thread:{thread.id}:{lock_state}", "archive_thread", payload, payload.get("meeting_id"))])
+
+    async def archive_thread(self, payload: dict):
+        thread = await self.get_thread(self.get_guild(payload), payload["thread_id"])
+        if thread is None or (thread.archived and thread.locked == payload.get("lock", False)):
+            return
+        await thread.edit(archived=True, locked=payload.get("lock", False))
+
+    @app_commands.command(
+        name="job_status",
+        description="Shows the background cleanup work still pending for a meeting, or for all meetings.",
+    )
+    @app_commands.describe(meeting_id="Only show jobs for this meeting")
+    @app_commands.guild_only()
+    async def job_status(self, interaction: discord.Interaction, meeting_id: Optional[int] = None):
+        rows = await self.bot.db.job_status(interaction.guild_id, meeting_id)
+        scope = f"meeting {meeting_id}" if meeting_id is not None else "all meetings"
+        if not rows:
+            return await interaction.response.send_message(f"No outstanding background jobs for {scope}.", ephemeral=True)
+
+        lines = []
+        for row in rows:
+            line = f"**{row['status'].capitalize()}:** {row['count']} (last update {discord_timestamp(row['updated_at'], 'R')})"
+            if row["last_error"] and row["status"] != "done":
+                line += f"\n  Last error: `{row['last_error'][:200]}`"
+            lines.append(line)
+        await interaction.response.send_message(f"Background jobs for {scope}:\n" + "\n".join(lines), ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(TeardownCog(bot))
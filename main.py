@@ -1,10 +1,24 @@
-import discord, os, dotenv, aiosqlite
+import discord, os, dotenv
 from discord.ext import commands
+from utils.database import Database
+from utils.meeting_index import MeetingIndex
+from utils.intervals import ParticipantIntervalIndex
+from utils.channel_pool import ChannelPool
+from utils.job_queue import JobQueue
+from utils.notifier import Notifier
+from utils.meeting_buttons import MeetingButton
+from utils.guild_config import GuildConfigs
+from utils.leases import LeaseManager
 
 dotenv.load_dotenv()
 
-# SERVER ID
-GUILD_ID = discord.Object(id=(os.getenv("GUILD_ID")))
+# Optional: the server a single-server deployment ran in. Meetings stored before guild ids were are assigned to it.
+LEGACY_GUILD_ID = os.getenv("GUILD_ID")
+
+# Optional sharding: SHARD_COUNT shards in total, of which this process runs SHARD_IDS (comma-separated).
+# Without them, Discord's recommended shard count is used and every shard runs in this process.
+SHARD_COUNT = int(os.getenv("SHARD_COUNT")) if os.getenv("SHARD_COUNT") else None
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv("SHARD_IDS").split(",")] if os.getenv("SHARD_IDS") else None
 
 
 async def ensure_custom_emoji(guild: discord.Guild, emoji_name: str, image_path: str) -> discord.Emoji:
@@ -36,10 +50,13 @@ async def ensure_custom_emoji(guild: discord.Guild, emoji_name: str, image_path:
         return None
 
 
-class Client(commands.Bot):
+class Client(commands.AutoShardedBot):
     async def setup_hook(self):
         await self.create_database()
 
+        # Opt-In/Opt-Out buttons encode their meeting in the custom_id, so one registration serves every forum post, also after a restart.
+        self.add_dynamic_items(MeetingButton)
+
         # Dynamically load all Cog files from the cogs folder.
         for filename in os.listdir("./cogs"):
             if filename.endswith(".py"):
@@ -50,72 +67,95 @@ class Client(commands.Bot):
                 except Exception as e:
                     print(f"Failed to load extension {extension}: {e}")
 
-    async def create_database(self):
-        # Creates the SQLite database and intializes tables.
-        self.db = await aiosqlite.connect("database.db")
-        cursor = await self.db.cursor()
-
-        await cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS meetings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                description TEXT,
-                host_id INTEGER NOT NULL, --Discord User ID
-                date_time TEXT, --Unix timestamp (seconds)
-                duration INTEGER, --In minutes
-                created_at TEXT DEFAULT (strftime('%s', 'now')),
-                updated_at TEXT DEFAULT (strftime('%s', 'now')),
-                status TEXT CHECK(status IN ('scheduled', 'cancelled', 'completed')) DEFAULT 'scheduled',
-                voice_channel_id INTEGER,
-                thread_id INTEGER,
-                role_id INTEGER,
-                recurrence INTEGER CHECK(recurrence IN (0, 1, 7, 30)) DEFAULT 0
-            );
-        """
-        )
-
-        await cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS participants (
-                meeting_id INTEGER,
-                user_id INTEGER,
-                current_status TEXT CHECK(current_status IN ('Available','Busy')) DEFAULT 'Busy',
-                FOREIGN KEY (meeting_id) references meetings(id) ON DELETE CASCADE
-            );
-        """
-        )
-
-        await self.db.commit()
-        print("Database initialized successfully.")
-
-    async def on_ready(self):
-        # Sync the command tree for the specific guild so that the slash commands are registered immediately.
+        # Commands are registered globally, so they are available in every server the bot is in.
         try:
-            synced = await self.tree.sync(guild=GUILD_ID)
-            print(f"Synced {len(synced)} command(s) for guild {GUILD_ID.id}")
+            synced = await self.tree.sync()
+            print(f"Synced {len(synced)} global command(s)")
+            if LEGACY_GUILD_ID:
+                # Drop the copies registered for just this server before, so they do not show up twice.
+                await self.tree.sync(guild=discord.Object(id=int(LEGACY_GUILD_ID)))
         except Exception as e:
             print(f"Error syncing commands: {e}")
-        print(f"Logged on as {self.user}")
-
-        # After logging in, ensure the custom emoji exists.
-        guild = self.get_guild(GUILD_ID.id)
-        if guild:
-            emoji_data = [
-                ("discord_logo", "images/discord_logo.png"),
-            ]
-            for name, path in emoji_data:
-                emoji = await ensure_custom_emoji(guild, name, path)
-                if emoji:
-                    print(f"Using custom emoji: {emoji}")
-                else:
-                    print("Custom emoji not created, ensure the image file exists and the bot has Manage/Create Expressions permission.")
+
+    async def create_database(self):
+        # Opens the shared connection pool and applies any pending schema migrations. Cogs access it through self.bot.db.
+        self.db = Database()
+        version = await self.db.connect()
+        print(f"Database initialized successfully (schema version {version}).")
+        if LEGACY_GUILD_ID:
+            assigned = await self.db.assign_guild(int(LEGACY_GUILD_ID))
+            if assigned:
+                print(f"Assigned {assigned} meeting(s) to guild {LEGACY_GUILD_ID}.")
+
+        # Background work is split into leases so that, with several processes on this database, each piece runs in
+        # exactly one of them. Cogs name the leases they need, check self.leases before doing the work and pick it up
+        # on the `lease_acquired` event.
+        self.leases = LeaseManager(self.db, on_acquired=lambda name: self.dispatch("lease_acquired", name))
+        self.leases.start()
+
+        # Per-server channel and role names, served from memory through self.guild_configs.
+        self.guild_configs = GuildConfigs(self.db)
+        await self.guild_configs.load()
+
+        # Voice channel/role -> meeting lookups are served from memory. Cogs keep it current through self.bot.meeting_index.
+        self.meeting_index = MeetingIndex()
+        await self.meeting_index.load(self.db)
+
+        # Per-user sorted meeting times, used to warn about overlaps the moment someone opts in.
+        self.interval_index = ParticipantIntervalIndex()
+        await self.interval_index.load(self.db)
+
+        # Pre-provisioned meeting roles/channels handed out by /create; MEETING_POOL_SIZE=0 (the default) turns it off.
+        self.channel_pool = ChannelPool(self.db, int(os.getenv("MEETING_POOL_SIZE", 0)))
+
+        # Persistent background jobs (e.g. tearing down a cancelled meeting's channels). Handlers are registered by the cogs.
+        self.jobs = JobQueue(self.db, shards=self.leases.owned_shards)
+
+        # Direct messages (conflict warnings, cancellations) are queued through self.notifier and sent in the background.
+        self.notifier = Notifier(self, self.db)
+        await self.notifier.load()
+        self.notifier.start()
+
+    async def close(self):
+        if getattr(self, "notifier", None) is not None:
+            self.notifier.stop()
+        await super().close()
+        if getattr(self, "leases", None) is not None:
+            await self.leases.stop()  # Lets another process take over right away instead of after the leases expire
+        if getattr(self, "db", None) is not None:
+            await self.db.close()
+
+    async def on_connect(self):
+        # The shard count is only known once the shards are launched; take the leases of this process's shards.
+        self.leases.set_shards(self.shard_count, self.shard_ids or range(self.shard_count))
+        await self.leases.renew()
+
+    async def on_ready(self):
+        print(f"Logged on as {self.user} in {len(self.guilds)} server(s)")
+
+        # After logging in, ensure the custom emoji exists in every server.
+        for guild in self.guilds:
+            await self.ensure_emojis(guild)
+
+    async def on_guild_join(self, guild: discord.Guild):
+        await self.ensure_emojis(guild)
+
+    async def ensure_emojis(self, guild: discord.Guild):
+        emoji_data = [
+            ("discord_logo", "images/discord_logo.png"),
+        ]
+        for name, path in emoji_data:
+            emoji = await ensure_custom_emoji(guild, name, path)
+            if emoji:
+                print(f"Using custom emoji in {guild.name}: {emoji}")
+            else:
+                print(f"Custom emoji not created in {guild.name}, ensure the image file exists and the bot has Manage/Create Expressions permission.")
 
 
 intents = discord.Intents.default()
 intents.message_content = True
 
-client = Client(command_prefix="/", intents=intents)
+client = Client(command_prefix="/", intents=intents, shard_count=SHARD_COUNT, shard_ids=SHARD_IDS)
 
 # Run bot with given token
 client.run(f"{os.getenv('DEV_TOKEN')}")
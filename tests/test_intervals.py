@@ -0,0 +1,128 @@
+from utils.intervals import Interval, ParticipantIntervalIndex, find_conflict_groups, overlaps
+
+
+def keys(groups):
+    return [[interval.key for interval in group] for group in groups]
+
+
+def test_overlapping_intervals_form_a_group():
+    assert keys(find_conflict_groups([Interval(0, 60, "a"), Interval(30, 90, "b")])) == [["a", "b"]]
+
+
+def test_back_to_back_intervals_do_not_conflict():
+    a, b = Interval(0, 60, "a"), Interval(60, 120, "b")
+    assert not overlaps(a, b)
+    assert find_conflict_groups([a, b]) == []
+
+
+def test_chain_of_overlaps_is_one_group():
+    # a overlaps b and b overlaps c, even though a and c do not overlap each other.
+    intervals = [Interval(100, 200, "c"), Interval(0, 60, "a"), Interval(50, 110, "b")]
+    assert keys(find_conflict_groups(intervals)) == [["a", "b", "c"]]
+
+
+def test_separate_groups_and_lone_intervals():
+    intervals = [Interval(0, 10, "a"), Interval(5, 15, "b"), Interval(20, 30, "c"), Interval(40, 50, "d"), Interval(45, 55, "e")]
+    assert keys(find_conflict_groups(intervals)) == [["a", "b"], ["d", "e"]]
+
+
+def test_interval_contained_in_a_long_one_extends_nothing():
+    intervals = [Interval(0, 100, "a"), Interval(10, 20, "b"), Interval(90, 110, "c")]
+    assert keys(find_conflict_groups(intervals)) == [["a", "b", "c"]]
+
+
+def make_index(meetings, participations):
+    index = ParticipantIntervalIndex()
+    for meeting_id, (start, end) in meetings.items():
+        index.set_meeting(meeting_id, start, end, f"Meeting {meeting_id}")
+    for meeting_id, user_id in participations:
+        index.add_participant(meeting_id, user_id)
+    return index
+
+
+def overlapping_keys(index, user_id, meeting_id):
+    return [interval.key for interval in index.overlapping(user_id, meeting_id)]
+
+
+def test_index_finds_overlapping_meetings_of_the_user_only():
+    index = make_index({1: (0, 60), 2: (30, 90), 3: (200, 260)}, [(1, 7), (2, 7), (3, 7), (2, 8)])
+    assert overlapping_keys(index, 7, 1) == [2]
+    assert overlapping_keys(index, 7, 3) == []
+    assert overlapping_keys(index, 8, 2) == []
+
+
+def test_index_back_to_back_meetings_do_not_overlap():
+    index = make_index({1: (0, 60), 2: (60, 120)}, [(1, 7), (2, 7)])
+    assert overlapping_keys(index, 7, 1) == []
+    assert overlapping_keys(index, 7, 2) == []
+
+
+def test_index_finds_long_meeting_that_started_earlier():
+    index = make_index({1: (0, 1000), 2: (10, 20), 3: (500, 510)}, [(1, 7), (2, 7), (3, 7)])
+    assert overlapping_keys(index, 7, 3) == [1]
+    assert overlapping_keys(index, 7, 1) == [2, 3]
+
+
+def test_index_readding_a_participant_is_a_no_op():
+    index = make_index({1: (0, 60), 2: (30, 90)}, [(1, 7), (2, 7), (2, 7)])
+    assert [interval.key for interval in index.user_intervals[7]] == [1, 2]
+    assert overlapping_keys(index, 7, 1) == [2]
+
+
+def test_index_moving_a_meeting_resorts_it():
+    index = make_index({1: (0, 60), 2: (30, 90)}, [(1, 7), (2, 7)])
+    index.set_meeting(2, 100, 160, "Meeting 2")
+    assert overlapping_keys(index, 7, 1) == []
+    assert [interval.key for interval in index.user_intervals[7]] == [1, 2]
+
+    index.set_meeting(1, 120, 180, "Meeting 1")
+    assert overlapping_keys(index, 7, 2) == [1]
+    assert [(interval.start, interval.key) for interval in index.user_intervals[7]] == [(100, 2), (120, 1)]
+
+
+def test_index_removing_participants_and_meetings():
+    index = make_index({1: (0, 60), 2: (30, 90), 3: (40, 50)}, [(1, 7), (2, 7), (3, 7)])
+
+    index.remove_participant(2, 7)
+    assert overlapping_keys(index, 7, 1) == [3]
+
+    index.remove_meeting(3)
+    assert overlapping_keys(index, 7, 1) == []
+    assert overlapping_keys(index, 7, 3) == []
+    assert index.meeting_name(3) is None
+
+    index.remove_participant(1, 7)
+    assert 7 not in index.user_intervals
+    assert 7 not in index.user_longest
+
+
+def test_index_ignores_participants_of_unknown_meetings():
+    index = make_index({1: (0, 60)}, [(99, 7), (1, 7)])
+    assert [interval.key for interval in index.user_intervals[7]] == [1]
+
+
+def test_index_recurring_meeting_overlaps_through_any_occurrence():
+    # Meeting 1 recurs daily; only its second occurrence overlaps meeting 2.
+    index = make_index({1: (0, 60), 2: (86400 + 30, 86400 + 90)}, [(1, 7), (2, 7)])
+    assert overlapping_keys(index, 7, 2) == []
+
+    index.set_occurrences(1, [(0, 60), (86400, 86460), (172800, 172860)])
+    assert overlapping_keys(index, 7, 2) == [1]
+    assert [(interval.start, interval.key) for interval in index.overlapping(7, 2)] == [(86400, 1)]
+    assert overlapping_keys(index, 7, 1) == [2]
+
+
+def test_index_replacing_and_removing_occurrences():
+    index = make_index({1: (0, 60), 2: (86400 + 30, 86400 + 90)}, [(1, 7), (2, 7)])
+    index.set_occurrences(1, [(0, 60), (86400, 86460)])
+    assert len(index.user_intervals[7]) == 3
+
+    index.set_occurrences(1, [(0, 60), (172800, 172860)])
+    assert overlapping_keys(index, 7, 2) == []
+    assert len(index.user_intervals[7]) == 3
+
+    index.remove_participant(1, 7)
+    assert [interval.key for interval in index.user_intervals[7]] == [2]
+
+    index.remove_meeting(1)
+    assert 1 not in index.occurrences
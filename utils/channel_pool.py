@@ -0,0 +1,93 @@
+import asyncio, discord
+from typing import Optional, Tuple
+
+POOL_ROLE_NAME = "Meeting: (unassigned)"
+POOL_CHANNEL_NAME = "unassigned-meeting"
+
+MeetingResources = Tuple[discord.Role, discord.TextChannel, discord.VoiceChannel]
+
+
+async def create_meeting_resources(
+    guild: discord.Guild, category: discord.CategoryChannel, bot_role: discord.Role, role_name: str, channel_name: str
+) -> MeetingResources:
+    """
+    Creates a meeting role and its private text and voice channels. The role comes first since both channel
+    overwrites reference it; the channels are then created concurrently. If anything fails, whatever was
+    already created is deleted again and the first error is raised.
+    """
+    role = await guild.create_role(name=role_name, reason="Created for meeting access")
+    overwrites = {
+        guild.default_role: discord.PermissionOverwrite(view_channel=False),
+        bot_role: discord.PermissionOverwrite(view_channel=True, move_members=True),
+        role: discord.PermissionOverwrite(view_channel=True, send_messages=True, connect=True),
+    }
+    channels = await asyncio.gather(
+        guild.create_text_channel(name=f"{channel_name}-text", category=category, overwrites=overwrites),
+        guild.create_voice_channel(name=f"{channel_name}-voice", category=category, overwrites=overwrites),
+        return_exceptions=True,
+    )
+    failures = [result for result in channels if isinstance(result, Exception)]
+    if failures:
+        await delete_resources([role, *(result for result in channels if not isinstance(result, Exception))], "Meeting creation failed")
+        raise failures[0]
+    text_channel, voice_channel = channels
+    return role, text_channel, voice_channel
+
+
+async def delete_resources(resources, reason: str):
+    for resource in resources:
+        try:
+            await resource.delete(reason=reason)
+        except Exception as e:
+            print(f"Error deleting {resource}: {e}")
+
+
+class ChannelPool:
+    """
+    A warm pool of meeting roles and channel pairs, created ahead of time so /create only has to rename them.
+
+    Pooled channels already carry the overwrites for their own role, which nobody holds yet, so they stay
+    hidden until handed out. The pool is persisted in the channel_pool table so it survives restarts.
+    A size of 0 disables it.
+    """
+
+    def __init__(self, db, size: int):
+        self.db = db
+        self.size = size
+
+    async def take(self, guild: discord.Guild, role_name: str, channel_name: str) -> Optional[MeetingResources]:
+        """Hands out a pooled set renamed for a meeting, or returns None if the pool has nothing usable."""
+        while self.size > 0:
+            row = await self.db.take_pooled_resources(guild.id)
+            if row is None:
+                return None
+
+            role = guild.get_role(row["role_id"])
+            text_channel = guild.get_channel(row["text_channel_id"])
+            voice_channel = guild.get_channel(row["voice_channel_id"])
+            if role is None or text_channel is None or voice_channel is None:
+                # Part of the set was deleted by hand; drop the rest and try the next one.
+                await delete_resources([resource for resource in (role, text_channel, voice_channel) if resource], "Incomplete pooled meeting resources")
+                continue
+
+            # The three renames are independent, so the whole handout costs one round-trip.
+            results = await asyncio.gather(
+                role.edit(name=role_name, reason="Assigned to a meeting"),
+                text_channel.edit(name=f"{channel_name}-text", reason="Assigned to a meeting"),
+                voice_channel.edit(name=f"{channel_name}-voice", reason="Assigned to a meeting"),
+                return_exceptions=True,
+            )
+            if any(isinstance(result, Exception) for result in results):
+                await delete_resources([role, text_channel, voice_channel], "Could not assign pooled meeting resources")
+                continue
+            return role, text_channel, voice_channel
+        return None
+
+    async def missing(self, guild: discord.Guild) -> int:
+        """How many sets the guild's pool is short of its size."""
+        return max(0, self.size - await self.db.pooled_resource_count(guild.id))
+
+    async def add(self, guild: discord.Guild, category: discord.CategoryChannel, bot_role: discord.Role):
+        """Provisions one more hidden set into the pool."""
+        role, text_channel, voice_channel = await create_meeting_resources(guild, category, bot_role, POOL_ROLE_NAME, POOL_CHANNEL_NAME)
+        await self.db.add_pooled_resources(guild.id, role.id, text_channel.id, voice_channel.id)
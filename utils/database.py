@@ -0,0 +1,823 @@
+import asyncio, re, sqlite3, aiosqlite
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable, List, Optional, Sequence, Set, Tuple
+from utils.migrations import run_migrations
+from utils.timeutils import now_ts
+
+DATABASE_PATH = "database.db"
+READER_COUNT = 3  # Number of long-lived read-only connections kept in the pool
+STATEMENT_CACHE_SIZE = 256  # Prepared statements cached per connection (sqlite3 reuses them by SQL text)
+SEARCH_TITLE_WEIGHT = 10.0  # bm25 weight of a title match relative to a description match
+DEFAULT_DURATION_MINUTES = 60  # Used for the end time of meetings stored without a duration
+MAX_QUERY_PARAMETERS = 500  # Chunk size for IN (...) lists, below SQLite's bound-parameter limit on older builds
+DEFAULT_REMINDER_OFFSETS = [15 * 60]  # Reminder offsets (seconds before start) for guilds without their own default
+
+# Applied to every connection. WAL lets the readers run alongside the writer, and synchronous=NORMAL
+# is durable under WAL except for the last transactions before a power loss.
+CONNECTION_PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",  # ~16MB page cache
+    "PRAGMA mmap_size = 134217728",  # 128MB memory-mapped I/O
+]
+
+
+def build_search_query(text: str) -> Optional[str]:
+    """
+    Converts user search input into an FTS5 MATCH expression.
+
+    Quoted text becomes an exact phrase, every other word matches as a prefix ("stand" finds "standup"),
+    and all terms must match. Quotes and FTS5 operators typed by the user are never passed through raw,
+    so arbitrary input cannot produce a syntax error. Returns None if the input has no searchable terms.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text):
+        if phrase:
+            tokens = re.findall(r"\w+", phrase)
+            if tokens:
+                terms.append('"' + " ".join(tokens) + '"')
+        else:
+            terms.extend(f'"{token}"*' for token in re.findall(r"\w+", word))
+    return " ".join(terms) or None
+
+
+Shards = Tuple[int, Sequence[int]]  # (shard_count, shard_ids), see shard_filter()
+
+
+def shard_filter(column: str, shards: Optional[Shards]) -> Tuple[str, list]:
+    """
+    SQL condition (and its parameters) keeping the rows whose guild id `column` falls on one of the given
+    shards, using Discord's (guild_id >> 22) % shard_count. None keeps every row.
+    """
+    if shards is None:
+        return "1", []
+    shard_count, shard_ids = shards
+    return f"({column} >> 22) % ? IN ({', '.join('?' * len(shard_ids))})", [shard_count, *shard_ids]
+
+
+class Database:
+    """
+    Shared data-access layer owned by the bot.
+
+    Holds one writer connection (guarded by a lock so only one transaction runs at a time)
+    and a small pool of reader connections. Connections stay open for the lifetime of the bot,
+    so every query reuses the same aiosqlite thread and sqlite3's prepared statement cache
+    instead of reconnecting to the file. Cogs should go through the typed query methods below
+    rather than issuing SQL of their own.
+    """
+
+    def __init__(self, path: str = DATABASE_PATH, readers: int = READER_COUNT):
+        self.path = path
+        self.reader_count = readers
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._readers: "asyncio.Queue[aiosqlite.Connection]" = asyncio.Queue()
+        self._all_readers: List[aiosqlite.Connection] = []
+
+    async def _open(self) -> aiosqlite.Connection:
+        # isolation_level=None puts sqlite3 in autocommit mode; transactions are opened explicitly.
+        conn = await aiosqlite.connect(self.path, timeout=10, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            await conn.execute(pragma)
+        return conn
+
+    async def connect(self) -> int:
+        """Opens the writer connection, applies pending migrations, then fills the reader pool. Returns the schema version."""
+        self._writer = await self._open()
+        version = await self.migrate()
+        for _ in range(self.reader_count):
+            conn = await self._open()
+            self._all_readers.append(conn)
+            self._readers.put_nowait(conn)
+        return version
+
+    async def migrate(self) -> int:
+        """Brings the schema up to date and returns the current schema version."""
+        async with self._write_lock:
+            return await run_migrations(self._writer)
+
+    async def close(self):
+        """Closes every pooled connection."""
+        if self._writer is not None:
+            # Fold the WAL back into the main database file so it stays small between runs.
+            await self._writer.execute("PRAGMA optimize")
+            await self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        for conn in self._all_readers:
+            await conn.close()
+        self._all_readers.clear()
+        self._readers = asyncio.Queue()
+        if self._writer is not None:
+            await self._writer.close()
+            self._writer = None
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrows a reader connection from the pool for the duration of the block."""
+        conn = await self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Runs the block inside a single write transaction, rolling back on error."""
+        async with self._write_lock:
+            await self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.execute("ROLLBACK")
+                raise
+            else:
+                await self._writer.execute("COMMIT")
+
+    async def fetchone(self, sql: str, params: Iterable = ()) -> Optional[sqlite3.Row]:
+        async with self.reader() as conn:
+            async with conn.execute(sql, tuple(params)) as cursor:
+                return await cursor.fetchone()
+
+    async def fetchall(self, sql: str, params: Iterable = ()) -> List[sqlite3.Row]:
+        async with self.reader() as conn:
+            async with conn.execute(sql, tuple(params)) as cursor:
+                return await cursor.fetchall()
+
+    async def execute(self, sql: str, params: Iterable = ()) -> int:
+        """Runs a single write statement in its own transaction and returns the last inserted row id."""
+        async with self.transaction() as conn:
+            cursor = await conn.execute(sql, tuple(params))
+            return cursor.lastrowid
+
+    async def executemany(self, sql: str, rows: Iterable[Iterable]):
+        """Runs a write statement once per row, all inside a single transaction."""
+        async with self.transaction() as conn:
+            await conn.executemany(sql, [tuple(row) for row in rows])
+
+    async def executescript(self, script: str):
+        async with self._write_lock:
+            await self._writer.executescript(script)
+
+    # ----- Meetings -----
+
+    async def get_meeting(self, meeting_id: int, guild_id: Optional[int] = None) -> Optional[sqlite3.Row]:
+        """Returns the full meeting row (columns accessible by name) or None. With a guild_id, meetings of other guilds are not found."""
+        if guild_id is None:
+            return await self.fetchone("SELECT * FROM meetings WHERE id = ?", (meeting_id,))
+        return await self.fetchone("SELECT * FROM meetings WHERE id = ? AND guild_id = ?", (meeting_id, guild_id))
+
+    async def assign_guild(self, guild_id: int) -> int:
+        """Assigns meetings stored before guild ids were (single-server deployments) to the guild. Returns how many there were."""
+        async with self.transaction() as conn:
+            cursor = await conn.execute("UPDATE meetings SET guild_id = ? WHERE guild_id IS NULL", (guild_id,))
+            for table in ("participants", "attendance_log"):
+                await conn.execute(
+                    f"UPDATE {table} SET guild_id = (SELECT guild_id FROM meetings m WHERE m.id = {table}.meeting_id) WHERE guild_id IS NULL"
+                )
+            return cursor.rowcount
+
+    async def create_meeting(
+        self,
+        guild_id: int,
+        name: str,
+        description: str,
+        host_id: int,
+        start_time: int,
+        duration: int,
+        recurrence: Optional[int],
+        reminder_offsets: List[int],
+        voice_channel_id: Optional[int] = None,
+        role_id: Optional[int] = None,
+        text_channel_id: Optional[int] = None,
+    ) -> int:
+        """
+        Inserts a new scheduled meeting starting at the given Unix timestamp, along with its Discord resources
+        and reminders, in one transaction and returns its id.
+        """
+        async with self.transaction() as conn:
+            cursor = await conn.execute(
+                """
+                INSERT INTO meetings (
+                    guild_id, name, description, host_id, start_time, end_time, duration, status, recurrence, series_start, voice_channel_id, role_id, text_channel_id
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, 'scheduled', ?, ?, ?, ?, ?)
+                """,
+                (
+                    guild_id, name, description, host_id, start_time, start_time + duration * 60, duration,
+                    recurrence, start_time if recurrence else None, voice_channel_id, role_id, text_channel_id,
+                ),
+            )
+            meeting_id = cursor.lastrowid
+            await conn.executemany(
+                "INSERT INTO reminders (meeting_id, offset_seconds, due_at) VALUES (?, ?, ?)",
+                [(meeting_id, offset, start_time - offset) for offset in reminder_offsets],
+            )
+            return meeting_id
+
+    async def delete_meeting(self, meeting_id: int):
+        """Deletes a meeting along with its reminders, participants and occurrences, e.g. when /create fails halfway."""
+        await self.execute("DELETE FROM meetings WHERE id = ?", (meeting_id,))
+
+    async def import_meetings(self, guild_id: int, host_id: int, meetings: Iterable, default_offsets: List[int]) -> List[int]:
+        """
+        Inserts utils.importer.ImportedMeeting rows and their reminders in one transaction and returns their ids.
+        They have no Discord resources yet; see unprovisioned_meetings().
+        """
+        meeting_ids = []
+        async with self.transaction() as conn:
+            for meeting in meetings:
+                cursor = await conn.execute(
+                    """
+                    INSERT INTO meetings (guild_id, name, description, host_id, start_time, end_time, duration, status, recurrence, series_start)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, 'scheduled', ?, ?)
+                    """,
+                    (
+                        guild_id, meeting.title, meeting.description, host_id, meeting.start_time, meeting.start_time + meeting.duration * 60,
+                        meeting.duration, meeting.recurrence, meeting.start_time if meeting.recurrence else None,
+                    ),
+                )
+                meeting_ids.append(cursor.lastrowid)
+                offsets = default_offsets if meeting.reminder_offsets is None else meeting.reminder_offsets
+                await conn.executemany(
+                    "INSERT INTO reminders (meeting_id, offset_seconds, due_at) VALUES (?, ?, ?)",
+                    [(cursor.lastrowid, offset, meeting.start_time - offset) for offset in offsets],
+                )
+        return meeting_ids
+
+    async def unprovisioned_meetings(self) -> List[sqlite3.Row]:
+        """Scheduled meetings that were imported but have no role and channels yet, oldest first."""
+        return await self.fetchall("SELECT * FROM meetings WHERE status = 'scheduled' AND role_id IS NULL ORDER BY id")
+
+    async def set_meeting_resources(self, meeting_id: int, text_channel_id: int, voice_channel_id: int, role_id: int, thread_id: int):
+        await self.execute(
+            "UPDATE meetings SET text_channel_id = ?, voice_channel_id = ?, role_id = ?, thread_id = ? WHERE id = ?",
+            (text_channel_id, voice_channel_id, role_id, thread_id, meeting_id),
+        )
+
+    async def meetings_without_text_channel(self, guild_id: int) -> List[sqlite3.Row]:
+        """(id, name, voice_channel_id) of the guild's meetings created before text channel ids were stored."""
+        return await self.fetchall(
+            "SELECT id, name, voice_channel_id FROM meetings WHERE guild_id = ? AND text_channel_id IS NULL AND voice_channel_id IS NOT NULL", (guild_id,)
+        )
+
+    async def set_text_channel_ids(self, rows: Iterable[Tuple[int, int]]):
+        """Stores (text_channel_id, meeting_id) pairs."""
+        await self.executemany("UPDATE meetings SET text_channel_id = ? WHERE id = ?", rows)
+
+    async def set_meeting_thread(self, meeting_id: int, thread_id: int):
+        await self.execute("UPDATE meetings SET thread_id = ? WHERE id = ?", (thread_id, meeting_id))
+
+    async def meeting_for_thread(self, thread_id: int) -> Optional[int]:
+        """The id of the meeting whose forum post is this thread, if any."""
+        row = await self.fetchone("SELECT id FROM meetings WHERE thread_id = ?", (thread_id,))
+        return row[0] if row else None
+
+    async def set_meeting_status(self, meeting_id: int, status: str):
+        async with self.transaction() as conn:
+            await conn.execute("UPDATE meetings SET status = ?, updated_at = strftime('%s','now') WHERE id = ?", (status, meeting_id))
+            if status != "scheduled":
+                await conn.execute("DELETE FROM reminders WHERE meeting_id = ? AND sent_at IS NULL", (meeting_id,))
+
+    async def reschedule_meeting(self, meeting_id: int, start_time: int, duration: int):
+        """
+        Moves a meeting. For a recurring meeting this moves the whole series: it restarts from `start_time`
+        and its upcoming occurrences (including any single-occurrence changes) are dropped to be regenerated.
+        """
+        async with self.transaction() as conn:
+            await conn.execute(
+                """
+                UPDATE meetings SET start_time = ?, end_time = ?, duration = ?, updated_at = strftime('%s','now'),
+                    series_start = CASE WHEN recurrence > 0 THEN ? END, materialized_until = NULL
+                WHERE id = ?
+                """,
+                (start_time, start_time + (duration or DEFAULT_DURATION_MINUTES) * 60, duration, start_time, meeting_id),
+            )
+            await conn.execute("DELETE FROM occurrences WHERE meeting_id = ? AND end_time > ?", (meeting_id, now_ts()))
+            # The meeting moved, so every reminder is due again relative to the new start.
+            await conn.execute("UPDATE reminders SET due_at = ? - offset_seconds, sent_at = NULL WHERE meeting_id = ?", (start_time, meeting_id))
+
+    async def meeting_resources(self, guild_id: int) -> List[sqlite3.Row]:
+        """(id, name, status, text_channel_id, voice_channel_id, role_id, thread_id) of every meeting of the guild, for reconciling against it."""
+        return await self.fetchall(
+            "SELECT id, name, status, text_channel_id, voice_channel_id, role_id, thread_id FROM meetings WHERE guild_id = ?", (guild_id,)
+        )
+
+    async def scheduled_meeting_times(self) -> List[sqlite3.Row]:
+        """(id, name, start_time, end_time) of every scheduled meeting with a start time."""
+        return await self.fetchall("SELECT id, name, start_time, end_time FROM meetings WHERE status = 'scheduled' AND start_time IS NOT NULL")
+
+    async def meeting_routes(self) -> List[sqlite3.Row]:
+        """(id, voice_channel_id, role_id) of every scheduled meeting, used to build the in-memory MeetingIndex."""
+        return await self.fetchall("SELECT id, voice_channel_id, role_id FROM meetings WHERE status = 'scheduled'")
+
+    async def search_meetings(
+        self,
+        guild_id: int,
+        match: str,
+        status: Optional[str] = None,
+        host_id: Optional[int] = None,
+        start_after: Optional[int] = None,
+        start_before: Optional[int] = None,
+        sort: str = "date",
+        cursor: Optional[Tuple[float, int]] = None,
+        backwards: bool = False,
+        limit: int = 10,
+    ) -> Tuple[List[sqlite3.Row], bool]:
+        """
+        Returns one page of a full-text search over meeting titles and descriptions.
+
+        Only the guild's meetings are searched. `match` is an FTS5 expression (see build_search_query). The
+        optional filters are applied in the same query. Pages use keyset pagination: `cursor` is the
+        (sort_key, id) of the last row of the previous page (or the first row when `backwards` is set), so
+        each page reads only `limit` rows past the cursor no matter how deep it is. Each returned row has a
+        `sort_key` column for building the next cursor. Returns (rows in display order, whether another page exists in the requested direction).
+
+        sort="date" orders by start time then id and walks the (guild_id, start_time) index; sort="relevance"
+        orders by bm25 score (title matches weighted above description matches).
+        """
+        if sort == "relevance":
+            sort_key = f"bm25(meetings_fts, {SEARCH_TITLE_WEIGHT}, 1.0)"
+            source = "meetings_fts JOIN meetings m ON m.id = meetings_fts.rowid WHERE meetings_fts MATCH ?"
+        else:
+            # The unary + stops SQLite from driving the query off the match set, so it walks idx_meetings_guild_start_time
+            # from the cursor instead and stops once the page is full (no sort over every match).
+            sort_key = "m.start_time"
+            source = "meetings m WHERE +m.id IN (SELECT rowid FROM meetings_fts WHERE meetings_fts MATCH ?) AND m.start_time IS NOT NULL"
+
+        params = [match, guild_id]
+        conditions = ["m.guild_id = ?"]
+        if status is not None:
+            conditions.append("m.status = ?")
+            params.append(status)
+        if host_id is not None:
+            conditions.append("m.host_id = ?")
+            params.append(host_id)
+        if start_after is not None:
+            conditions.append("m.start_time >= ?")
+            params.append(start_after)
+        if start_before is not None:
+            conditions.append("m.start_time < ?")
+            params.append(start_before)
+        if cursor is not None:
+            conditions.append(f"({sort_key}, m.id) {'<' if backwards else '>'} (?, ?)")
+            params.extend(cursor)
+
+        direction = "DESC" if backwards else "ASC"
+        rows = await self.fetchall(
+            f"""
+            SELECT m.id, m.name, m.description, m.host_id, m.start_time, m.status, {sort_key} AS sort_key
+            FROM {source}
+            {"".join(f" AND {condition}" for condition in conditions)}
+            ORDER BY sort_key {direction}, m.id {direction}
+            LIMIT ?
+            """,
+            (*params, limit + 1),
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return (rows[::-1] if backwards else rows), has_more
+
+    # ----- Occurrences -----
+
+    async def series_to_expand(self, until: int, meeting_id: Optional[int] = None) -> List[sqlite3.Row]:
+        """
+        (id, series_start, duration, recurrence, materialized_until) of scheduled recurring meetings (or just the
+        given one) not yet expanded up to `until`.
+        """
+        return await self.fetchall(
+            f"""
+            SELECT id, series_start, duration, recurrence, materialized_until FROM meetings
+            WHERE status = 'scheduled' AND recurrence > 0 AND series_start IS NOT NULL
+                AND (materialized_until IS NULL OR materialized_until < ?){" AND id = ?" if meeting_id is not None else ""}
+            """,
+            (until,) if meeting_id is None else (until, meeting_id),
+        )
+
+    async def add_occurrences(self, occurrences: List[Tuple[int, int, int]], materialized: List[Tuple[int, int]]):
+        """
+        Stores newly generated (meeting_id, start_time, end_time) occurrences and the (materialized_until, meeting_id)
+        each series is now expanded to, in one transaction. Existing occurrences are left untouched.
+        """
+        async with self.transaction() as conn:
+            await conn.executemany(
+                "INSERT OR IGNORE INTO occurrences (meeting_id, original_start, start_time, end_time) VALUES (?, ?, ?, ?)",
+                [(meeting_id, start_time, start_time, end_time) for meeting_id, start_time, end_time in occurrences],
+            )
+            await conn.executemany("UPDATE meetings SET materialized_until = ? WHERE id = ?", materialized)
+
+    async def recurring_meetings(self) -> List[sqlite3.Row]:
+        """(id, start_time, end_time) of every scheduled recurring meeting; start/end are its current occurrence."""
+        return await self.fetchall("SELECT id, start_time, end_time FROM meetings WHERE status = 'scheduled' AND recurrence > 0")
+
+    async def scheduled_occurrences(self, meeting_id: Optional[int] = None) -> List[sqlite3.Row]:
+        """(meeting_id, start_time, end_time) of every scheduled, unfinished occurrence of scheduled recurring meetings (or just one)."""
+        return await self.fetchall(
+            f"""
+            SELECT o.meeting_id, o.start_time, o.end_time FROM occurrences o
+            INNER JOIN meetings m ON m.id = o.meeting_id
+            WHERE m.status = 'scheduled' AND m.recurrence > 0 AND o.status = 'scheduled' AND o.end_time > ?{" AND o.meeting_id = ?" if meeting_id is not None else ""}
+            ORDER BY o.meeting_id, o.start_time
+            """,
+            (now_ts(),) if meeting_id is None else (now_ts(), meeting_id),
+        )
+
+    async def next_occurrence(self, meeting_id: int, now: int) -> Optional[sqlite3.Row]:
+        """The earliest scheduled occurrence of a meeting that has not ended by `now`."""
+        return await self.fetchone(
+            """
+            SELECT original_start, start_time, end_time FROM occurrences
+            WHERE meeting_id = ? AND status = 'scheduled' AND end_time > ?
+            ORDER BY start_time LIMIT 1
+            """,
+            (meeting_id, now),
+        )
+
+    async def set_current_occurrence(self, meeting_id: int, start_time: int, end_time: int):
+        """Points a recurring meeting at its next occurrence, making its reminders due again for it. Unlike a reschedule, the series is kept."""
+        async with self.transaction() as conn:
+            await conn.execute("UPDATE meetings SET start_time = ?, end_time = ? WHERE id = ?", (start_time, end_time, meeting_id))
+            await conn.execute("UPDATE reminders SET due_at = ? - offset_seconds, sent_at = NULL WHERE meeting_id = ?", (start_time, meeting_id))
+
+    async def find_occurrence(self, meeting_id: int, day_start: int, day_end: int) -> Optional[sqlite3.Row]:
+        """The occurrence of a meeting originally due within [day_start, day_end), whatever its status."""
+        return await self.fetchone(
+            """
+            SELECT original_start, start_time, end_time, status FROM occurrences
+            WHERE meeting_id = ? AND original_start >= ? AND original_start < ?
+            ORDER BY original_start LIMIT 1
+            """,
+            (meeting_id, day_start, day_end),
+        )
+
+    async def reschedule_occurrence(self, meeting_id: int, original_start: int, start_time: int, end_time: int):
+        async with self.transaction() as conn:
+            await conn.execute(
+                "UPDATE occurrences SET start_time = ?, end_time = ?, status = 'scheduled' WHERE meeting_id = ? AND original_start = ?",
+                (start_time, end_time, meeting_id, original_start),
+            )
+            await conn.execute("UPDATE meetings SET updated_at = strftime('%s','now') WHERE id = ?", (meeting_id,))
+
+    async def cancel_occurrence(self, meeting_id: int, original_start: int):
+        async with self.transaction() as conn:
+            await conn.execute("UPDATE occurrences SET status = 'cancelled' WHERE meeting_id = ? AND original_start = ?", (meeting_id, original_start))
+            await conn.execute("UPDATE meetings SET updated_at = strftime('%s','now') WHERE id = ?", (meeting_id,))
+
+    # ----- Channel pool -----
+
+    async def add_pooled_resources(self, guild_id: int, role_id: int, text_channel_id: int, voice_channel_id: int):
+        await self.execute(
+            "INSERT INTO channel_pool (role_id, guild_id, text_channel_id, voice_channel_id) VALUES (?, ?, ?, ?)",
+            (role_id, guild_id, text_channel_id, voice_channel_id),
+        )
+
+    async def take_pooled_resources(self, guild_id: int) -> Optional[sqlite3.Row]:
+        """Removes the guild's oldest pooled (role_id, text_channel_id, voice_channel_id) set from the pool and returns it, or None if it is empty."""
+        async with self.transaction() as conn:
+            async with conn.execute(
+                "SELECT role_id, text_channel_id, voice_channel_id FROM channel_pool WHERE guild_id = ? ORDER BY created_at LIMIT 1", (guild_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row is not None:
+                await conn.execute("DELETE FROM channel_pool WHERE role_id = ?", (row["role_id"],))
+            return row
+
+    async def pooled_resource_ids(self, guild_id: int) -> List[int]:
+        """Every role and channel id currently held in the guild's pool."""
+        rows = await self.fetchall("SELECT role_id, text_channel_id, voice_channel_id FROM channel_pool WHERE guild_id = ?", (guild_id,))
+        return [resource_id for row in rows for resource_id in row]
+
+    async def pooled_resource_count(self, guild_id: int) -> int:
+        row = await self.fetchone("SELECT COUNT(*) FROM channel_pool WHERE guild_id = ?", (guild_id,))
+        return row[0]
+
+    # ----- Reminders -----
+
+    async def guild_reminder_offsets(self, guild_id: int) -> List[int]:
+        """The guild's default reminder offsets in seconds, or DEFAULT_REMINDER_OFFSETS if it has not set any."""
+        row = await self.fetchone("SELECT reminder_offsets FROM guild_settings WHERE guild_id = ?", (guild_id,))
+        if row is None or row[0] is None:
+            return list(DEFAULT_REMINDER_OFFSETS)
+        return [int(offset) for offset in row[0].split(",") if offset]
+
+    async def set_guild_reminder_offsets(self, guild_id: int, offsets: List[int]):
+        await self.execute(
+            """
+            INSERT INTO guild_settings (guild_id, reminder_offsets) VALUES (?, ?)
+            ON CONFLICT (guild_id) DO UPDATE SET reminder_offsets = excluded.reminder_offsets
+            """,
+            (guild_id, ",".join(str(offset) for offset in offsets)),
+        )
+
+    async def guild_configs(self) -> List[sqlite3.Row]:
+        """(guild_id, meetings_category, meeting_forum, archive_category, lobby_channel, bot_role) of every guild with settings."""
+        return await self.fetchall("SELECT guild_id, meetings_category, meeting_forum, archive_category, lobby_channel, bot_role FROM guild_settings")
+
+    async def set_guild_config(self, guild_id: int, names: dict):
+        """Stores the given channel/role names (keyed by guild_settings column) for the guild, keeping the others."""
+        columns = list(names)
+        await self.execute(
+            f"""
+            INSERT INTO guild_settings (guild_id, {", ".join(columns)}) VALUES (?, {", ".join("?" * len(columns))})
+            ON CONFLICT (guild_id) DO UPDATE SET {", ".join(f"{column} = excluded.{column}" for column in columns)}
+            """,
+            (guild_id, *names.values()),
+        )
+
+    async def meeting_reminder_offsets(self, meeting_id: int) -> List[int]:
+        rows = await self.fetchall("SELECT offset_seconds FROM reminders WHERE meeting_id = ? ORDER BY offset_seconds DESC", (meeting_id,))
+        return [row[0] for row in rows]
+
+    async def set_meeting_reminders(self, meeting_id: int, offsets: List[int]):
+        """Replaces a meeting's reminders. Offsets that were already sent and are kept stay marked as sent."""
+        async with self.transaction() as conn:
+            placeholders = ", ".join("?" * len(offsets))
+            await conn.execute(
+                f"DELETE FROM reminders WHERE meeting_id = ?{f' AND offset_seconds NOT IN ({placeholders})' if offsets else ''}",
+                (meeting_id, *offsets),
+            )
+            await conn.executemany(
+                """
+                INSERT OR IGNORE INTO reminders (meeting_id, offset_seconds, due_at)
+                SELECT id, ?, start_time - ? FROM meetings WHERE id = ? AND start_time IS NOT NULL
+                """,
+                [(offset, offset, meeting_id) for offset in offsets],
+            )
+
+    async def next_reminder_due(self, shards: Optional[Shards] = None) -> Optional[int]:
+        """Timestamp of the earliest unsent reminder (of meetings on the given shards), read from the partial due_at index."""
+        if shards is None:
+            row = await self.fetchone("SELECT MIN(due_at) FROM reminders WHERE sent_at IS NULL")
+        else:
+            condition, params = shard_filter("m.guild_id", shards)
+            row = await self.fetchone(
+                f"SELECT MIN(r.due_at) FROM reminders r JOIN meetings m ON m.id = r.meeting_id WHERE r.sent_at IS NULL AND {condition}", params
+            )
+        return row[0] if row else None
+
+    async def due_reminders(self, now: int, shards: Optional[Shards] = None) -> List[sqlite3.Row]:
+        """
+        Every unsent reminder due at or before `now` for a scheduled meeting (on the given shards), with the
+        meeting details needed to send it.
+        """
+        condition, params = shard_filter("m.guild_id", shards)
+        return await self.fetchall(
+            f"""
+            SELECT r.meeting_id, r.offset_seconds, m.name, m.start_time, m.guild_id, m.role_id, m.thread_id, m.status
+            FROM reminders r
+            JOIN meetings m ON m.id = r.meeting_id
+            WHERE r.sent_at IS NULL AND r.due_at <= ? AND {condition}
+            ORDER BY r.due_at
+            """,
+            (now, *params),
+        )
+
+    async def mark_reminders_sent(self, reminders: List[Tuple[int, int]], sent_at: int):
+        """Marks (meeting_id, offset_seconds) reminders as sent."""
+        await self.executemany(
+            "UPDATE reminders SET sent_at = ? WHERE meeting_id = ? AND offset_seconds = ?",
+            [(sent_at, meeting_id, offset) for meeting_id, offset in reminders],
+        )
+
+    # ----- Jobs -----
+
+    async def enqueue_jobs(self, jobs: List[Tuple[str, str, str, Optional[int], Optional[int]]], run_at: int):
+        """
+        Queues (job_key, kind, JSON payload, meeting_id, guild_id) jobs in one transaction. Keys that are already
+        queued, running or done are ignored; jobs that were given up on are queued again with fresh attempts.
+        """
+        await self.executemany(
+            """
+            INSERT INTO jobs (job_key, kind, payload, meeting_id, guild_id, run_at) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (job_key) DO UPDATE SET
+                status = 'pending', attempts = 0, payload = excluded.payload, run_at = excluded.run_at, updated_at = strftime('%s','now')
+            WHERE jobs.status = 'failed'
+            """,
+            [(*job, run_at) for job in jobs],
+        )
+
+    async def claim_job(self, now: int, shards: Optional[Shards] = None) -> Optional[sqlite3.Row]:
+        """
+        Marks the earliest due pending job (of a guild on the given shards) as running and returns it, or None
+        if nothing is due. The returned `attempts` already counts the attempt being started.
+        """
+        condition, params = shard_filter("guild_id", shards)
+        async with self.transaction() as conn:
+            async with conn.execute(
+                f"SELECT id, kind, payload, attempts + 1 AS attempts FROM jobs WHERE status = 'pending' AND run_at <= ? AND {condition} ORDER BY run_at LIMIT 1",
+                (now, *params),
+            ) as cursor:
+                job = await cursor.fetchone()
+            if job is not None:
+                await conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = strftime('%s','now') WHERE id = ?", (job["id"],)
+                )
+            return job
+
+    async def finish_job(self, job_id: int):
+        await self.execute("UPDATE jobs SET status = 'done', last_error = NULL, updated_at = strftime('%s','now') WHERE id = ?", (job_id,))
+
+    async def fail_job(self, job_id: int, error: str, retry_at: Optional[int]):
+        """Records a failed attempt; the job runs again at `retry_at`, or is given up on if it is None."""
+        await self.execute(
+            "UPDATE jobs SET status = ?, run_at = COALESCE(?, run_at), last_error = ?, updated_at = strftime('%s','now') WHERE id = ?",
+            ("pending" if retry_at is not None else "failed", retry_at, error, job_id),
+        )
+
+    async def requeue_running_jobs(self, shards: Optional[Shards] = None) -> int:
+        """
+        Returns jobs left running by a previous process (e.g. after a crash, or by the previous owner of the
+        given shards) to the queue. Returns how many there were.
+        """
+        condition, params = shard_filter("guild_id", shards)
+        async with self.transaction() as conn:
+            cursor = await conn.execute(f"UPDATE jobs SET status = 'pending' WHERE status = 'running' AND {condition}", params)
+            return cursor.rowcount
+
+    async def release_jobs(self, job_ids: List[int]):
+        """Puts running jobs that were interrupted on purpose back in the queue, without counting the interrupted attempt."""
+        await self.executemany(
+            "UPDATE jobs SET status = 'pending', attempts = attempts - 1, updated_at = strftime('%s','now') WHERE id = ? AND status = 'running'",
+            [(job_id,) for job_id in job_ids],
+        )
+
+    async def next_job_due(self, shards: Optional[Shards] = None) -> Optional[int]:
+        condition, params = shard_filter("guild_id", shards)
+        row = await self.fetchone(f"SELECT MIN(run_at) FROM jobs WHERE status = 'pending' AND {condition}", params)
+        return row[0] if row else None
+
+    async def job_status(self, guild_id: int, meeting_id: Optional[int] = None) -> List[sqlite3.Row]:
+        """(status, count, last_error) per job status, for one of the guild's meetings or for every job of the guild that is not done."""
+        if meeting_id is not None:
+            where, params = "guild_id = ? AND meeting_id = ?", (guild_id, meeting_id)
+        else:
+            where, params = "guild_id = ? AND status != 'done'", (guild_id,)
+        return await self.fetchall(
+            f"""
+            SELECT status, COUNT(*) AS count, MAX(updated_at) AS updated_at,
+                (SELECT last_error FROM jobs j WHERE j.status = jobs.status AND j.{where} AND last_error IS NOT NULL ORDER BY updated_at DESC LIMIT 1) AS last_error
+            FROM jobs WHERE {where} GROUP BY status
+            """,
+            (*params, *params),
+        )
+
+    # ----- Leases -----
+
+    async def acquire_leases(self, names: Iterable[str], owner: str, now: int, expires_at: int) -> Set[str]:
+        """
+        Takes or renews the named leases for `owner` until `expires_at`, in one transaction. A lease held by
+        another owner is only taken once it has expired. Returns the names of every lease the owner holds now.
+        """
+        async with self.transaction() as conn:
+            await conn.executemany(
+                """
+                INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE leases.owner = excluded.owner OR leases.expires_at <= ?
+                """,
+                [(name, owner, expires_at, now) for name in names],
+            )
+            async with conn.execute("SELECT name FROM leases WHERE owner = ? AND expires_at > ?", (owner, now)) as cursor:
+                return {row[0] for row in await cursor.fetchall()}
+
+    async def release_leases(self, owner: str):
+        """Gives up every lease of the owner, so other processes can take them over right away."""
+        await self.execute("DELETE FROM leases WHERE owner = ?", (owner,))
+
+    # ----- Notifications -----
+
+    async def notification_fingerprints(self) -> List[sqlite3.Row]:
+        """(user_id, topic, fingerprint) of the last direct message sent to each user per topic."""
+        return await self.fetchall("SELECT user_id, topic, fingerprint FROM notifications")
+
+    async def set_notification_fingerprint(self, user_id: int, topic: str, fingerprint: str, notified_at: int):
+        await self.execute(
+            "INSERT OR REPLACE INTO notifications (user_id, topic, fingerprint, notified_at) VALUES (?, ?, ?, ?)",
+            (user_id, topic, fingerprint, notified_at),
+        )
+
+    async def clear_notification_fingerprint(self, user_id: int, topic: str):
+        await self.execute("DELETE FROM notifications WHERE user_id = ? AND topic = ?", (user_id, topic))
+
+    # ----- Daily digests -----
+
+    async def set_digest_hour(self, user_id: int, hour: Optional[int]):
+        """Subscribes the user to a daily digest at the given local hour, or unsubscribes them if it is None."""
+        if hour is None:
+            await self.execute("DELETE FROM digest_subscriptions WHERE user_id = ?", (user_id,))
+        else:
+            await self.execute(
+                "INSERT INTO digest_subscriptions (user_id, hour) VALUES (?, ?) ON CONFLICT (user_id) DO UPDATE SET hour = excluded.hour",
+                (user_id, hour),
+            )
+
+    async def digest_subscribers(self, user_ids: Iterable[int]) -> List[int]:
+        """The given users that are subscribed to the daily digest."""
+        subscribed = []
+        user_ids = list(user_ids)
+        for i in range(0, len(user_ids), MAX_QUERY_PARAMETERS):
+            chunk = user_ids[i:i + MAX_QUERY_PARAMETERS]
+            rows = await self.fetchall(f"SELECT user_id FROM digest_subscriptions WHERE user_id IN ({', '.join('?' * len(chunk))})", chunk)
+            subscribed.extend(row[0] for row in rows)
+        return subscribed
+
+    async def due_digests(self, hour: int, today: str, window_start: int, window_end: int, changed_since: int) -> List[sqlite3.Row]:
+        """
+        The content of every digest due by `hour` and not yet sent `today`, in one query, ordered by user:
+        (user_id, meeting id, name, start_time, end_time, status, changed) for each meeting the user is opted into
+        that is scheduled within [window_start, window_end) or was changed (rescheduled, cancelled) after `changed_since`.
+        Subscribers with nothing to report get a single row whose meeting columns are NULL.
+        """
+        return await self.fetchall(
+            """
+            SELECT d.user_id, m.id, m.name, m.start_time, m.end_time, m.status, m.updated_at > MAX(?, m.created_at) AS changed
+            FROM digest_subscriptions d
+            LEFT JOIN (participants p INNER JOIN meetings m ON m.id = p.meeting_id
+                AND ((m.status = 'scheduled' AND m.start_time < ? AND m.end_time > ?) OR (m.status != 'completed' AND m.updated_at > MAX(?, m.created_at))))
+                ON p.user_id = d.user_id
+            WHERE d.hour <= ? AND (d.sent_on IS NULL OR d.sent_on < ?)
+            ORDER BY d.user_id, m.start_time
+            """,
+            (changed_since, window_end, window_start, changed_since, hour, today),
+        )
+
+    async def mark_digests_sent(self, user_ids: Iterable[int], today: str):
+        await self.executemany("UPDATE digest_subscriptions SET sent_on = ? WHERE user_id = ?", [(today, user_id) for user_id in user_ids])
+
+    # ----- Participants -----
+
+    async def add_participant(self, meeting_id: int, user_id: int, status: str = "Available"):
+        await self.execute(
+            "INSERT OR IGNORE INTO participants (meeting_id, user_id, current_status, guild_id) SELECT ?, ?, ?, guild_id FROM meetings WHERE id = ?",
+            (meeting_id, user_id, status, meeting_id),
+        )
+
+    async def remove_participant(self, meeting_id: int, user_id: int):
+        await self.execute("DELETE FROM participants WHERE meeting_id = ? AND user_id = ?", (meeting_id, user_id))
+
+    async def participant_ids(self, meeting_id: int) -> List[int]:
+        rows = await self.fetchall("SELECT user_id FROM participants WHERE meeting_id = ?", (meeting_id,))
+        return [row[0] for row in rows]
+
+    async def set_participant_status(self, guild_id: int, user_id: int, status: str) -> int:
+        """Updates the user's status on every scheduled meeting of the guild they are opted into; returns the number of meetings."""
+        async with self.transaction() as conn:
+            cursor = await conn.execute(
+                """
+                UPDATE participants SET current_status = ?
+                WHERE guild_id = ? AND user_id = ? AND meeting_id IN (SELECT id FROM meetings WHERE status = 'scheduled')
+                """,
+                (status, guild_id, user_id),
+            )
+            return cursor.rowcount
+
+    async def user_meetings(self, guild_id: int, user_id: int) -> List[sqlite3.Row]:
+        """Scheduled meetings of the guild the user has opted into."""
+        return await self.fetchall(
+            """
+            SELECT m.id, m.name, m.start_time, m.description
+            FROM participants p
+            JOIN meetings m ON p.meeting_id = m.id
+            WHERE p.guild_id = ? AND p.user_id = ? AND m.status = 'scheduled'
+            ORDER BY m.start_time IS NULL, m.start_time
+            """,
+            (guild_id, user_id),
+        )
+
+    async def scheduled_participations(self, user_ids: Optional[Iterable[int]] = None) -> List[sqlite3.Row]:
+        """
+        (user_id, meeting id, name, start_time, end_time) for every upcoming or ongoing meeting each user is opted into.
+        Recurring meetings contribute one row per scheduled occurrence within the materialized horizon.
+        Covers every user when `user_ids` is None; otherwise only those users, looked up through idx_participants_user.
+        """
+        query = (
+            "SELECT p.user_id, m.id, m.name, COALESCE(o.start_time, m.start_time), COALESCE(o.end_time, m.end_time) FROM meetings m "
+            "INNER JOIN participants p ON m.id = p.meeting_id "
+            "LEFT JOIN occurrences o ON o.meeting_id = m.id AND m.recurrence > 0 AND o.status = 'scheduled' "
+            "WHERE m.status = 'scheduled' AND m.start_time IS NOT NULL AND COALESCE(o.end_time, m.end_time) > ?"
+        )
+        now = now_ts()
+        if user_ids is None:
+            return await self.fetchall(query, (now,))
+
+        user_ids = list(user_ids)
+        rows = []
+        for i in range(0, len(user_ids), MAX_QUERY_PARAMETERS):
+            chunk = user_ids[i : i + MAX_QUERY_PARAMETERS]
+            rows.extend(await self.fetchall(f"{query} AND p.user_id IN ({', '.join('?' * len(chunk))})", [now, *chunk]))
+        return rows
+
+    # ----- Attendance -----
+
+    async def log_attendance_batch(self, rows: List[Tuple[int, int, int]]):
+        """Records (meeting_id, user_id, joined_at) join events in one transaction, ignoring users already logged."""
+        await self.executemany(
+            "INSERT OR IGNORE INTO attendance_log (meeting_id, user_id, joined_at, guild_id) SELECT ?, ?, ?, guild_id FROM meetings WHERE id = ?",
+            [(meeting_id, user_id, joined_at, meeting_id) for meeting_id, user_id, joined_at in rows],
+        )
+
+    async def attendance_ids(self, meeting_id: int) -> List[int]:
+        rows = await self.fetchall("SELECT user_id FROM attendance_log WHERE meeting_id = ?", (meeting_id,))
+        return [row[0] for row in rows]
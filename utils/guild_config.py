@@ -0,0 +1,50 @@
+import discord
+from typing import Dict, NamedTuple, Optional
+
+
+class GuildConfig(NamedTuple):
+    """Names of the channels and roles the bot works with in a guild. Guilds that set nothing use these defaults."""
+
+    meetings_category: str = "Meetings"  # Category holding the meeting channels and the forum
+    meeting_forum: str = "meeting-list"  # Forum (inside meetings_category) that gets a post per meeting
+    archive_category: str = "Meeting Archive"  # Where /cleanup moves a meeting's text channel
+    lobby_channel: str = "auto-dragging-vc"  # Voice channel members are auto-dragged out of
+    bot_role: str = "Bot"  # Role given access to every meeting channel
+
+    def get_meetings_category(self, guild: discord.Guild) -> Optional[discord.CategoryChannel]:
+        return discord.utils.get(guild.categories, name=self.meetings_category)
+
+    def get_meeting_forum(self, guild: discord.Guild) -> Optional[discord.ForumChannel]:
+        category = self.get_meetings_category(guild)
+        return category and discord.utils.get(category.channels, name=self.meeting_forum, type=discord.ChannelType.forum)
+
+    def get_archive_category(self, guild: discord.Guild) -> Optional[discord.CategoryChannel]:
+        return discord.utils.get(guild.categories, name=self.archive_category)
+
+    def get_bot_role(self, guild: discord.Guild) -> Optional[discord.Role]:
+        return discord.utils.get(guild.roles, name=self.bot_role)
+
+
+class GuildConfigs:
+    """
+    Per-guild GuildConfig, loaded once from guild_settings and kept in memory (bot.guild_configs), so resolving
+    a guild's channel names costs no query.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.configs: Dict[int, GuildConfig] = {}
+
+    async def load(self):
+        self.configs.clear()
+        for guild_id, *names in await self.db.guild_configs():
+            self.configs[guild_id] = GuildConfig(*(name or default for name, default in zip(names, GuildConfig())))
+
+    def get(self, guild_id: int) -> GuildConfig:
+        return self.configs.get(guild_id) or GuildConfig()
+
+    async def update(self, guild_id: int, **names: str) -> GuildConfig:
+        """Changes some of the guild's names (see GuildConfig) and returns its new config."""
+        await self.db.set_guild_config(guild_id, names)
+        self.configs[guild_id] = self.get(guild_id)._replace(**names)
+        return self.configs[guild_id]
@@ -0,0 +1,240 @@
+"""
+Parses meeting files for bulk import.
+
+CSV files need a header row with the columns title, date, time and duration (minutes), and may add
+description, recurrence (none/daily/weekly/monthly) and reminders (e.g. "1d, 1h"). Dates and times accept
+the same formats as /create. iCalendar (.ics) files are read event by event (SUMMARY, DESCRIPTION, DTSTART,
+DTEND or DURATION, and a daily/weekly/monthly RRULE).
+
+Both parsers consume the file line by line, so a large file is never held in memory as a whole.
+
+Meetings can also be imported without the bot running:
+
+    python -m utils.importer meetings.csv --host 123456789012345678 --guild 123456789012345678
+
+They are stored without channels or a role; the bot provisions them the next time it starts.
+"""
+
+import argparse, asyncio, csv, re
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from utils.database import Database, DATABASE_PATH
+from utils.recurrence import RECURRING_OPTIONS
+from utils.timeutils import parse_time, parse_date, parse_offsets, to_timestamp
+
+MAX_IMPORT_MEETINGS = 1000
+ICS_DEFAULT_DURATION_MINUTES = 60  # Events without DTEND or DURATION
+ICS_FREQUENCIES = {"DAILY": 1, "WEEKLY": 7, "MONTHLY": 30}
+CSV_EXTRA_FIELDS = "\0extra"  # DictReader key for the values of rows with more fields than the header
+
+
+class ImportedMeeting(NamedTuple):
+    line: int  # Where the meeting starts in the file, for error messages
+    title: str
+    description: str
+    start_time: int  # Unix timestamp
+    duration: int  # Minutes
+    recurrence: Optional[int]  # Days, as stored in meetings.recurrence
+    reminder_offsets: Optional[List[int]]  # None for the guild default
+
+
+ParseResult = Tuple[int, Union[ImportedMeeting, str]]  # (line, meeting or error message)
+
+
+def parse_duration_minutes(value: str) -> int:
+    try:
+        minutes = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid duration: {value}")
+    if minutes <= 0:
+        raise ValueError("Duration must be a positive integer.")
+    return minutes
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[ParseResult]:
+    reader = csv.DictReader(lines, restkey=CSV_EXTRA_FIELDS)
+    try:
+        missing = {"title", "date", "time", "duration"} - {name.strip().lower() for name in reader.fieldnames or []}
+        if missing:
+            yield 1, f"Missing column(s): {', '.join(sorted(missing))}"
+            return
+
+        for row in reader:
+            line = reader.line_num
+            if CSV_EXTRA_FIELDS in row:
+                yield line, "Too many columns (quote values that contain commas)."
+                continue
+            yield line, parse_csv_row(line, {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()})
+    except csv.Error as e:
+        yield reader.line_num, f"Invalid CSV: {e}"
+
+
+def parse_csv_row(line: int, row: dict) -> Union[ImportedMeeting, str]:
+    try:
+        if not row["title"]:
+            raise ValueError("Missing title.")
+        formatted_date = parse_date(row["date"])
+        formatted_time = parse_time(row["time"])
+        recurrence = row.get("recurrence") or "none"
+        if recurrence.lower() not in RECURRING_OPTIONS:
+            raise ValueError(f"Invalid recurrence option: {recurrence}")
+        return ImportedMeeting(
+            line=line,
+            title=row["title"],
+            description=row.get("description", ""),
+            start_time=to_timestamp(datetime.strptime(f"{formatted_date} {formatted_time}:00", "%Y-%m-%d %H:%M:%S")),
+            duration=parse_duration_minutes(row["duration"]),
+            recurrence=RECURRING_OPTIONS[recurrence.lower()],
+            reminder_offsets=parse_offsets(row["reminders"]) if row.get("reminders") else None,
+        )
+    except ValueError as e:
+        return str(e)
+
+
+def unfold_ics(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """Joins folded iCalendar lines (continuations start with a space or tab), yielding (line number, content line)."""
+    pending, pending_line = None, 0
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending_line, pending
+        pending, pending_line = line, number
+    if pending is not None:
+        yield pending_line, pending
+
+
+def unescape_ics(value: str) -> str:
+    return re.sub(r"\\([\\;,nN])", lambda match: "\n" if match.group(1) in "nN" else match.group(1), value)
+
+
+def parse_ics_datetime(value: str, params: str) -> int:
+    if "VALUE=DATE" in params.upper() and "VALUE=DATE-TIME" not in params.upper():
+        raise ValueError("All-day events are not supported.")
+    try:
+        if value.endswith("Z"):
+            return int(datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc).timestamp())
+        # Floating times and TZID times are both read as the bot's local time, like times entered in /create.
+        return to_timestamp(datetime.strptime(value, "%Y%m%dT%H%M%S"))
+    except ValueError:
+        raise ValueError(f"Invalid date-time: {value}")
+
+
+def parse_ics_duration(value: str) -> int:
+    match = re.fullmatch(r"P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?", value)
+    if not match or not any(match.groups()):
+        raise ValueError(f"Invalid duration: {value}")
+    weeks, days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return int(timedelta(weeks=weeks, days=days, hours=hours, minutes=minutes, seconds=seconds).total_seconds() // 60)
+
+
+def parse_ics_recurrence(value: str) -> int:
+    rule = dict(part.split("=", 1) for part in value.upper().split(";") if "=" in part)
+    if rule.get("FREQ") not in ICS_FREQUENCIES or rule.get("INTERVAL", "1") != "1" or rule.keys() - {"FREQ", "INTERVAL", "WKST"}:
+        raise ValueError(f"Only plain daily, weekly or monthly recurrence is supported: {value}")
+    return ICS_FREQUENCIES[rule["FREQ"]]
+
+
+def build_ics_meeting(line: int, event: dict) -> ImportedMeeting:
+    if not event.get("SUMMARY", ("", ""))[0].strip():
+        raise ValueError("Missing SUMMARY.")
+    if "DTSTART" not in event:
+        raise ValueError("Missing DTSTART.")
+    start_time = parse_ics_datetime(*event["DTSTART"])
+    if "DTEND" in event:
+        duration = (parse_ics_datetime(*event["DTEND"]) - start_time) // 60
+    elif "DURATION" in event:
+        duration = parse_ics_duration(event["DURATION"][0])
+    else:
+        duration = ICS_DEFAULT_DURATION_MINUTES
+    if duration <= 0:
+        raise ValueError("The event must end after it starts.")
+    return ImportedMeeting(
+        line=line,
+        title=unescape_ics(event["SUMMARY"][0]).strip(),
+        description=unescape_ics(event.get("DESCRIPTION", ("", ""))[0]),
+        start_time=start_time,
+        duration=duration,
+        recurrence=parse_ics_recurrence(event["RRULE"][0]) if "RRULE" in event else None,
+        reminder_offsets=None,
+    )
+
+
+def parse_ics(lines: Iterable[str]) -> Iterator[ParseResult]:
+    event, event_line, depth = None, 0, 0
+    for line, content in unfold_ics(lines):
+        name, _, value = content.partition(":")
+        name, _, params = name.partition(";")
+        name = name.upper()
+
+        if name == "BEGIN":
+            if value.upper() == "VEVENT":
+                event, event_line, depth = {}, line, 0
+            elif event is not None:
+                depth += 1  # Nested components such as VALARM
+        elif name == "END" and event is not None:
+            if value.upper() == "VEVENT":
+                try:
+                    yield event_line, build_ics_meeting(event_line, event)
+                except ValueError as e:
+                    yield event_line, str(e)
+                event = None
+            else:
+                depth -= 1
+        elif event is not None and depth == 0 and name not in event:
+            event[name] = (value, params)
+
+
+def read_meetings(filename: str, lines: Iterable[str]) -> Tuple[List[ImportedMeeting], List[str]]:
+    """Parses a .csv or .ics file, returning the valid meetings and an error message per invalid one."""
+    if filename.lower().endswith(".ics"):
+        results = parse_ics(lines)
+    elif filename.lower().endswith(".csv"):
+        results = parse_csv(lines)
+    else:
+        return [], ["Only .csv and .ics files can be imported."]
+
+    meetings, errors = [], []
+    for line, result in results:
+        if isinstance(result, str):
+            errors.append(f"Line {line}: {result}")
+        elif len(meetings) == MAX_IMPORT_MEETINGS:
+            errors.append(f"Line {line}: Too many meetings, at most {MAX_IMPORT_MEETINGS} can be imported at once.")
+            break
+        else:
+            meetings.append(result)
+    return meetings, errors
+
+
+async def import_file(path: str, host_id: int, guild_id: int, database_path: str):
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        meetings, errors = read_meetings(path, file)
+    if errors:
+        print("\n".join(errors))
+        print("Nothing was imported.")
+        return
+
+    db = Database(database_path)
+    await db.connect()
+    try:
+        default_offsets = await db.guild_reminder_offsets(guild_id)
+        meeting_ids = await db.import_meetings(guild_id, host_id, meetings, default_offsets)
+    finally:
+        await db.close()
+    print(f"Imported {len(meeting_ids)} meeting(s). Their channels and forum posts are created the next time the bot starts.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import meetings from a .csv or .ics file into the bot's database.")
+    parser.add_argument("file", help="The .csv or .ics file to import")
+    parser.add_argument("--host", type=int, required=True, help="Discord user id recorded as the host of every meeting")
+    parser.add_argument("--guild", type=int, required=True, help="Server id the meetings belong to; its default reminders are used")
+    parser.add_argument("--database", default=DATABASE_PATH, help="Path to the bot's database")
+    args = parser.parse_args()
+    asyncio.run(import_file(args.file, args.host, args.guild, args.database))
+
+
+if __name__ == "__main__":
+    main()
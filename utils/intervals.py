@@ -0,0 +1,156 @@
+import bisect
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+class Interval(NamedTuple):
+    """A half-open time range [start, end) in Unix timestamps, tagged with the key it belongs to (e.g. a meeting id)."""
+
+    start: int
+    end: int
+    key: Hashable
+
+
+def overlaps(a: Interval, b: Interval) -> bool:
+    """True if the two intervals share any time. Back-to-back intervals (one ends as the other starts) do not overlap."""
+    return a.start < b.end and b.start < a.end
+
+
+def find_conflict_groups(intervals: Iterable[Interval]) -> List[List[Interval]]:
+    """
+    Groups intervals that overlap, directly or through a chain of overlaps, in a single sweep.
+
+    The intervals are sorted by start time (O(n log n)) and walked once while tracking the latest end
+    of the current group: an interval starting before that end joins the group, otherwise it starts a
+    new one. Only groups with two or more intervals are returned, each sorted by start time.
+    """
+    groups = []
+    current: List[Interval] = []
+    current_end = None
+    for interval in sorted(intervals, key=lambda interval: (interval.start, interval.end)):
+        if current and interval.start < current_end:
+            current.append(interval)
+            current_end = max(current_end, interval.end)
+        else:
+            if len(current) > 1:
+                groups.append(current)
+            current = [interval]
+            current_end = interval.end
+    if len(current) > 1:
+        groups.append(current)
+    return groups
+
+
+class ParticipantIntervalIndex:
+    """
+    In-memory index of the scheduled meetings each user is opted into, kept sorted by start time per user.
+
+    Answers "which of this user's meetings overlap [start, end)?" with a binary search instead of a scan:
+    only intervals starting before `end` can overlap, and of those only ones starting after
+    `start - longest meeting of that user` can still be running, so the candidates are a small slice of
+    the user's sorted list. A recurring meeting takes one interval per materialized occurrence, like in the
+    conflict checker's query. It is loaded once at startup and updated on opt-in/out, reschedule, cancel,
+    cleanup and whenever a recurring meeting's occurrences change.
+    """
+
+    def __init__(self):
+        self.meetings: Dict[int, Tuple[int, int, str]] = {}  # meeting_id -> (start, end, name) of its current occurrence
+        self.occurrences: Dict[int, List[Tuple[int, int]]] = {}  # meeting_id -> (start, end) of a recurring meeting's occurrences
+        self.participants: Dict[int, Set[int]] = defaultdict(set)  # meeting_id -> user ids
+        self.user_intervals: Dict[int, List[Interval]] = defaultdict(list)  # user_id -> intervals sorted by (start, end)
+        self.user_longest: Dict[int, int] = defaultdict(int)  # user_id -> longest interval length seen
+
+    async def load(self, db):
+        """Rebuilds the index from every scheduled meeting, the occurrences of recurring ones and their participants."""
+        self.meetings.clear()
+        self.occurrences.clear()
+        self.participants.clear()
+        self.user_intervals.clear()
+        self.user_longest.clear()
+        for meeting_id, name, start_time, end_time in await db.scheduled_meeting_times():
+            self.meetings[meeting_id] = (start_time, end_time, name)
+        for meeting_id, start_time, end_time in await db.scheduled_occurrences():
+            self.occurrences.setdefault(meeting_id, []).append((start_time, end_time))
+        for user_id, meeting_id, *_ in await db.scheduled_participations():
+            self.add_participant(meeting_id, user_id)
+
+    def set_meeting(self, meeting_id: int, start: int, end: int, name: str):
+        """Adds a meeting or moves it to a new time, re-sorting it for everyone opted in."""
+        users = self.participants.get(meeting_id, set())
+        for user_id in users:
+            self._remove_interval(user_id, meeting_id)
+        self.meetings[meeting_id] = (start, end, name)
+        for user_id in users:
+            self._insert_interval(user_id, meeting_id)
+
+    def set_occurrences(self, meeting_id: int, occurrences: Iterable[Tuple[int, int]]):
+        """Replaces the (start, end) occurrences of a recurring meeting, re-sorting them for everyone opted in."""
+        users = self.participants.get(meeting_id, set()) if meeting_id in self.meetings else set()
+        for user_id in users:
+            self._remove_interval(user_id, meeting_id)
+        self.occurrences[meeting_id] = sorted(occurrences)
+        if not self.occurrences[meeting_id]:
+            del self.occurrences[meeting_id]
+        for user_id in users:
+            self._insert_interval(user_id, meeting_id)
+
+    def remove_meeting(self, meeting_id: int):
+        """Drops a meeting that is no longer scheduled."""
+        for user_id in self.participants.pop(meeting_id, set()):
+            self._remove_interval(user_id, meeting_id)
+        self.meetings.pop(meeting_id, None)
+        self.occurrences.pop(meeting_id, None)
+
+    def add_participant(self, meeting_id: int, user_id: int):
+        if meeting_id not in self.meetings or user_id in self.participants[meeting_id]:
+            return
+        self.participants[meeting_id].add(user_id)
+        self._insert_interval(user_id, meeting_id)
+
+    def remove_participant(self, meeting_id: int, user_id: int):
+        if user_id in self.participants.get(meeting_id, ()):
+            self.participants[meeting_id].discard(user_id)
+            self._remove_interval(user_id, meeting_id)
+
+    def overlapping(self, user_id: int, meeting_id: int) -> List[Interval]:
+        """The user's other meetings (or their occurrences) that overlap any occurrence of the given meeting, sorted by start time."""
+        if meeting_id not in self.meetings:
+            return []
+        intervals = self.user_intervals.get(user_id, [])
+        found = set()
+        for start, end in self._times(meeting_id):
+            # Everything from `first` up to (not including) `last` starts within [start - longest, end).
+            last = bisect.bisect_left(intervals, (end,))
+            first = bisect.bisect_left(intervals, (start - self.user_longest.get(user_id, 0),), 0, last)
+            found.update(interval for interval in intervals[first:last] if interval.key != meeting_id and interval.end > start)
+        return sorted(found)
+
+    def meeting_name(self, meeting_id: int) -> Optional[str]:
+        meeting = self.meetings.get(meeting_id)
+        return meeting[2] if meeting else None
+
+    def _times(self, meeting_id: int) -> List[Tuple[int, int]]:
+        """The (start, end) ranges a meeting takes up: its occurrences if it recurs, otherwise its own time."""
+        start, end, _ = self.meetings[meeting_id]
+        return self.occurrences.get(meeting_id) or [(start, end)]
+
+    def _insert_interval(self, user_id: int, meeting_id: int):
+        for start, end in self._times(meeting_id):
+            bisect.insort(self.user_intervals[user_id], Interval(start, end, meeting_id))
+            self.user_longest[user_id] = max(self.user_longest[user_id], end - start)
+
+    def _remove_interval(self, user_id: int, meeting_id: int):
+        intervals = self.user_intervals.get(user_id)
+        if not intervals:
+            return
+        for start, end in self._times(meeting_id):
+            position = bisect.bisect_left(intervals, Interval(start, end, meeting_id))
+            if position < len(intervals) and intervals[position].key == meeting_id:
+                del intervals[position]
+            else:
+                # Fall back to a scan if the stored interval was not where expected.
+                intervals = self.user_intervals[user_id] = [interval for interval in intervals if interval.key != meeting_id]
+                break
+        if not self.user_intervals[user_id]:
+            del self.user_intervals[user_id]
+            self.user_longest.pop(user_id, None)
@@ -0,0 +1,114 @@
+import asyncio, json, random
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from utils.database import Shards
+from utils.timeutils import now_ts
+
+MAX_JOB_ATTEMPTS = 8
+RETRY_BASE_SECONDS = 10  # First retry after ~10s, then 20s, 40s, ... capped at RETRY_MAX_SECONDS
+RETRY_MAX_SECONDS = 60 * 60
+IDLE_POLL_SECONDS = 5 * 60  # Upper bound on how long idle workers sleep before looking at the table again
+ERROR_BACKOFF_SECONDS = 10  # How long a worker waits after a database error before trying again
+
+JobHandler = Callable[[dict], Awaitable[None]]
+
+
+def retry_delay(attempts: int) -> int:
+    """Exponential backoff with jitter, so jobs that failed together do not all retry at the same moment."""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return int(delay * random.uniform(0.8, 1.2))
+
+
+class JobQueue:
+    """
+    A persistent queue of background jobs stored in the jobs table.
+
+    Jobs are queued with a unique key, a kind and a JSON payload. Workers claim due jobs one at a time and
+    run the handler registered for their kind; a job whose handler raises is retried with exponential backoff
+    and given up on after MAX_JOB_ATTEMPTS. Because jobs live in the database, anything queued before a
+    restart still runs afterwards. Handlers must be idempotent, since a job can run again after a crash.
+
+    With `shards` (a callable returning the shards this process owns, see LeaseManager.owned_shards), only
+    jobs of guilds on those shards are claimed, so each job runs in the process that has its guild.
+    """
+
+    def __init__(self, db, workers: int = 3, shards: Optional[Callable[[], Optional[Shards]]] = None):
+        self.db = db
+        self.worker_count = workers
+        self.shards = shards or (lambda: None)
+        self.handlers: Dict[str, JobHandler] = {}
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._running: Set[int] = set()  # Ids of the jobs this process is running right now
+
+    def register(self, kind: str, handler: JobHandler):
+        self.handlers[kind] = handler
+
+    async def enqueue(self, jobs: Iterable[Tuple[str, str, dict, Optional[int]]]):
+        """Queues (key, kind, payload, meeting_id) jobs to run as soon as a worker is free. The payload's guild_id is stored with the job."""
+        await self.db.enqueue_jobs(
+            [(key, kind, json.dumps(payload), meeting_id, payload.get("guild_id")) for key, kind, payload, meeting_id in jobs], now_ts()
+        )
+        self._wakeup.set()
+
+    async def recover(self, shards: Optional[Shards] = None):
+        """Re-queues jobs that were interrupted while running (e.g. by a crash) on the given shards, or on every shard."""
+        requeued = await self.db.requeue_running_jobs(shards)
+        if requeued:
+            print(f"Re-queued {requeued} interrupted job(s).")
+        self._wakeup.set()
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        """Cancels the workers and puts the jobs they were running back in the queue, without counting the interrupted attempt."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self._running:
+            await self.db.release_jobs(list(self._running))
+            self._running.clear()
+
+    async def _work(self):
+        while True:
+            try:
+                self._wakeup.clear()  # Jobs queued from here on wake this worker up again
+                job = await self.db.claim_job(now_ts(), self.shards())
+                if job is None:
+                    await self._wait_for_work()
+                    continue
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # e.g. "database is locked" while another process writes; the worker carries on after a pause
+                print(f"Job worker error: {e}")
+                await asyncio.sleep(ERROR_BACKOFF_SECONDS)
+
+    async def _run(self, job):
+        self._running.add(job["id"])
+        try:
+            handler = self.handlers.get(job["kind"])
+            if handler is None:
+                raise RuntimeError(f"No handler for job kind '{job['kind']}'")
+            await handler(json.loads(job["payload"]))
+        except asyncio.CancelledError:
+            raise  # Left as running; stop() puts it back in the queue (or recover() does after a crash)
+        except Exception as e:
+            retry_at = now_ts() + retry_delay(job["attempts"]) if job["attempts"] < MAX_JOB_ATTEMPTS else None
+            await self.db.fail_job(job["id"], f"{type(e).__name__}: {e}", retry_at)
+            self._running.discard(job["id"])
+            if retry_at is None:
+                print(f"Giving up on job {job['id']} ({job['kind']}) after {job['attempts']} attempts: {e}")
+        else:
+            await self.db.finish_job(job["id"])
+            self._running.discard(job["id"])
+
+    async def _wait_for_work(self):
+        """Sleeps until the next retry is due or new jobs are queued."""
+        next_due = await self.db.next_job_due(self.shards())
+        timeout = IDLE_POLL_SECONDS if next_due is None else min(IDLE_POLL_SECONDS, max(1, next_due - now_ts()))
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
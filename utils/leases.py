@@ -0,0 +1,100 @@
+import asyncio, os, secrets, socket, time
+from typing import Callable, Iterable, List, Optional, Set
+from utils.database import Shards
+from utils.timeutils import now_ts
+
+LEASE_TTL_SECONDS = 30  # A lease whose owner stops renewing it is taken over after at most this long
+HEARTBEAT_SECONDS = 10  # How often held leases are renewed (and free ones taken)
+SHARD_LEASE_PREFIX = "shard:"
+
+
+def shard_lease(shard_id: int) -> str:
+    return f"{SHARD_LEASE_PREFIX}{shard_id}"
+
+
+def lease_shard(name: str) -> Optional[int]:
+    """The shard id of a shard lease, or None for any other lease."""
+    return int(name[len(SHARD_LEASE_PREFIX):]) if name.startswith(SHARD_LEASE_PREFIX) else None
+
+
+class LeaseManager:
+    """
+    Decides which bot process does each piece of background work when several run against one database.
+
+    Work is split into named leases stored in the leases table: one per shard ("shard:3"), owning the
+    guild-scoped work of that shard's guilds (reminders, teardown jobs, provisioning, ...), and one per
+    process-wide loop ("conflicts", "digests"). Every HEARTBEAT_SECONDS the process renews the leases it
+    holds and takes any wanted lease whose owner stopped renewing it, so a crashed process is replaced
+    within LEASE_TTL_SECONDS. A lease only counts as held until the renewal that granted it would expire,
+    so a process that cannot reach the database stops working before another one takes over.
+
+    `on_acquired(name)` is called for every lease this process newly holds, so work can be picked up
+    right away after a failover.
+    """
+
+    def __init__(self, db, on_acquired: Optional[Callable[[str], None]] = None, owner: Optional[str] = None):
+        self.db = db
+        self.on_acquired = on_acquired
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+        self.wanted: Set[str] = set()
+        self.held: Set[str] = set()
+        self.valid_until = 0.0  # Monotonic time after which self.held can no longer be trusted
+        self.shard_count: Optional[int] = None
+        self.shard_ids: List[int] = []
+        self._lock = asyncio.Lock()  # The heartbeat and on-connect renewals must not interleave
+        self._task: Optional[asyncio.Task] = None
+
+    def want(self, *names: str):
+        self.wanted.update(names)
+
+    def set_shards(self, shard_count: int, shard_ids: Iterable[int]):
+        """Wants the leases of the shards this process is connected to."""
+        self.shard_count = shard_count
+        self.shard_ids = list(shard_ids)
+        self.want(*(shard_lease(shard_id) for shard_id in self.shard_ids))
+
+    def holds(self, name: str) -> bool:
+        return name in self.held and time.monotonic() < self.valid_until
+
+    def owned_shards(self) -> Shards:
+        """(shard_count, ids of the shards whose lease this process holds), for the database's shard filters."""
+        return self.shard_count or 1, [shard_id for shard_id in self.shard_ids if self.holds(shard_lease(shard_id))]
+
+    def owns_guild(self, guild_id: int) -> bool:
+        """Whether this process runs the background work of the guild, i.e. holds the lease of its shard."""
+        return self.shard_count is not None and self.holds(shard_lease((guild_id >> 22) % self.shard_count))
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.held = set()
+        await self.db.release_leases(self.owner)
+
+    async def renew(self):
+        """Renews the held leases and takes the wanted ones that are free."""
+        async with self._lock:
+            started = time.monotonic()
+            now = now_ts()
+            held = await self.db.acquire_leases(self.wanted, self.owner, now, now + LEASE_TTL_SECONDS)
+            acquired = held - self.held if started < self.valid_until else held
+            self.held = held
+            self.valid_until = started + LEASE_TTL_SECONDS
+        for name in sorted(acquired):
+            print(f"Acquired lease {name}.")
+            if self.on_acquired is not None:
+                self.on_acquired(name)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.renew()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Could not renew leases: {e}")
+            await asyncio.sleep(HEARTBEAT_SECONDS)
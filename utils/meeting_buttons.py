@@ -0,0 +1,87 @@
+import discord
+from typing import Optional
+from utils.timeutils import discord_timestamp
+
+
+class MeetingButton(discord.ui.DynamicItem[discord.ui.Button], template=r"meeting[_:](?P<action>optin|optout)(?::(?P<meeting_id>[0-9]+))?"):
+    """
+    The Opt-In/Opt-Out button of a meeting's forum post.
+
+    The custom_id carries the action and the meeting id ("meeting:optin:42"), so the class is registered once
+    at startup (bot.add_dynamic_items) and handles the buttons of every post, including posts from before a
+    restart, without keeping a View per message. The meeting's role is looked up in bot.meeting_index when
+    clicked. Older posts used plain "meeting_optin"/"meeting_optout" ids and are resolved through their thread.
+    """
+
+    def __init__(self, action: str, meeting_id: Optional[int]):
+        opt_in = action == "optin"
+        super().__init__(
+            discord.ui.Button(
+                label="Opt-In" if opt_in else "Opt-Out",
+                style=discord.ButtonStyle.green if opt_in else discord.ButtonStyle.red,
+                custom_id=f"meeting:{action}:{meeting_id}" if meeting_id is not None else f"meeting_{action}",
+            )
+        )
+        self.action = action
+        self.meeting_id = meeting_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        meeting_id = match["meeting_id"]
+        return cls(match["action"], int(meeting_id) if meeting_id else None)
+
+    async def callback(self, interaction: discord.Interaction):
+        client = interaction.client
+        meeting_id = self.meeting_id
+        if meeting_id is None:
+            meeting_id = await client.db.meeting_for_thread(interaction.channel_id)
+
+        role_id = client.meeting_index.role_for_meeting(meeting_id) if meeting_id is not None else None
+        meeting_role = interaction.guild.get_role(role_id) if role_id and interaction.guild else None
+        if meeting_role is None:
+            return await interaction.response.send_message("This meeting is no longer scheduled.", ephemeral=True)
+
+        if self.action == "optin":
+            await self.opt_in(interaction, meeting_id, meeting_role)
+        else:
+            await self.opt_out(interaction, meeting_id, meeting_role)
+
+    @staticmethod
+    async def opt_in(interaction: discord.Interaction, meeting_id: int, meeting_role: discord.Role):
+        try:
+            await interaction.user.add_roles(meeting_role)
+            await interaction.client.db.add_participant(meeting_id, interaction.user.id, "Available")
+            interaction.client.interval_index.add_participant(meeting_id, interaction.user.id)
+            interaction.client.dispatch("participants_update", meeting_id, interaction.user.id)
+
+            # Warn right away if this meeting overlaps another one the user is opted into
+            message = "You have been opted in for the meeting!"
+            overlapping = interaction.client.interval_index.overlapping(interaction.user.id, meeting_id)
+            if overlapping:
+                message += "\n⚠️ This meeting overlaps with:\n" + "\n".join(
+                    f"• **{interaction.client.interval_index.meeting_name(interval.key)}** "
+                    f"({discord_timestamp(interval.start, 'f')} - {discord_timestamp(interval.end, 't')})"
+                    for interval in overlapping
+                )
+            await interaction.response.send_message(message, ephemeral=True)
+        except Exception as e:
+            await interaction.response.send_message(f"Error signing up: {e}", ephemeral=True)
+
+    @staticmethod
+    async def opt_out(interaction: discord.Interaction, meeting_id: int, meeting_role: discord.Role):
+        try:
+            await interaction.user.remove_roles(meeting_role)
+            await interaction.client.db.remove_participant(meeting_id, interaction.user.id)
+            interaction.client.interval_index.remove_participant(meeting_id, interaction.user.id)
+            interaction.client.dispatch("participants_update", meeting_id, interaction.user.id)
+            await interaction.response.send_message("You have been opted out of the meeting.", ephemeral=True)
+        except Exception as e:
+            await interaction.response.send_message(f"Error opting out: {e}", ephemeral=True)
+
+
+def meeting_buttons(meeting_id: int) -> discord.ui.View:
+    """The Opt-In/Opt-Out buttons for a meeting's forum post. Clicks are handled by the registered MeetingButton."""
+    view = discord.ui.View(timeout=None)
+    view.add_item(MeetingButton("optin", meeting_id))
+    view.add_item(MeetingButton("optout", meeting_id))
+    return view
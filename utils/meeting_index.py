@@ -0,0 +1,51 @@
+from typing import Dict, Optional, Tuple
+
+
+class MeetingIndex:
+    """
+    Process-wide in-memory routing index for scheduled meetings.
+
+    Maps voice channel IDs and role IDs to their meeting so voice-state events can be resolved
+    without touching the database. It is loaded once at startup and kept current by the commands
+    that create, cancel or clean up meetings.
+    """
+
+    def __init__(self):
+        self.voice_channels: Dict[int, int] = {}  # voice_channel_id -> meeting_id
+        self.roles: Dict[int, Tuple[int, Optional[int]]] = {}  # role_id -> (meeting_id, voice_channel_id)
+        self.meetings: Dict[int, Tuple[Optional[int], Optional[int]]] = {}  # meeting_id -> (voice_channel_id, role_id)
+
+    async def load(self, db):
+        """Rebuilds the index from every scheduled meeting in the database."""
+        self.voice_channels.clear()
+        self.roles.clear()
+        self.meetings.clear()
+        for meeting_id, voice_channel_id, role_id in await db.meeting_routes():
+            self.add(meeting_id, voice_channel_id, role_id)
+
+    def add(self, meeting_id: int, voice_channel_id: Optional[int], role_id: Optional[int]):
+        """Adds or replaces the routes for a meeting."""
+        self.remove(meeting_id)
+        self.meetings[meeting_id] = (voice_channel_id, role_id)
+        if voice_channel_id is not None:
+            self.voice_channels[voice_channel_id] = meeting_id
+        if role_id is not None:
+            self.roles[role_id] = (meeting_id, voice_channel_id)
+
+    def remove(self, meeting_id: int):
+        """Drops every route for a meeting (e.g. once it is cancelled or cleaned up)."""
+        voice_channel_id, role_id = self.meetings.pop(meeting_id, (None, None))
+        if voice_channel_id is not None and self.voice_channels.get(voice_channel_id) == meeting_id:
+            del self.voice_channels[voice_channel_id]
+        if role_id is not None and self.roles.get(role_id, (None,))[0] == meeting_id:
+            del self.roles[role_id]
+
+    def meeting_for_voice_channel(self, voice_channel_id: int) -> Optional[int]:
+        return self.voice_channels.get(voice_channel_id)
+
+    def role_for_meeting(self, meeting_id: int) -> Optional[int]:
+        return self.meetings.get(meeting_id, (None, None))[1]
+
+    def route_for_role(self, role_id: int) -> Optional[Tuple[int, Optional[int]]]:
+        """Returns (meeting_id, voice_channel_id) for a meeting role, or None if the role is not a meeting's."""
+        return self.roles.get(role_id)
@@ -0,0 +1,358 @@
+# Versioned schema migrations.
+# The schema version lives in SQLite's PRAGMA user_version. On startup every migration newer than the
+# stored version is applied in order, each in its own transaction together with the version bump.
+# Databases created before migrations existed report version 0, so migration 1 only uses IF NOT EXISTS.
+# Foreign keys are switched off while migrating so tables can be rebuilt (create new, copy, drop, rename)
+# without cascading deletes; PRAGMA foreign_key_check verifies nothing was orphaned before committing.
+
+MIGRATIONS = [
+    (
+        1,
+        "Initial schema",
+        """
+        CREATE TABLE IF NOT EXISTS meetings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT,
+            host_id INTEGER NOT NULL, --Discord User ID
+            date_time TEXT, --Local time "YYYY-MM-DD HH:MM:SS"
+            duration INTEGER, --In minutes
+            created_at TEXT DEFAULT (strftime('%s', 'now')),
+            updated_at TEXT DEFAULT (strftime('%s', 'now')),
+            status TEXT CHECK(status IN ('scheduled', 'cancelled', 'completed')) DEFAULT 'scheduled',
+            voice_channel_id INTEGER,
+            thread_id INTEGER,
+            role_id INTEGER,
+            recurrence INTEGER CHECK(recurrence IN (0, 1, 7, 30)) DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS participants (
+            meeting_id INTEGER,
+            user_id INTEGER,
+            current_status TEXT CHECK(current_status IN ('Available','Busy')) DEFAULT 'Busy',
+            FOREIGN KEY (meeting_id) references meetings(id) ON DELETE CASCADE
+        );
+
+        CREATE TABLE IF NOT EXISTS attendance_log (
+            meeting_id INTEGER,
+            user_id INTEGER,
+            joined_at TEXT DEFAULT (strftime('%s','now')),
+            UNIQUE(meeting_id, user_id)
+        );
+        """,
+    ),
+    (
+        2,
+        "Composite primary key on participants and indexes for hot lookups",
+        """
+        -- Rebuild participants with a real key so INSERT OR IGNORE actually ignores duplicates.
+        -- Duplicate rows and rows without a meeting (left behind by the old /change_status) are dropped.
+        CREATE TABLE participants_new (
+            meeting_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            current_status TEXT CHECK(current_status IN ('Available','Busy')) DEFAULT 'Busy',
+            PRIMARY KEY (meeting_id, user_id),
+            FOREIGN KEY (meeting_id) references meetings(id) ON DELETE CASCADE
+        ) WITHOUT ROWID;
+
+        INSERT OR IGNORE INTO participants_new (meeting_id, user_id, current_status)
+        SELECT meeting_id, user_id, current_status FROM participants
+        WHERE meeting_id IN (SELECT id FROM meetings) AND user_id IS NOT NULL;
+
+        DROP TABLE participants;
+        ALTER TABLE participants_new RENAME TO participants;
+
+        CREATE INDEX IF NOT EXISTS idx_participants_user ON participants (user_id, meeting_id);
+        CREATE INDEX IF NOT EXISTS idx_meetings_voice_channel ON meetings (voice_channel_id);
+        CREATE INDEX IF NOT EXISTS idx_meetings_role ON meetings (role_id);
+        CREATE INDEX IF NOT EXISTS idx_meetings_status_time ON meetings (status, date_time);
+        """,
+    ),
+    (
+        3,
+        "Store meeting times as integer UTC epochs with a derived end time",
+        """
+        -- date_time held local "YYYY-MM-DD HH:MM:SS" strings; the 'utc' modifier converts them from the host's local time.
+        -- Meetings without a duration end after 60 minutes, matching what the conflict checker has always assumed.
+        CREATE TABLE meetings_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT,
+            host_id INTEGER NOT NULL, --Discord User ID
+            start_time INTEGER, --Unix timestamp (seconds, UTC)
+            end_time INTEGER, --Unix timestamp (seconds, UTC), start_time + duration
+            duration INTEGER, --In minutes
+            created_at INTEGER DEFAULT (strftime('%s', 'now')),
+            updated_at INTEGER DEFAULT (strftime('%s', 'now')),
+            status TEXT CHECK(status IN ('scheduled', 'cancelled', 'completed')) DEFAULT 'scheduled',
+            voice_channel_id INTEGER,
+            thread_id INTEGER,
+            role_id INTEGER,
+            recurrence INTEGER CHECK(recurrence IN (0, 1, 7, 30)) DEFAULT 0
+        );
+
+        INSERT INTO meetings_new (
+            id, name, description, host_id, start_time, end_time, duration, created_at, updated_at,
+            status, voice_channel_id, thread_id, role_id, recurrence
+        )
+        SELECT
+            id, name, description, host_id, start_time,
+            start_time + COALESCE(NULLIF(duration, 0), 60) * 60,
+            duration,
+            CASE WHEN created_at GLOB '*-*' THEN CAST(strftime('%s', created_at, 'utc') AS INTEGER) ELSE CAST(created_at AS INTEGER) END,
+            CASE WHEN updated_at GLOB '*-*' THEN CAST(strftime('%s', updated_at, 'utc') AS INTEGER) ELSE CAST(updated_at AS INTEGER) END,
+            status, voice_channel_id, thread_id, role_id, recurrence
+        FROM (SELECT *, CAST(strftime('%s', date_time, 'utc') AS INTEGER) AS start_time FROM meetings);
+
+        DROP TABLE meetings;
+        ALTER TABLE meetings_new RENAME TO meetings;
+
+        CREATE INDEX idx_meetings_voice_channel ON meetings (voice_channel_id);
+        CREATE INDEX idx_meetings_role ON meetings (role_id);
+        CREATE INDEX idx_meetings_status_time ON meetings (status, start_time);
+        """,
+    ),
+    (
+        4,
+        "Full-text search index over meeting titles and descriptions",
+        """
+        -- External-content FTS5 table: it stores only the index and reads name/description back from meetings.
+        -- prefix='2 3' keeps short prefix queries (e.g. "st*") from scanning the whole term list.
+        CREATE VIRTUAL TABLE meetings_fts USING fts5(
+            name, description,
+            content='meetings', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        );
+
+        CREATE TRIGGER meetings_fts_insert AFTER INSERT ON meetings BEGIN
+            INSERT INTO meetings_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+        END;
+
+        CREATE TRIGGER meetings_fts_delete AFTER DELETE ON meetings BEGIN
+            INSERT INTO meetings_fts (meetings_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        END;
+
+        CREATE TRIGGER meetings_fts_update AFTER UPDATE OF name, description ON meetings BEGIN
+            INSERT INTO meetings_fts (meetings_fts, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO meetings_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+        END;
+
+        INSERT INTO meetings_fts (meetings_fts) VALUES ('rebuild');
+        """,
+    ),
+    (
+        5,
+        "Index meetings by start time for chronological search pages",
+        """
+        -- Lets date-ordered search pages walk meetings in (start_time, id) order from a cursor and stop after one page.
+        CREATE INDEX idx_meetings_start_time ON meetings (start_time);
+        """,
+    ),
+    (
+        6,
+        "Persist when a meeting's reminder was sent",
+        """
+        ALTER TABLE meetings ADD COLUMN reminder_sent_at INTEGER; --Unix timestamp, NULL until the reminder is sent
+        """,
+    ),
+    (
+        7,
+        "Per-meeting reminder offsets and per-guild defaults",
+        """
+        -- One row per reminder; due_at is start_time - offset_seconds, recomputed whenever the meeting moves.
+        CREATE TABLE reminders (
+            meeting_id INTEGER NOT NULL,
+            offset_seconds INTEGER NOT NULL, --How long before the meeting start the reminder is sent
+            due_at INTEGER NOT NULL, --Unix timestamp
+            sent_at INTEGER, --Unix timestamp, NULL until sent
+            PRIMARY KEY (meeting_id, offset_seconds),
+            FOREIGN KEY (meeting_id) references meetings(id) ON DELETE CASCADE
+        ) WITHOUT ROWID;
+
+        -- Only unsent reminders are indexed, so finding the next due reminder stays cheap however many have been sent.
+        CREATE INDEX idx_reminders_due ON reminders (due_at) WHERE sent_at IS NULL;
+
+        CREATE TABLE guild_settings (
+            guild_id INTEGER PRIMARY KEY,
+            reminder_offsets TEXT --Comma separated seconds ('' for no reminders), NULL for the built-in default
+        );
+
+        -- Carry over the single 15 minute reminder of existing scheduled meetings.
+        INSERT INTO reminders (meeting_id, offset_seconds, due_at, sent_at)
+        SELECT id, 900, start_time - 900, reminder_sent_at FROM meetings
+        WHERE status = 'scheduled' AND start_time IS NOT NULL;
+
+        ALTER TABLE meetings DROP COLUMN reminder_sent_at;
+        """,
+    ),
+    (
+        8,
+        "Materialized occurrences of recurring meetings",
+        """
+        -- For a recurring meeting, start_time/end_time hold its current (next unfinished) occurrence and
+        -- series_start the first one, which every later occurrence is generated from.
+        ALTER TABLE meetings ADD COLUMN series_start INTEGER; --Unix timestamp, NULL for one-off meetings
+        ALTER TABLE meetings ADD COLUMN materialized_until INTEGER; --Unix timestamp, occurrences are generated up to here
+
+        -- One row per occurrence of a recurring meeting, kept after it has passed. original_start identifies the
+        -- occurrence in the series; start_time/end_time differ from it when that single occurrence was moved.
+        CREATE TABLE occurrences (
+            meeting_id INTEGER NOT NULL,
+            original_start INTEGER NOT NULL, --Unix timestamp the series generated for this occurrence
+            start_time INTEGER NOT NULL, --Unix timestamp
+            end_time INTEGER NOT NULL, --Unix timestamp
+            status TEXT CHECK(status IN ('scheduled', 'cancelled')) DEFAULT 'scheduled',
+            PRIMARY KEY (meeting_id, original_start),
+            FOREIGN KEY (meeting_id) references meetings(id) ON DELETE CASCADE
+        ) WITHOUT ROWID;
+
+        CREATE INDEX idx_occurrences_meeting_time ON occurrences (meeting_id, start_time) WHERE status = 'scheduled';
+
+        UPDATE meetings SET series_start = start_time WHERE recurrence > 0 AND start_time IS NOT NULL;
+        """,
+    ),
+    (
+        9,
+        "Warm pool of pre-provisioned meeting roles and channels",
+        """
+        -- Hidden role + text/voice channel sets created ahead of time and handed out by /create.
+        CREATE TABLE channel_pool (
+            role_id INTEGER PRIMARY KEY,
+            guild_id INTEGER NOT NULL,
+            text_channel_id INTEGER NOT NULL,
+            voice_channel_id INTEGER NOT NULL,
+            created_at INTEGER DEFAULT (strftime('%s', 'now'))
+        );
+
+        CREATE INDEX idx_channel_pool_guild ON channel_pool (guild_id, created_at);
+        """,
+    ),
+    (
+        10,
+        "Durable background job queue",
+        """
+        -- Work that talks to Discord and must eventually happen (e.g. deleting a cancelled meeting's channels).
+        -- job_key makes enqueueing idempotent: the same action is only ever queued once.
+        CREATE TABLE jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_key TEXT NOT NULL UNIQUE, --e.g. "delete_channel:1234"
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL, --JSON arguments for the job's handler
+            meeting_id INTEGER,
+            status TEXT CHECK(status IN ('pending', 'running', 'done', 'failed')) DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            run_at INTEGER NOT NULL, --Unix timestamp, when the job is next due
+            last_error TEXT,
+            created_at INTEGER DEFAULT (strftime('%s', 'now')),
+            updated_at INTEGER DEFAULT (strftime('%s', 'now'))
+        );
+
+        CREATE INDEX idx_jobs_due ON jobs (run_at) WHERE status = 'pending';
+        CREATE INDEX idx_jobs_meeting ON jobs (meeting_id);
+        """,
+    ),
+    (
+        11,
+        "Store the id of each meeting's text channel",
+        """
+        -- Text channels used to be found by name. Existing rows are backfilled from the guild on the next startup
+        -- (see ReconcileCog), since only Discord knows which channel belongs to which meeting.
+        ALTER TABLE meetings ADD COLUMN text_channel_id INTEGER;
+        """,
+    ),
+    (
+        12,
+        "Remember the last direct message sent per user and topic",
+        """
+        -- Fingerprint of the last DM sent to a user about a topic (e.g. "conflicts"), so an unchanged message is
+        -- not sent again, not even after a restart.
+        CREATE TABLE notifications (
+            user_id INTEGER NOT NULL,
+            topic TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            notified_at INTEGER NOT NULL, --Unix timestamp
+            PRIMARY KEY (user_id, topic)
+        ) WITHOUT ROWID;
+        """,
+    ),
+    (
+        13,
+        "Opt-in daily digest DMs",
+        """
+        CREATE TABLE digest_subscriptions (
+            user_id INTEGER PRIMARY KEY,
+            hour INTEGER NOT NULL CHECK(hour BETWEEN 0 AND 23), --Local hour the digest is sent at
+            sent_on TEXT --Local date "YYYY-MM-DD" of the last digest sent
+        ) WITHOUT ROWID;
+        """,
+    ),
+    (
+        14,
+        "Partition meetings, participants and attendance by guild; per-guild channel and role names",
+        """
+        -- Rows from single-server deployments get their guild on the next startup, from GUILD_ID (see Database.assign_guild).
+        ALTER TABLE meetings ADD COLUMN guild_id INTEGER;
+        ALTER TABLE participants ADD COLUMN guild_id INTEGER;
+        ALTER TABLE attendance_log ADD COLUMN guild_id INTEGER;
+        ALTER TABLE jobs ADD COLUMN guild_id INTEGER;
+        UPDATE jobs SET guild_id = json_extract(payload, '$.guild_id');
+
+        CREATE INDEX idx_meetings_guild_status_time ON meetings (guild_id, status, start_time);
+        CREATE INDEX idx_meetings_guild_start_time ON meetings (guild_id, start_time);
+        CREATE INDEX idx_participants_guild_user ON participants (guild_id, user_id);
+        CREATE INDEX idx_attendance_guild_meeting ON attendance_log (guild_id, meeting_id);
+        CREATE INDEX idx_jobs_guild_status ON jobs (guild_id, status);
+
+        -- Names of the channels and roles the bot works with in each guild; NULL means the default name.
+        ALTER TABLE guild_settings ADD COLUMN meetings_category TEXT;
+        ALTER TABLE guild_settings ADD COLUMN meeting_forum TEXT;
+        ALTER TABLE guild_settings ADD COLUMN archive_category TEXT;
+        ALTER TABLE guild_settings ADD COLUMN lobby_channel TEXT;
+        ALTER TABLE guild_settings ADD COLUMN bot_role TEXT;
+        """,
+    ),
+    (
+        15,
+        "Leases assigning background work to one bot process at a time",
+        """
+        -- One row per lease (e.g. 'shard:0', 'conflicts'); the owner keeps it by renewing expires_at before it passes.
+        CREATE TABLE leases (
+            name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        """,
+    ),
+]
+
+
+async def run_migrations(conn) -> int:
+    """Applies every pending migration on the given connection and returns the resulting schema version."""
+    async with conn.execute("PRAGMA user_version") as cursor:
+        current_version = (await cursor.fetchone())[0]
+
+    pending = [migration for migration in MIGRATIONS if migration[0] > current_version]
+    if not pending:
+        return current_version
+
+    await conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for version, description, script in pending:
+            try:
+                # executescript runs statements one by one, so the transaction is spelled out in the script itself.
+                await conn.executescript(f"BEGIN IMMEDIATE;\n{script}\nPRAGMA user_version = {version};")
+                async with conn.execute("PRAGMA foreign_key_check") as cursor:
+                    violations = await cursor.fetchall()
+                if violations:
+                    raise RuntimeError(f"Migration {version} left {len(violations)} foreign key violation(s)")
+                await conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    await conn.execute("ROLLBACK")
+                raise
+            print(f"Applied database migration {version}: {description}")
+            current_version = version
+    finally:
+        await conn.execute("PRAGMA foreign_keys = ON")
+
+    return current_version
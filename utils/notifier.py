@@ -0,0 +1,114 @@
+import asyncio, hashlib, discord
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from utils.rate_limiter import RateLimiter
+from utils.timeutils import now_ts
+
+NOTIFY_WORKERS = 4  # Direct messages sent concurrently
+NOTIFY_RATE = 5  # Direct messages sent per second at most, well below Discord's global rate limit
+MAX_CACHED_DM_CHANNELS = 1000  # Users whose DM channel id is kept; the least recently used are evicted first
+
+NotificationKey = Tuple[int, str]  # (user_id, topic)
+
+
+def fingerprint(message: str) -> str:
+    return hashlib.sha1(message.encode()).hexdigest()
+
+
+class Notifier:
+    """
+    Sends direct messages from a queue, so commands and background checks never wait on Discord.
+
+    Every DM is queued under a (user, topic) key, e.g. (user, "conflicts"). Queuing a DM for a key that is
+    still waiting replaces it, so a burst of changes ends up as one DM with the latest state. A small pool of
+    workers sends the queue concurrently, paced by a RateLimiter, so one slow or rate-limited DM does not hold
+    up the others. DM channel ids are kept in a bounded LRU cache, which saves a request per repeated DM.
+
+    With dedupe=True a DM is dropped when it is identical to the last one sent for its key. Fingerprints of
+    sent DMs are stored in the notifications table, so a restart does not send them again.
+    """
+
+    def __init__(self, bot, db, workers: int = NOTIFY_WORKERS):
+        self.bot = bot
+        self.db = db
+        self.worker_count = workers
+        self.limiter = RateLimiter(NOTIFY_RATE, 1)
+        self.fingerprints: Dict[NotificationKey, str] = {}  # Last DM sent per key, for deduplication
+        self.pending: Dict[NotificationKey, Tuple[str, Optional[str]]] = {}  # key -> (message, fingerprint) still to send
+        self.queue: asyncio.Queue = asyncio.Queue()  # Keys of pending DMs, in the order they were first queued
+        self.dm_channels: "OrderedDict[int, int]" = OrderedDict()  # user_id -> DM channel id, least recently used first
+        self._tasks: List[asyncio.Task] = []
+
+    async def load(self):
+        self.fingerprints = {(user_id, topic): digest for user_id, topic, digest in await self.db.notification_fingerprints()}
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.worker_count)]
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def notify(self, user_id: int, topic: str, message: str, dedupe: bool = False):
+        """Queues a DM to the user, replacing any DM about the same topic that has not been sent yet."""
+        key = (user_id, topic)
+        digest = fingerprint(message) if dedupe else None
+        if digest is not None and self.fingerprints.get(key) == digest:
+            self.pending.pop(key, None)  # The user already has this exact message
+            return
+        if key not in self.pending:
+            self.queue.put_nowait(key)
+        self.pending[key] = (message, digest)
+
+    def notify_many(self, user_ids: Iterable[int], topic: str, message: str):
+        for user_id in user_ids:
+            self.notify(user_id, topic, message)
+
+    async def clear(self, user_id: int, topic: str):
+        """Drops a queued DM and forgets the last one sent (e.g. once a conflict is resolved), so the next one is sent even if identical."""
+        key = (user_id, topic)
+        self.pending.pop(key, None)
+        if self.fingerprints.pop(key, None) is not None:
+            await self.db.clear_notification_fingerprint(user_id, topic)
+
+    def notified_users(self, topic: str) -> Set[int]:
+        """Users whose last DM about the topic has not been cleared."""
+        return {user_id for user_id, key_topic in self.fingerprints if key_topic == topic}
+
+    async def _work(self):
+        while True:
+            key = await self.queue.get()
+            entry = self.pending.pop(key, None)
+            if entry is None:
+                continue  # Cleared or deduplicated after it was queued
+            user_id, topic = key
+            message, digest = entry
+            try:
+                await self.limiter.acquire()
+                await self.send(user_id, message)
+            except asyncio.CancelledError:
+                raise
+            except discord.Forbidden:
+                print(f"User {user_id} does not accept direct messages.")  # Not retried; remembered like a sent DM below
+            except Exception as e:
+                print(f"Failed to send a direct message to user {user_id}: {e}")
+                continue
+
+            if digest is not None:
+                self.fingerprints[key] = digest
+                try:
+                    await self.db.set_notification_fingerprint(user_id, topic, digest, now_ts())
+                except Exception as e:
+                    print(f"Could not store the notification fingerprint for user {user_id}: {e}")
+
+    async def send(self, user_id: int, message: str):
+        channel_id = self.dm_channels.get(user_id)
+        if channel_id is None:
+            channel_id = (await self.bot.create_dm(discord.Object(id=user_id))).id  # Served from the cache when the bot has one
+            self.dm_channels[user_id] = channel_id
+            if len(self.dm_channels) > MAX_CACHED_DM_CHANNELS:
+                self.dm_channels.popitem(last=False)
+        else:
+            self.dm_channels.move_to_end(user_id)
+        await self.bot.get_partial_messageable(channel_id, type=discord.ChannelType.private).send(message)
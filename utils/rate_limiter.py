@@ -0,0 +1,28 @@
+import asyncio, time
+
+
+class RateLimiter:
+    """
+    Token bucket that lets `rate` callers through per `per` seconds, allowing bursts of up to `rate`.
+
+    Callers wait in acquire() until a token is available, in the order they arrived. Used to pace bursts of
+    Discord API calls below the rate limits instead of relying on hitting 429s.
+    """
+
+    def __init__(self, rate: float, per: float):
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
@@ -0,0 +1,89 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+MEETING_ROLE_PREFIX = "Meeting: "
+MEETING_CHANNEL_SUFFIXES = ("-text", "-voice")
+
+
+class GuildSnapshot(NamedTuple):
+    """The parts of a guild's cached state that meetings refer to."""
+
+    channel_ids: Set[int]  # Every cached channel and thread
+    role_ids: Set[int]
+    meeting_channels: Dict[int, str]  # id -> name of the "-text"/"-voice" channels in the Meetings category
+    meeting_roles: Dict[int, str]  # id -> name of the roles named "Meeting: ..."
+
+
+class Drift(NamedTuple):
+    incomplete: List[Tuple[int, str, List[str]]]  # (meeting_id, name, missing parts) of scheduled meetings
+    leftovers: List[Tuple[int, str, int]]  # (meeting_id, "channel"/"role", id) still around after the meeting ended
+    orphan_channels: List[int]  # Meeting channels no meeting refers to
+    orphan_roles: List[int]  # Meeting roles no meeting refers to
+
+    def __bool__(self) -> bool:
+        return any(self)
+
+
+def find_drift(meetings: Iterable, snapshot: GuildSnapshot, pooled_ids: Set[int]) -> Drift:
+    """
+    Compares every meeting row (id, name, status, text_channel_id, voice_channel_id, role_id, thread_id) with the
+    guild in one pass.
+
+    Scheduled meetings whose role or channels no longer exist, or that never got a forum post, are incomplete.
+    Meetings that are over but still have their role or voice channel (or, once cancelled, their text channel)
+    have leftovers; the text channel of a completed meeting is kept in the archive. Meeting channels and roles
+    that no meeting (and no pooled set) refers to are orphans. Threads are not checked, since archived threads
+    are missing from the cache.
+    """
+    incomplete, leftovers = [], []
+    referenced = set(pooled_ids)
+
+    for meeting_id, name, status, text_channel_id, voice_channel_id, role_id, thread_id in meetings:
+        referenced.update(resource_id for resource_id in (text_channel_id, voice_channel_id, role_id) if resource_id)
+        if status == "scheduled":
+            if role_id is None:
+                continue  # Imported and still waiting to be provisioned
+            missing = []
+            if role_id not in snapshot.role_ids:
+                missing.append("role")
+            if text_channel_id not in snapshot.channel_ids:
+                missing.append("text channel")
+            if voice_channel_id not in snapshot.channel_ids:
+                missing.append("voice channel")
+            if thread_id is None:
+                missing.append("forum post")
+            if missing:
+                incomplete.append((meeting_id, name, missing))
+        else:
+            if status == "cancelled" and text_channel_id in snapshot.channel_ids:
+                leftovers.append((meeting_id, "channel", text_channel_id))
+            if voice_channel_id in snapshot.channel_ids:
+                leftovers.append((meeting_id, "channel", voice_channel_id))
+            if role_id in snapshot.role_ids:
+                leftovers.append((meeting_id, "role", role_id))
+
+    orphan_channels = [channel_id for channel_id in snapshot.meeting_channels.keys() - referenced]
+    orphan_roles = [role_id for role_id in snapshot.meeting_roles.keys() - referenced]
+    return Drift(incomplete, leftovers, orphan_channels, orphan_roles)
+
+
+def match_text_channels(meetings: Iterable, text_channels: Iterable[Tuple[int, str]], claimed: Set[int]) -> List[Tuple[int, int]]:
+    """
+    Finds the "<name>-text" channel of meetings (id, name, voice_channel_id) stored before text channel ids were,
+    skipping the channels in claimed. A meeting's text and voice channels are created together, so when several
+    channels share a name the one whose snowflake (creation time) is closest to the voice channel's is picked.
+    Returns (text_channel_id, meeting_id) pairs.
+    """
+    by_name: Dict[str, List[int]] = defaultdict(list)
+    for channel_id, name in text_channels:
+        if channel_id not in claimed:
+            by_name[name].append(channel_id)
+
+    matches = []
+    for meeting_id, name, voice_channel_id in meetings:
+        candidates = by_name.get(f"{name.lower().replace(' ', '-')}-text")
+        if candidates:
+            channel_id = min(candidates, key=lambda candidate: abs(candidate - voice_channel_id))
+            candidates.remove(channel_id)
+            matches.append((channel_id, meeting_id))
+    return matches
@@ -0,0 +1,47 @@
+import calendar
+from datetime import datetime, timedelta
+from typing import List
+from utils.timeutils import to_timestamp, from_timestamp
+
+# Recurring meetings are expanded into the occurrences table up to this far ahead. The horizon rolls forward
+# daily and each series only generates the occurrences past what it already has (meetings.materialized_until).
+HORIZON_DAYS = 60
+MONTHLY = 30  # meetings.recurrence value for "monthly", which repeats on the same day of each calendar month
+RECURRING_OPTIONS = {"none": None, "daily": 1, "weekly": 7, "monthly": MONTHLY}
+
+
+def shift(anchor: datetime, recurrence_days: int, count: int) -> datetime:
+    """
+    Returns the `count`-th occurrence after `anchor` (a naive local datetime). Stepping in local time keeps
+    the wall-clock time fixed across DST changes. Monthly series keep the anchor's day of the month,
+    clamped to the last day of shorter months.
+    """
+    if recurrence_days != MONTHLY:
+        return anchor + timedelta(days=recurrence_days * count)
+    month_index = anchor.month - 1 + count
+    year, month = anchor.year + month_index // 12, month_index % 12 + 1
+    day = min(anchor.day, calendar.monthrange(year, month)[1])
+    return anchor.replace(year=year, month=month, day=day)
+
+
+def occurrence_starts(anchor: int, recurrence_days: int, after: int, until: int) -> List[int]:
+    """Start timestamps of a series beginning at `anchor` that fall within (after, until]."""
+    anchor_dt = from_timestamp(anchor)
+
+    # Jump close to `after` instead of stepping through the whole history of the series.
+    if after <= anchor:
+        count = 0
+    elif recurrence_days == MONTHLY:
+        after_dt = from_timestamp(after)
+        count = max(0, (after_dt.year - anchor_dt.year) * 12 + after_dt.month - anchor_dt.month - 1)
+    else:
+        count = max(0, (after - anchor) // (recurrence_days * 86400) - 1)
+
+    starts = []
+    while True:
+        start = to_timestamp(shift(anchor_dt, recurrence_days, count))
+        if start > until:
+            return starts
+        if start > after:
+            starts.append(start)
+        count += 1
@@ -0,0 +1,84 @@
+import asyncio, heapq, itertools, time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+class DeadlineScheduler:
+    """
+    Runs `callback` with the keys whose deadlines have passed, sleeping until exactly the next deadline.
+
+    Deadlines are Unix timestamps kept in a min-heap. Scheduling an earlier deadline wakes the runner so it
+    can re-arm its sleep; cancelling or rescheduling a key leaves its old heap entry behind, which is
+    skipped when it reaches the top. Keys that fall due together are passed to the callback in one call.
+    """
+
+    def __init__(self, callback: Callable[[List[Hashable]], Awaitable[None]]):
+        self.callback = callback
+        self._heap = []  # (deadline, sequence, key)
+        self._deadlines: Dict[Hashable, float] = {}  # Live deadline per key; anything else in the heap is stale
+        self._sequence = itertools.count()  # Tie-breaker so keys never need to be comparable
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
+
+    def schedule(self, key: Hashable, deadline: float):
+        """Schedules (or moves) `key` to fire at `deadline`."""
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._sequence), key))
+        if self._heap[0][2] == key:
+            self._wakeup.set()  # New earliest deadline, re-arm the sleep
+
+        # Drop stale entries once they make up most of the heap.
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [entry for entry in self._heap if self._deadlines.get(entry[2]) == entry[0]]
+            heapq.heapify(self._heap)
+
+    def cancel(self, key: Hashable):
+        self._deadlines.pop(key, None)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _pop_stale(self):
+        while self._heap and self._deadlines.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    async def _run(self):
+        while True:
+            self._pop_stale()
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Collect everything that is due now and hand it over in one batch.
+            now = time.time()
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                deadline, _, key = heapq.heappop(self._heap)
+                if self._deadlines.get(key) == deadline:
+                    del self._deadlines[key]
+                    due.append(key)
+            if due:
+                try:
+                    await self.callback(due)
+                except Exception as e:
+                    print(f"Error running scheduled callback for {due}: {e}")
@@ -0,0 +1,115 @@
+import re, time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+TIME_FORMATS = [
+    r"^(1[0-2]|0?[1-9]):([0-5][0-9]) ?([APap][Mm])$",  # 12-hour format with AM/PM (e.g., "1:00 PM", "01:00pm")
+    r"^(1[0-9]|2[0-3]|0?[0-9]):([0-5][0-9])$",  # 24-hour format (e.g., "13:00")
+]
+
+DATE_FORMATS = [
+    r"^(0?[1-9]|1[0-2])/(0?[1-9]|[12][0-9]|3[01])/(\d{4})$",  # MM/DD/YYYY or M/D/YYYY
+    r"^(0?[1-9]|1[0-2])/(0?[1-9]|[12][0-9]|3[01])/(\d{2})$",  # MM/DD/YY or M/D/YY
+]
+
+# Meeting times are stored as integer Unix timestamps (seconds, UTC). These helpers are the only place
+# they are converted to and from datetimes, which should only happen at the display/input edge.
+
+
+def now_ts() -> int:
+    """Current time as a Unix timestamp."""
+    return int(time.time())
+
+
+def to_timestamp(dt: datetime) -> int:
+    """Converts a datetime (naive values are treated as the host's local time) to a Unix timestamp."""
+    return int(dt.timestamp())
+
+
+def from_timestamp(ts: int) -> datetime:
+    """Converts a Unix timestamp to a naive local datetime."""
+    return datetime.fromtimestamp(ts)
+
+
+def discord_timestamp(ts: Optional[int], style: str = "F") -> str:
+    """Formats a Unix timestamp as a Discord timestamp tag, which each client renders in its own timezone."""
+    if ts is None:
+        return "Unknown"
+    return f"<t:{int(ts)}:{style}>"
+
+
+def parse_time(input_time: str) -> str:
+    """Parses various time formats and returns a 24-hour format string (HH:MM)."""
+    for pattern in TIME_FORMATS:
+        match = re.match(pattern, input_time)
+        if match:
+            if len(match.groups()) == 3:  # 12-hour format
+                hours, minutes, period = match.groups()
+                hours = int(hours)
+                if period.lower() == "pm" and hours != 12:
+                    hours += 12
+                elif period.lower() == "am" and hours == 12:
+                    hours = 0
+            else:  # 24-hour format
+                hours, minutes = map(int, match.groups())
+
+            return f"{hours:02}:{minutes:02}"  # Return HH:MM format
+
+    raise ValueError(f"Invalid time format: {input_time}")
+
+
+def parse_date(input_date: str) -> str:
+    """Parses various date formats and returns MM/DD/YYYY format."""
+    for pattern in DATE_FORMATS:
+        match = re.match(pattern, input_date)
+        if match:
+            month, day, year = match.groups()
+            year = int(year)
+            if year < 100:  # Convert YY to YYYY (assuming 2000s)
+                year += 2000
+            return f"{year}-{int(month):02}-{int(day):02}"  # Return YYYY/MM/DD format
+
+    raise ValueError(f"Invalid date format: {input_date}")
+
+
+def day_bounds(input_date: str) -> Tuple[int, int]:
+    """Parses a date and returns the [start, end) timestamps of that local day."""
+    day = datetime.strptime(parse_date(input_date), "%Y-%m-%d")
+    return to_timestamp(day), to_timestamp(day + timedelta(days=1))
+
+
+OFFSET_UNITS = {"d": 86400, "h": 3600, "m": 60}
+MAX_REMINDER_OFFSETS = 5
+MAX_REMINDER_OFFSET_SECONDS = 30 * 86400
+
+
+def parse_offsets(input_offsets: str) -> List[int]:
+    """
+    Parses a comma/space separated list of reminder offsets (e.g. "1d, 1h, 5m") into seconds.
+    Numbers without a unit are minutes. Returns a sorted list without duplicates, largest offset first.
+    """
+    offsets = set()
+    for part in re.split(r"[,\s]+", input_offsets.strip().lower()):
+        if not part:
+            continue
+        match = re.match(r"^(\d+)([dhm]?)$", part)
+        if not match:
+            raise ValueError(f"Invalid reminder offset: {part} (use e.g. 1d, 2h, 15m)")
+        seconds = int(match.group(1)) * OFFSET_UNITS[match.group(2) or "m"]
+        if seconds <= 0 or seconds > MAX_REMINDER_OFFSET_SECONDS:
+            raise ValueError(f"Reminder offsets must be between 1 minute and 30 days: {part}")
+        offsets.add(seconds)
+
+    if len(offsets) > MAX_REMINDER_OFFSETS:
+        raise ValueError(f"At most {MAX_REMINDER_OFFSETS} reminders can be set.")
+    return sorted(offsets, reverse=True)
+
+
+def format_duration(seconds: int) -> str:
+    """Formats a number of seconds as e.g. "1 day 2 hours" or "5 minutes" (largest two units, rounded down to minutes)."""
+    parts = []
+    for name, size in (("day", 86400), ("hour", 3600), ("minute", 60)):
+        count, seconds = divmod(seconds, size)
+        if count:
+            parts.append(f"{count} {name}{'s' if count != 1 else ''}")
+    return " ".join(parts[:2]) or "0 minutes"
@@ -0,0 +1,65 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class WriteBehindBuffer:
+    """
+    Coalesces rows in memory and hands them to `flush_callback` in batches.
+
+    A batch is written `flush_interval` seconds after the first buffered row, or as soon as `max_batch`
+    rows are waiting, whichever comes first. Identical rows queued before a flush are written once.
+    Call close() on shutdown so anything still buffered is written.
+    """
+
+    def __init__(self, flush_callback: Callable[[List[Tuple]], Awaitable[None]], flush_interval: float = 0.5, max_batch: int = 200):
+        self.flush_callback = flush_callback
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending: Dict[Tuple, None] = {}  # Insertion-ordered set of rows waiting to be written
+        self._batch_full = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, row: Tuple):
+        self._pending[row] = None
+        if len(self._pending) >= self.max_batch:
+            self._batch_full.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_when_due())
+
+    async def _flush_when_due(self):
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_full.clear()
+            try:
+                await self.flush()
+            except Exception:
+                pass  # Already reported by flush(); the rows stay buffered and are retried on the next pass
+
+    async def flush(self):
+        """Writes every buffered row now. Rows are put back into the buffer if the write fails."""
+        async with self._flush_lock:
+            rows = list(self._pending)
+            self._pending.clear()
+            if not rows:
+                return
+            try:
+                await self.flush_callback(rows)
+            except Exception as e:
+                print(f"Error flushing {len(rows)} buffered row(s), will retry: {e}")
+                for row in rows:
+                    self._pending.setdefault(row, None)
+                raise
+
+    async def close(self):
+        """Stops the background flush and writes whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        await self.flush()